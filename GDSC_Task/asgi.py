@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'GDSC_Task.settings')
 
 application = get_asgi_application()
+
+from common.db import open_connection_pools  # noqa: E402 (needs the settings loaded above)
+
+open_connection_pools()
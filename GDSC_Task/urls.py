@@ -1,13 +1,16 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from common.views import serve_media
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
 urlpatterns_v1 = [
     path('', include('core.urls')),
     path('', include('skills.urls')),
-    path('work/', include('work.urls'))
+    path('work/', include('work.urls')),
+    path('async/', include('core.async_urls')),
+    path('async/', include('skills.async_urls')),
+    path('async/work/', include('work.async_urls')),
 ]
 
 urlpatterns = [
@@ -17,7 +20,6 @@ urlpatterns = [
     path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
     path("api/v1/", include(urlpatterns_v1)),
     path('i18n/', include('django.conf.urls.i18n')),
+    # Files of common.storage.LocalMediaStorage (and of the plain file system storage with DEBUG).
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:name>", serve_media, name='media'),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'GDSC_Task.settings')
 
 application = get_wsgi_application()
+
+from common.db import open_connection_pools  # noqa: E402 (needs the settings loaded above)
+
+open_connection_pools()
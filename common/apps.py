@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import checks  # noqa: F401
+        from .metrics import install_query_counter
+        from .timing import install_query_timer, instrument_rest_framework
+
+        connection_created.connect(install_query_counter)
+        connection_created.connect(install_query_timer)
+        instrument_rest_framework()
@@ -0,0 +1,68 @@
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from .routing import ais_pinned_to_primary, read_from_replicas
+
+
+def render(data, status_code=status.HTTP_200_OK, headers=None):
+    """A JSON response rendered like DRF's ``Response``."""
+    return HttpResponse(JSONRenderer().render(data), status=status_code, headers=headers,
+                        content_type='application/json')
+
+
+class AsyncAPIView(View):
+    """
+    Base of the native async read endpoints, served under ASGI without a thread per request.
+
+    Requests are authenticated with the ``aauthenticate`` of the default authentication
+    classes (the others run on a thread) and must be authenticated. Handlers are coroutines
+    that get a DRF ``Request``, so ``query_params`` and the paginators work as in ``APIView``,
+    and return Django responses, e.g. from ``render``. Like ``ReplicaReadMixin``, safe
+    requests read from the replicas unless the user has written recently.
+    """
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request)
+        try:
+            request.user = await self.aauthenticate(request)
+            if request.method in SAFE_METHODS and settings.DATABASE_REPLICAS \
+                    and not await ais_pinned_to_primary(request):
+                with read_from_replicas():
+                    return await super().dispatch(request, *args, **kwargs)
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as e:
+            return self.handle_exception(request, e)
+        except Http404 as e:
+            return render({'detail': str(e)}, status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logging.error(f"Error occurred: {e}")
+            return render({'message': f'Internal Server Error: {str(e)}', 'data': None},
+                          status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def aauthenticate(self, request):
+        for authentication_class in self.authentication_classes:
+            authenticator = authentication_class()
+            if hasattr(authenticator, 'aauthenticate'):
+                result = await authenticator.aauthenticate(request)
+            else:
+                result = await sync_to_async(authenticator.authenticate)(request)
+            if result is not None:
+                return result[0]
+        raise NotAuthenticated()
+
+    def handle_exception(self, request, exc):
+        headers = {}
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED and self.authentication_classes:
+            headers['WWW-Authenticate'] = self.authentication_classes[0]().authenticate_header(request)
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return render(data, exc.status_code, headers)
@@ -0,0 +1,44 @@
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def get_cache_version(namespace):
+    """
+    Return the current version token of a cache namespace.
+
+    Cached entries embed the token in their key, so bumping it invalidates every entry
+    of the namespace at once. Tokens are random rather than counters, so a cache flush
+    can never bring an old token (and the entries or ETags built from it) back.
+    """
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_cache_version(namespace):
+    key = _version_key(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid.uuid4().hex, None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_cache_version(namespace):
+    cache.set(_version_key(namespace), uuid.uuid4().hex, None)
+
+
+def make_cache_key(namespace, version, payload):
+    """Build a cache key from a JSON-serializable, already normalized payload."""
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+    return f'{namespace}:{version}:{digest}'
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Cache versions (catalogs, search facets) and the authentication cache are invalidated
+    through the default cache, so a cache private to each worker silently leaves the other
+    workers serving stale data.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f'The default cache ({backend}) is not shared between worker processes.',
+        hint='Use Redis (REDIS_URL), or set DEBUG for local development.',
+        id='common.E001',
+    )]
@@ -0,0 +1,55 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def _etag(*parts):
+    return quote_etag(hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:32])
+
+
+_COLLECTION_STATS = {'count': Count('pk'), 'last_modified': Max('updated_at')}
+
+
+def queryset_validators(queryset, *extra):
+    """
+    Return the ``(etag, last_modified)`` validators of a collection in one aggregate query.
+
+    The row count is part of the ETag so that deletions, which leave the newest
+    ``updated_at`` unchanged, still produce a new one. ``extra`` values (e.g. a catalog
+    version for data joined into the response) are folded into the ETag as well. For the
+    same reason collections have no ``Last-Modified``: ``If-Modified-Since`` alone would
+    be answered with a 304 after a deletion.
+    """
+    return _collection_validators(queryset.order_by().aggregate(**_COLLECTION_STATS), extra)
+
+
+async def aqueryset_validators(queryset, *extra):
+    return _collection_validators(await queryset.order_by().aaggregate(**_COLLECTION_STATS), extra)
+
+
+def _collection_validators(stats, extra):
+    last_modified = stats['last_modified']
+    return _etag(stats['count'], last_modified.isoformat() if last_modified else '', *extra), None
+
+
+def instance_validators(instance, *extra):
+    return _etag(instance.pk, instance.updated_at.isoformat(), *extra), instance.updated_at
+
+
+def not_modified(request, etag, last_modified):
+    """Return a 304 response when the request's validators still match, ``None`` otherwise."""
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,57 @@
+import atexit
+
+from django.db import connections
+
+
+def connection_pools():
+    """The connection pools of the configured databases, by alias (only those with ``OPTIONS['pool']``)."""
+    pools = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is not None:
+            pools[alias] = pool
+    return pools
+
+
+def pool_stats():
+    """
+    Current usage of every connection pool: connections in use and idle, requests waiting for
+    one, and the totals since startup of requests served and time spent waiting.
+    """
+    stats = {}
+    for alias, pool in connection_pools().items():
+        raw = pool.get_stats()
+        queued = raw.get('requests_queued', 0)
+        stats[alias] = {
+            'size': raw['pool_size'],
+            'min_size': raw['pool_min'],
+            'max_size': raw['pool_max'],
+            'in_use': raw['pool_size'] - raw['pool_available'],
+            'idle': raw['pool_available'],
+            'waiting': raw['requests_waiting'],
+            'requests': raw.get('requests_num', 0),
+            'requests_queued': queued,
+            'wait_ms_total': raw.get('requests_wait_ms', 0),
+            'wait_ms_avg': round(raw.get('requests_wait_ms', 0) / queued, 3) if queued else 0.0,
+            'timeouts': raw.get('requests_errors', 0),
+            'connections_opened': raw.get('connections_num', 0),
+            'connections_lost': raw.get('connections_lost', 0),
+        }
+    return stats
+
+
+def open_connection_pools():
+    """
+    Start filling the connection pools in the background, so the first requests do not pay for
+    the connections, and close them on shutdown. Called from ``wsgi.py`` and ``asgi.py``; with
+    a pre-forking server that loads the app before forking (e.g. ``gunicorn --preload``), call
+    it after the fork instead.
+    """
+    for pool in connection_pools().values():
+        pool.open(wait=False)
+    atexit.register(close_connection_pools)
+
+
+def close_connection_pools():
+    for alias in connection_pools():
+        connections[alias].close_pool()
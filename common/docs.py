@@ -3,6 +3,28 @@ from rest_framework import status
 from skills.serializers import *
 
 
+PAGINATION_PARAMETERS = [
+    OpenApiParameter(name='cursor', description='Opaque cursor returned as `next` by the previous page.',
+                     required=False, type=str),
+    OpenApiParameter(name='page_size', description='Number of results per page.', required=False, type=int),
+]
+
+IF_NONE_MATCH_PARAMETER = OpenApiParameter(
+    name='If-None-Match', location=OpenApiParameter.HEADER, required=False, type=str,
+    description='ETag of a previously fetched response; answered with 304 while it is current.'
+)
+
+CONDITIONAL_PARAMETERS = [
+    IF_NONE_MATCH_PARAMETER,
+    OpenApiParameter(name='If-Modified-Since', location=OpenApiParameter.HEADER, required=False, type=str,
+                     description='`Last-Modified` of a previously fetched response.'),
+]
+
+CATALOG_PARAMETERS = [*PAGINATION_PARAMETERS, IF_NONE_MATCH_PARAMETER]
+
+NOT_MODIFIED_RESPONSE = OpenApiResponse(description="The previously fetched response is still current.")
+
+
 def registration_docs():
     return extend_schema(
         summary="Register a User",
@@ -139,6 +161,106 @@ def login_docs():
     )
 
 
+def token_refresh_docs():
+    return extend_schema(
+        summary="Refresh Access Token",
+        description=(
+            """
+            Exchange a refresh token for a new access token. Revoked (logged out) refresh
+            tokens are rejected. With `ROTATE_REFRESH_TOKENS` a new refresh token is returned
+            as well and, with `BLACKLIST_AFTER_ROTATION`, the old one is revoked.
+            """
+        ),
+        tags=['Authentication'],
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {
+                    "refresh": {"type": "string"},
+                },
+                "required": ["refresh"],
+            }
+        },
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description="New access token issued.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Success Response",
+                        value={
+                            "access": "access_token_here"
+                        }
+                    )
+                ]
+            ),
+            status.HTTP_401_UNAUTHORIZED: OpenApiResponse(
+                description="The refresh token is invalid, expired or revoked.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={
+                            "detail": "Token is blacklisted",
+                            "code": "token_not_valid"
+                        }
+                    )
+                ]
+            ),
+        }
+    )
+
+
+def logout_docs():
+    return extend_schema(
+        summary="Logout",
+        description=(
+            """
+            Revoke the given refresh token and the access token used to call this endpoint.
+            Both are rejected from then on, until they would have expired anyway.
+            """
+        ),
+        tags=['Authentication'],
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {
+                    "refresh": {"type": "string"},
+                },
+                "required": ["refresh"],
+            }
+        },
+        responses={
+            status.HTTP_204_NO_CONTENT: OpenApiResponse(description="Logged out."),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(
+                description="Invalid refresh token.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={
+                            "refresh": ["Token is blacklisted"]
+                        }
+                    )
+                ]
+            ),
+            status.HTTP_500_INTERNAL_SERVER_ERROR: OpenApiResponse(
+                description="Internal Server Error",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={
+                            "message": "Internal Server Error",
+                            "data": None
+                        }
+                    )
+                ]
+            )
+        }
+    )
+
+
 def user_profile_docs():
     return extend_schema(
         summary="Retrieve User Profile",
@@ -148,6 +270,7 @@ def user_profile_docs():
             """
         ),
         tags=['User Profile'],
+        parameters=CONDITIONAL_PARAMETERS,
         responses={
             status.HTTP_200_OK: OpenApiResponse(
                 description="User profile details.",
@@ -159,11 +282,15 @@ def user_profile_docs():
                             "email": "user@example.com",
                             "name": "User Name",
                             "phone": "1234567890",
-                            "profile_picture": "https://example.com/profile_picture.jpg"
+                            "profile_picture": "https://example.com/profile_picture.jpg",
+                            "profile_picture_variants": {
+                                "64": {"webp": "https://example.com/64.webp", "jpeg": "https://example.com/64.jpg"}
+                            }
                         }
                     )
                 ]
             ),
+            status.HTTP_304_NOT_MODIFIED: NOT_MODIFIED_RESPONSE,
             status.HTTP_401_UNAUTHORIZED: OpenApiResponse(
                 description="Unauthorized access.",
                 response={"application/json"},
@@ -194,6 +321,121 @@ def user_profile_docs():
     )
 
 
+def user_profile_update_docs():
+    return extend_schema(
+        summary="Update User Profile",
+        description=(
+            """
+            This endpoint updates the name, phone and profile picture of the authenticated user.
+            A profile picture (JPEG or PNG, at most 500KB) is processed in the background into
+            resized WebP and JPEG variants: the response is then `202 Accepted` and includes a
+            `profile_picture_job` whose `status_url` reports the progress. A picture that was
+            uploaded before is reused right away, with a `done` job and `200 OK`.
+            """
+        ),
+        tags=['User Profile'],
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "phone": {"type": "string"},
+                    "profile_picture": {"type": "string", "format": "binary"},
+                },
+            }
+        },
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(description="Profile updated, including a previously uploaded picture."),
+            status.HTTP_202_ACCEPTED: OpenApiResponse(
+                description="Profile updated; the profile picture is being processed.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Success Response",
+                        value={
+                            "email": "user@example.com",
+                            "name": "User Name",
+                            "phone": "1234567890",
+                            "profile_picture": None,
+                            "profile_picture_variants": {},
+                            "profile_picture_job": {
+                                "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                                "status": "pending",
+                                "error": "",
+                                "variants": {},
+                                "status_url": "/api/v1/profile/picture/jobs/3fa85f64-5717-4562-b3fc-2c963f66afa6/",
+                                "created_at": "2024-10-01T12:00:00Z",
+                                "updated_at": "2024-10-01T12:00:00Z"
+                            }
+                        }
+                    )
+                ]
+            ),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(
+                description="Invalid data, e.g. a file that is not a JPEG or PNG image.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={
+                            "profile_picture": ["Invalid file type. Only JPEG and PNG images are allowed."]
+                        }
+                    )
+                ]
+            ),
+            status.HTTP_503_SERVICE_UNAVAILABLE: OpenApiResponse(
+                description="Too many profile pictures are being processed; retry after `Retry-After` seconds."
+            ),
+        }
+    )
+
+
+def profile_picture_job_docs():
+    return extend_schema(
+        summary="Profile Picture Processing Status",
+        description=(
+            """
+            This endpoint reports the status (`pending`, `processing`, `done` or `failed`) of a
+            profile picture upload of the authenticated user, and the variant URLs once it is done.
+            """
+        ),
+        tags=['User Profile'],
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description="Job status.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Success Response",
+                        value={
+                            "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                            "status": "pending",
+                            "error": "",
+                            "variants": {},
+                            "status_url": "/api/v1/profile/picture/jobs/3fa85f64-5717-4562-b3fc-2c963f66afa6/",
+                            "created_at": "2024-10-01T12:00:00Z",
+                            "updated_at": "2024-10-01T12:00:00Z"
+                        }
+                    )
+                ]
+            ),
+            status.HTTP_404_NOT_FOUND: OpenApiResponse(
+                description="No such job for this user.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={
+                            "message": "Profile picture job not found",
+                            "data": None
+                        }
+                    )
+                ]
+            ),
+        }
+    )
+
+
 def work_experience_list_docs():
     return extend_schema(
         summary="List Work Experiences",
@@ -204,6 +446,7 @@ def work_experience_list_docs():
             """
         ),
         tags=['Work Experience'],
+        parameters=PAGINATION_PARAMETERS,
         responses={
             status.HTTP_200_OK: OpenApiResponse(
                 description="List of work experiences retrieved successfully.",
@@ -211,7 +454,7 @@ def work_experience_list_docs():
                 examples=[
                     OpenApiExample(
                         name="Success Response",
-                        value=[
+                        value={"next": None, "results": [
                             {
                                 "id": 1,
                                 "job_title": "Software Engineer",
@@ -222,7 +465,7 @@ def work_experience_list_docs():
                                 "job_title": "Data Scientist",
                                 "company_name": "Data Inc"
                             }
-                        ]
+                        ]}
                     )
                 ]
             ),
@@ -330,6 +573,70 @@ def create_work_experience_docs():
     )
 
 
+def work_experience_import_docs():
+    return extend_schema(
+        summary="Import Work Experiences",
+        description=(
+            """
+            Import many work experiences for the authenticated user in one request.
+            Send CSV with a header row (`text/csv`) or one JSON object per line (`application/x-ndjson`),
+            using the fields of the create endpoint. The body is parsed as it is read and rows are
+            validated one by one; valid rows are inserted in batches in a single transaction and invalid
+            ones are skipped and reported by line number.
+            """
+        ),
+        tags=['Work Experience'],
+        request={
+            "text/csv": {"type": "string"},
+            "application/x-ndjson": {"type": "string"},
+        },
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description="Import report.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Success Response",
+                        value={
+                            "imported": 41,
+                            "failed": 1,
+                            "errors": [{"line": 7, "errors": {"start_date": ["This field is required."]}}],
+                            "errors_truncated": False
+                        }
+                    )
+                ]
+            ),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(
+                description="The body could not be parsed; nothing was imported.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={"detail": "Line 12 is longer than 65536 bytes."}
+                    )
+                ]
+            ),
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE: OpenApiResponse(
+                description="Unsupported content type.",
+                response={"application/json"},
+            ),
+            status.HTTP_500_INTERNAL_SERVER_ERROR: OpenApiResponse(
+                description="Internal Server Error",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={
+                            "message": "Internal Server Error",
+                            "data": None
+                        }
+                    )
+                ]
+            )
+        }
+    )
+
+
 def work_experience_detail_docs():
     return extend_schema(
         summary="Retrieve Work Experience",
@@ -339,6 +646,7 @@ def work_experience_detail_docs():
             """
         ),
         tags=['Work Experience'],
+        parameters=CONDITIONAL_PARAMETERS,
         responses={
             status.HTTP_200_OK: OpenApiResponse(
                 description="Work experience details retrieved successfully.",
@@ -359,6 +667,7 @@ def work_experience_detail_docs():
                     )
                 ]
             ),
+            status.HTTP_304_NOT_MODIFIED: NOT_MODIFIED_RESPONSE,
             status.HTTP_404_NOT_FOUND: OpenApiResponse(
                 description="Work experience not found.",
                 response={"application/json"},
@@ -517,8 +826,12 @@ def work_experience_delete_docs():
 def skill_list_docs():
     return extend_schema(
         summary="List Predefined Skills",
-        description="This endpoint returns a list of predefined skills available for users to select.",
+        description=(
+            "This endpoint returns a list of predefined skills available for users to select. "
+            "Responses carry an ETag; revalidate with `If-None-Match` to get a 304 while the catalog is unchanged."
+        ),
         tags=['Skills'],
+        parameters=CATALOG_PARAMETERS,
         responses={
             status.HTTP_200_OK: OpenApiResponse(
                 description="A list of predefined skills.",
@@ -526,14 +839,15 @@ def skill_list_docs():
                 examples=[
                     OpenApiExample(
                         name="Success Response",
-                        value=[
+                        value={"next": None, "results": [
                             {"id": 1, "name": "Python"},
                             {"id": 2, "name": "Django"},
                             {"id": 3, "name": "REST APIs"}
-                        ]
+                        ]}
                     )
                 ]
             ),
+            status.HTTP_304_NOT_MODIFIED: NOT_MODIFIED_RESPONSE,
             status.HTTP_500_INTERNAL_SERVER_ERROR: OpenApiResponse(
                 description="Internal Server Error",
                 response={"application/json"},
@@ -602,6 +916,68 @@ def add_user_skills_docs():
     )
 
 
+def _bulk_user_links_docs(kind, tag, remove):
+    action = 'Remove' if remove else 'Add'
+    statuses = '`removed`, `not_present` or `not_found`' if remove else '`added`, `exists` or `not_found`'
+    return extend_schema(
+        summary=f"{action} User {kind.title()} in Bulk",
+        description=(
+            f"""
+            {action} several {kind} by name in one request. Names are resolved with a single query and the
+            links are written with a single statement. Each name gets a status: {statuses}.
+            """
+        ),
+        tags=[tag],
+        request=BulkNamesSerializer,
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description="Per-name results, in request order.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Success Response",
+                        value={"results": [
+                            {"name": "Python", "status": "removed" if remove else "added"},
+                            {"name": "Cobol", "status": "not_found"}
+                        ]}
+                    )
+                ]
+            ),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(
+                description="Invalid input.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={"names": ["This list may not be empty."]}
+                    )
+                ]
+            ),
+            status.HTTP_500_INTERNAL_SERVER_ERROR: OpenApiResponse(
+                description="Internal Server Error",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={
+                            "message": "Internal Server Error",
+                            "data": None
+                        }
+                    )
+                ]
+            )
+        }
+    )
+
+
+def bulk_user_skills_docs(remove=False):
+    return _bulk_user_links_docs('skills', 'Skills', remove)
+
+
+def bulk_user_interests_docs(remove=False):
+    return _bulk_user_links_docs('interests', 'Interests', remove)
+
+
 def user_skill_list_docs():
     return extend_schema(
         summary="List User Skills",
@@ -611,6 +987,7 @@ def user_skill_list_docs():
             """
         ),
         tags=['Skills'],
+        parameters=[*PAGINATION_PARAMETERS, IF_NONE_MATCH_PARAMETER],
         responses={
             status.HTTP_200_OK: OpenApiResponse(
                 description="A list of the user's skills.",
@@ -618,12 +995,13 @@ def user_skill_list_docs():
                 examples=[
                     OpenApiExample(
                         name="Success Response",
-                        value=[
+                        value={"next": None, "results": [
                             {"id": 1, "skill": {"id": 2, "name": "Django"}}
-                        ]
+                        ]}
                     )
                 ]
             ),
+            status.HTTP_304_NOT_MODIFIED: NOT_MODIFIED_RESPONSE,
             status.HTTP_500_INTERNAL_SERVER_ERROR: OpenApiResponse(
                 description="Internal Server Error",
                 response={"application/json"},
@@ -699,12 +1077,23 @@ def user_search_docs():
         description=(
             """
             Search for users based on skills and job type.
+            When several comma separated skills are given, users are ranked by how many of them they have.
             """
         ),
         tags=['Users'],
         parameters=[
-            OpenApiParameter(name='skills', description='Filter users by skill name.', required=False, type=str),
-            OpenApiParameter(name='job_type', description='Filter users by job type.', required=False, type=str)
+            OpenApiParameter(name='skills', description='Filter users by skill name (comma separated).',
+                             required=False, type=str),
+            OpenApiParameter(name='q', description=(
+                'Boolean skill expression, e.g. `Python AND Django AND NOT PHP`. Supports `AND`, `OR`, `NOT` '
+                'and parentheses. Results are ordered by id and `skills` is ignored when `q` is given.'
+            ), required=False, type=str),
+            OpenApiParameter(name='job_type', description='Filter users by job type.', required=False, type=str),
+            OpenApiParameter(name='stream', description=(
+                'Stream every matching user as newline delimited JSON instead of a page '
+                '(same as `Accept: application/x-ndjson`).'
+            ), required=False, type=bool),
+            *PAGINATION_PARAMETERS,
         ],
         responses={
             status.HTTP_200_OK: OpenApiResponse(
@@ -713,9 +1102,9 @@ def user_search_docs():
                 examples=[
                     OpenApiExample(
                         name="Success Response",
-                        value=[
+                        value={"next": None, "results": [
                             {"id": 1, "skill": {"id": 2, "name": "Django"}}
-                        ]
+                        ]}
                     )
                 ]
             ),
@@ -748,6 +1137,64 @@ def user_search_docs():
     )
 
 
+def user_search_facets_docs():
+    return extend_schema(
+        summary="User Search Facets",
+        description=(
+            """
+            Count the users matching a search per skill and per job type.
+            Accepts the same filters as the user search; counts are cached until a user's skills or work experiences change.
+            """
+        ),
+        tags=['Users'],
+        parameters=[
+            OpenApiParameter(name='skills', description='Filter users by skill name (comma separated).',
+                             required=False, type=str),
+            OpenApiParameter(name='q', description='Boolean skill expression, e.g. `Python AND NOT PHP`.',
+                             required=False, type=str),
+            OpenApiParameter(name='job_type', description='Filter users by job type.', required=False, type=str),
+        ],
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description="Facet counts for the matching users.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Success Response",
+                        value={
+                            "skills": [{"name": "Django", "count": 12}, {"name": "Python", "count": 9}],
+                            "job_types": [{"name": "Full-time", "count": 15}]
+                        }
+                    )
+                ]
+            ),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(
+                description="Invalid boolean query.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={"q": ["Unbalanced parentheses"]}
+                    )
+                ]
+            ),
+            status.HTTP_500_INTERNAL_SERVER_ERROR: OpenApiResponse(
+                description="Internal Server Error",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Error Response",
+                        value={
+                            "message": "Internal Server Error",
+                            "data": None
+                        }
+                    )
+                ]
+            )
+        }
+    )
+
+
 def add_user_interest_docs():
     return extend_schema(
         summary="Add User Interest",
@@ -807,6 +1254,7 @@ def view_user_interests_docs():
             This endpoint allows the authenticated user to view their list of interests.
         """,
         tags=['Interests'],
+        parameters=[*PAGINATION_PARAMETERS, IF_NONE_MATCH_PARAMETER],
         responses={
             status.HTTP_200_OK: OpenApiResponse(
                 description="A list of user interests.",
@@ -814,13 +1262,14 @@ def view_user_interests_docs():
                 examples=[
                     OpenApiExample(
                         name="Success Response",
-                        value=[
+                        value={"next": None, "results": [
                             {"interest": {"name": "Machine Learning"}},
                             {"interest": {"name": "Data Science"}}
-                        ]
+                        ]}
                     )
                 ]
             ),
+            status.HTTP_304_NOT_MODIFIED: NOT_MODIFIED_RESPONSE,
             status.HTTP_500_INTERNAL_SERVER_ERROR: OpenApiResponse(
                 description="Internal Server Error",
                 response={"application/json"},
@@ -895,8 +1344,10 @@ def interests_list_docs():
         description=
         """
             This endpoint returns a list of predefined interests available for users to select.
+            Responses carry an ETag; revalidate with `If-None-Match` to get a 304 while the catalog is unchanged.
         """,
         tags=['Interests'],
+        parameters=CATALOG_PARAMETERS,
         responses={
             status.HTTP_200_OK: OpenApiResponse(
                 description="A list of predefined interests.",
@@ -904,14 +1355,15 @@ def interests_list_docs():
                 examples=[
                     OpenApiExample(
                         name="Success Response",
-                        value=[
+                        value={"next": None, "results": [
                             {"id": 1, "name": "Machine Learning"},
                             {"id": 2, "name": "Data Science"},
                             {"id": 3, "name": "Cloud Computing"}
-                        ]
+                        ]}
                     )
                 ]
             ),
+            status.HTTP_304_NOT_MODIFIED: NOT_MODIFIED_RESPONSE,
             status.HTTP_500_INTERNAL_SERVER_ERROR: OpenApiResponse(
                 description="Internal Server Error",
                 response={"application/json"},
@@ -934,12 +1386,15 @@ def google_login_docs():
         summary="Google OAuth2 Login",
         description="""
             This endpoint allows the user to log in or sign up using their Google account.
-            The frontend must send the Google OAuth2 `access_token` to this endpoint.
+            The frontend must send either a Google `id_token` or a Google OAuth2 `access_token` to this endpoint.
+            An `id_token` is verified locally against Google's cached signing keys; an `access_token`
+            is checked with a call to Google.
             If the authentication is successful, it returns JWT tokens (access and refresh).
         """,
         tags=['Authentication'],
         request={
             "application/json": {
+                "id_token": "string",
                 "access_token": "string"
             }
         },
@@ -984,3 +1439,71 @@ def google_login_docs():
             )
         }
     )
+
+
+def database_pool_stats_docs():
+    return extend_schema(
+        summary="Database Connection Pool Stats",
+        description=(
+            """
+            Staff only. Reports, per database, the connections of this process's pool that are in
+            use and idle, the requests waiting for a connection, and the number of requests and
+            total and average time spent waiting since startup. `pools` is empty without `DB_POOL`.
+            """
+        ),
+        tags=['Operations'],
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description="Pool stats.",
+                response={"application/json"},
+                examples=[
+                    OpenApiExample(
+                        name="Success Response",
+                        value={
+                            "pooling": True,
+                            "pools": {
+                                "default": {
+                                    "size": 4, "min_size": 2, "max_size": 10, "in_use": 3, "idle": 1,
+                                    "waiting": 0, "requests": 1520, "requests_queued": 12,
+                                    "wait_ms_total": 48, "wait_ms_avg": 4.0, "timeouts": 0,
+                                    "connections_opened": 4, "connections_lost": 0
+                                }
+                            }
+                        }
+                    )
+                ]
+            ),
+            status.HTTP_403_FORBIDDEN: OpenApiResponse(description="Not a staff user."),
+        }
+    )
+
+
+def metrics_docs():
+    return extend_schema(
+        summary="Request Metrics",
+        description=(
+            """
+            Staff only, for Prometheus to scrape. Request counts by status code, latency histograms
+            and SQL-queries-per-request histograms, labeled by URL name and method and added up over
+            all workers, in the Prometheus text format.
+            """
+        ),
+        tags=['Operations'],
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description="Metrics in the Prometheus text exposition format.",
+                response={"text/plain"},
+                examples=[
+                    OpenApiExample(
+                        name="Success Response",
+                        value=(
+                            'http_requests_total{view="user-search",method="GET",status="200"} 1520\n'
+                            'http_request_duration_seconds_bucket{view="user-search",method="GET",le="0.05"} 1490\n'
+                        )
+                    )
+                ]
+            ),
+            status.HTTP_403_FORBIDDEN: OpenApiResponse(description="Not a staff user."),
+        }
+    )
+
@@ -0,0 +1,359 @@
+import asyncio
+import io
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import namedtuple
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from common.benchmark import summarize
+from common.metrics import metrics_registry
+from core.models import User
+from skills.models import Skill, UserSkill
+from work.models import WorkExperience
+
+PASSWORD = 'Bench-password-1!'
+MODES = ('wsgi', 'asgi', 'asgi-async')
+# Default share of each operation in the traffic mix.
+DEFAULT_MIX = {
+    'register': 1, 'login': 1, 'profile': 10, 'skill-add': 3, 'skill-list': 10, 'user-skill-list': 5,
+    'search': 5, 'work-create': 3, 'work-list': 5, 'work-detail': 3, 'work-edit': 2, 'work-delete': 1,
+}
+# URL names of the async views used in ``asgi-async`` mode, see ``core.async_views`` and friends.
+ASYNC_VIEWS = {
+    'registration': 'async-registration', 'login': 'async-login', 'user_profile': 'async-user-profile',
+    'skill-list': 'async-skill-list', 'user-skill-list': 'async-user-skill-list', 'user-search': 'async-user-search',
+    'work-experience-list': 'async-work-experience-list', 'work-experience-detail': 'async-work-experience-detail',
+}
+
+Request = namedtuple('Request', 'operation url_name method path query body token')
+
+
+class VirtualClient:
+    """One synthetic user sending the operations of the traffic mix in random order, one at a time."""
+
+    def __init__(self, run, user, skills, mix, rng, async_views):
+        self.run = run
+        self.user = user
+        self.token = str(AccessToken.for_user(user))
+        self.skills = skills
+        self.operations, self.weights = list(mix), list(mix.values())
+        self.rng = rng
+        self.async_views = async_views
+        self.experiences = []
+        self.registrations = 0
+
+    def request(self, operation, url_name, method='GET', args=(), query='', data=None, token=True):
+        if self.async_views:
+            url_name = ASYNC_VIEWS.get(url_name, url_name)
+        body = json.dumps(data).encode() if data is not None else b''
+        return Request(operation, url_name, method, reverse(url_name, args=args), query, body,
+                       self.token if token else None)
+
+    def next_request(self):
+        operation = self.rng.choices(self.operations, self.weights)[0]
+        if operation in ('work-detail', 'work-edit', 'work-delete') and not self.experiences:
+            operation = 'work-create'
+
+        if operation == 'register':
+            self.registrations += 1
+            email = f'bench-{self.run}-{self.user.pk.hex[:8]}-{self.registrations}@example.com'
+            return self.request(operation, 'registration', 'POST', token=False, data={
+                'email': email, 'name': 'Bench User', 'phone': '+1234567890', 'password': PASSWORD,
+            })
+        if operation == 'login':
+            return self.request(operation, 'login', 'POST', token=False,
+                                data={'email': self.user.email, 'password': PASSWORD})
+        if operation == 'profile':
+            return self.request(operation, 'user_profile')
+        if operation == 'skill-add':
+            return self.request(operation, 'add-user-skill', 'POST', data={'skill': self.rng.choice(self.skills)})
+        if operation == 'skill-list':
+            return self.request(operation, 'skill-list')
+        if operation == 'user-skill-list':
+            return self.request(operation, 'user-skill-list')
+        if operation == 'search':
+            return self.request(operation, 'user-search', query=f'skills={self.rng.choice(self.skills)}')
+        if operation == 'work-create':
+            start = date(2000, 1, 1) + timedelta(days=self.rng.randrange(8000))
+            return self.request(operation, 'work-experience-create', 'POST', data={
+                'job_title': 'Engineer', 'company_name': 'Bench', 'location': 'Remote',
+                'job_type': WorkExperience.FULL_TIME, 'start_date': start.isoformat(),
+            })
+        if operation == 'work-list':
+            return self.request(operation, 'work-experience-list')
+        pk = self.rng.choice(self.experiences)
+        if operation == 'work-detail':
+            return self.request(operation, 'work-experience-detail', args=[pk])
+        if operation == 'work-edit':
+            return self.request(operation, 'work-experience-edit', 'PUT', args=[pk], data={'job_title': 'Lead'})
+        return self.request(operation, 'work-experience-delete', 'DELETE', args=[pk])
+
+    def handle_response(self, request, status, body):
+        if request.operation == 'work-create' and status == 201:
+            self.experiences.append(json.loads(body)['id'])
+        elif request.operation == 'work-delete' and status == 204:
+            self.experiences.remove(request.path.rstrip('/').split('/')[-2])
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.statuses = {}
+        self.views = {}
+
+    def record(self, request, status, seconds):
+        with self.lock:
+            self.views[request.operation] = (request.url_name, request.method)
+            self.samples.setdefault(request.operation, []).append(seconds)
+            statuses = self.statuses.setdefault(request.operation, {})
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+
+def wsgi_environ(request):
+    environ = {
+        'REQUEST_METHOD': request.method, 'PATH_INFO': request.path, 'QUERY_STRING': request.query,
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'REMOTE_ADDR': '127.0.0.1',
+        'CONTENT_TYPE': 'application/json', 'CONTENT_LENGTH': str(len(request.body)),
+        'wsgi.input': io.BytesIO(request.body), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0), 'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+    if request.token:
+        environ['HTTP_AUTHORIZATION'] = f'Bearer {request.token}'
+    return environ
+
+
+def asgi_scope(request):
+    headers = [(b'host', b'localhost'), (b'content-type', b'application/json'),
+               (b'content-length', str(len(request.body)).encode())]
+    if request.token:
+        headers.append((b'authorization', f'Bearer {request.token}'.encode()))
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'scheme': 'http',
+        'method': request.method, 'path': request.path, 'raw_path': request.path.encode(),
+        'query_string': request.query.encode(), 'headers': headers, 'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a dataset and drive a mix of synthetic API traffic (register, login, profile, skills, search and '
+        'work experience CRUD) through the WSGI and ASGI handlers in-process; reports throughput, latency '
+        'percentiles and queries per request per operation as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', default=','.join(MODES),
+                            help=f'Comma separated: {", ".join(MODES)} (ASGI with the async views where there are)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Synthetic users sending requests at once')
+        parser.add_argument('--duration', type=float, default=10.0, help='Measured seconds per mode')
+        parser.add_argument('--warmup', type=float, default=2.0, help='Unmeasured seconds before each mode')
+        parser.add_argument('--users', type=int, default=1000, help='Seeded users (at least --concurrency)')
+        parser.add_argument('--skills', type=int, default=50, help='Seeded skills')
+        parser.add_argument('--skills-per-user', type=int, default=5)
+        parser.add_argument('--experiences-per-user', type=int, default=3)
+        parser.add_argument('--mix', default='',
+                            help='Operation weights overriding the defaults, e.g. "login=0,search=20"')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed of the dataset and the traffic')
+        parser.add_argument('--output', help='Also write the report to this file')
+
+    def handle(self, *args, **options):
+        modes = [mode for mode in options['modes'].split(',') if mode]
+        if set(modes) - set(MODES):
+            raise CommandError(f'Unknown mode(s): {", ".join(sorted(set(modes) - set(MODES)))}.')
+        if options['users'] < options['concurrency']:
+            raise CommandError('--users must be at least --concurrency.')
+        mix = self.parse_mix(options['mix'])
+
+        report = {
+            'commit': self.commit(),
+            'options': {key: options[key] for key in (
+                'concurrency', 'duration', 'users', 'skills', 'skills_per_user', 'experiences_per_user', 'seed')},
+            'mix': mix,
+            'modes': {},
+        }
+        # Keep the benchmark's requests out of the workers' metrics files.
+        with override_settings(METRICS_DIR=''):
+            for mode in modes:
+                run = uuid.uuid4().hex[:8]
+                try:
+                    clients = self.seed(run, mix, mode == 'asgi-async', options)
+                    report['modes'][mode] = self.run_mode(mode, clients, options)
+                finally:
+                    self.cleanup(run)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
+
+    @staticmethod
+    def parse_mix(value):
+        mix = dict(DEFAULT_MIX)
+        for item in filter(None, value.split(',')):
+            name, _, weight = item.partition('=')
+            if name not in mix or not weight.isdigit():
+                raise CommandError(f'Invalid mix entry "{item}"; operations: {", ".join(DEFAULT_MIX)}.')
+            mix[name] = int(weight)
+        mix = {name: weight for name, weight in mix.items() if weight}
+        if not mix:
+            raise CommandError('The traffic mix is empty.')
+        return mix
+
+    @staticmethod
+    def commit():
+        try:
+            result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                                    capture_output=True, text=True, timeout=10)
+        except OSError:
+            return None
+        return result.stdout.strip() or None
+
+    def seed(self, run, mix, async_views, options):
+        rng = random.Random(options['seed'])
+        skills = Skill.objects.bulk_create([Skill(name=f'bench{run} skill {i}') for i in range(options['skills'])])
+        # One hash for everyone: hashing a password per seeded user would take minutes.
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create([
+            User(email=f'bench-{run}-{i}@example.com', name=f'Bench User {i}', password=password)
+            for i in range(options['users'])
+        ])
+        UserSkill.objects.bulk_create([
+            UserSkill(user=user, skill=skill)
+            for user in users for skill in rng.sample(skills, min(options['skills_per_user'], len(skills)))
+        ])
+        WorkExperience.objects.bulk_create([
+            WorkExperience(user=user, job_title='Engineer', company_name='Bench', location='Remote',
+                           job_type=rng.choice(WorkExperience.JOB_TYPES)[0],
+                           start_date=date(2000, 1, 1) + timedelta(days=rng.randrange(8000)))
+            for user in users for _ in range(options['experiences_per_user'])
+        ])
+        names = [skill.name for skill in skills]
+        return [VirtualClient(run, user, names, mix, random.Random(options['seed'] + i), async_views)
+                for i, user in enumerate(users[:options['concurrency']])]
+
+    @staticmethod
+    def cleanup(run):
+        User.objects.filter(email__startswith=f'bench-{run}-').delete()
+        Skill.objects.filter(name__startswith=f'bench{run} ').delete()
+
+    def run_mode(self, mode, clients, options):
+        drive = self.drive_wsgi if mode == 'wsgi' else self.drive_asgi
+        drive(clients, options['warmup'], Recorder())
+        metrics_registry.reset()
+        recorder = Recorder()
+        elapsed = drive(clients, options['duration'], recorder)
+        return self.summarize_mode(recorder, elapsed)
+
+    def drive_wsgi(self, clients, duration, recorder):
+        """Every client on its own thread, calling the WSGI handler like a threaded WSGI server."""
+        handler = WSGIHandler()
+        deadline = time.monotonic() + duration
+
+        def client_loop(client):
+            while time.monotonic() < deadline:
+                request = client.next_request()
+                started = time.perf_counter()
+                response_status = []
+                response = handler(wsgi_environ(request), lambda status, headers: response_status.append(status))
+                try:
+                    body = b''.join(response)
+                finally:
+                    response.close()
+                recorder.record(request, int(response_status[0].split()[0]), time.perf_counter() - started)
+                client.handle_response(request, int(response_status[0].split()[0]), body)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client_loop, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    def drive_asgi(self, clients, duration, recorder):
+        """Every client as a task on one event loop, calling the ASGI handler like an ASGI server."""
+        handler = ASGIHandler()
+
+        async def call(request):
+            body_sent, response = False, {'body': []}
+
+            async def receive():
+                nonlocal body_sent
+                if not body_sent:
+                    body_sent = True
+                    return {'type': 'http.request', 'body': request.body, 'more_body': False}
+                # Never disconnects; Django cancels this once the response is sent.
+                await asyncio.Future()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    response['status'] = message['status']
+                elif message['type'] == 'http.response.body':
+                    response['body'].append(message.get('body', b''))
+
+            await handler(asgi_scope(request), receive, send)
+            return response['status'], b''.join(response['body'])
+
+        async def client_loop(client, deadline):
+            while time.monotonic() < deadline:
+                request = client.next_request()
+                started = time.perf_counter()
+                status, body = await call(request)
+                recorder.record(request, status, time.perf_counter() - started)
+                client.handle_response(request, status, body)
+
+        async def main():
+            deadline = time.monotonic() + duration
+            await asyncio.gather(*(client_loop(client, deadline) for client in clients))
+
+        started = time.perf_counter()
+        asyncio.run(main())
+        return time.perf_counter() - started
+
+    @staticmethod
+    def summarize_mode(recorder, elapsed):
+        # Queries per request come from the metrics middleware, by URL name and method.
+        queries = {}
+        for (name, labels, _), values in metrics_registry.collect()[1].items():
+            if name == 'http_request_db_queries':
+                labels = dict(labels)
+                queries[(labels['view'], labels['method'])] = (values[-2], values[-1])
+
+        operations = {}
+        for operation, samples in sorted(recorder.samples.items()):
+            total, count = queries.get(recorder.views[operation], (0, 0))
+            operations[operation] = {
+                'requests': len(samples),
+                'throughput_rps': round(len(samples) / elapsed, 1),
+                'statuses': recorder.statuses[operation],
+                'latency': summarize(samples),
+                'queries_per_request': round(total / count, 2) if count else None,
+            }
+        all_samples = [sample for samples in recorder.samples.values() for sample in samples]
+        query_total = sum(total for total, _ in queries.values())
+        query_count = sum(count for _, count in queries.values())
+        return {
+            'requests': len(all_samples),
+            'throughput_rps': round(len(all_samples) / elapsed, 1),
+            'errors': sum(count for statuses in recorder.statuses.values()
+                          for status, count in statuses.items() if status.startswith('5')),
+            'latency': summarize(all_samples),
+            'queries_per_request': round(query_total / query_count, 2) if query_count else None,
+            'operations': operations,
+        }
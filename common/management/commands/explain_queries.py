@@ -0,0 +1,168 @@
+import json
+from contextlib import ExitStack
+from functools import partial
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Count, Exists, OuterRef
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from core.models import User
+from skills.models import Skill, UserInterest, UserSkill
+from work.models import WorkExperience
+
+
+def record_select(queries, alias, execute, sql, params, many, context):
+    """Database execute wrapper collecting the ``SELECT`` statements of the explained requests."""
+    # ``UNION`` statements start with a parenthesis.
+    if not many and sql.lstrip(' (').upper().startswith(('SELECT', 'WITH')):
+        queries.append((alias, sql, params))
+    return execute(sql, params, many, context)
+
+
+def scans(plan):
+    """
+    The ``(node type, relation, index, searched)`` of every node of a JSON plan that reads a
+    relation; ``searched`` tells whether an index condition narrowed the read down.
+    """
+    found = []
+    if 'Relation Name' in plan:
+        searched = 'Index Cond' in plan or 'Recheck Cond' in plan
+        found.append((plan['Node Type'], plan['Relation Name'], plan.get('Index Name'), searched))
+    for child in plan.get('Plans', []):
+        found.extend(scans(child))
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the read endpoints once as a seeded user and EXPLAIN ANALYZE every SELECT they send. Fails if a "
+        "query scans a table of at least --min-rows rows sequentially because no index can serve it; with "
+        "--strict also if the planner merely preferred the sequential scan over an index"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=0,
+                            help='Generate this many synthetic users first (see generate_users)')
+        parser.add_argument('--min-rows', type=int, default=1000,
+                            help='Sequential scans of tables with fewer (estimated) rows are accepted')
+        parser.add_argument('--strict', action='store_true',
+                            help='Also fail on sequential scans the planner chose although an index was usable')
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'postgresql':
+            raise CommandError('explain_queries needs PostgreSQL.')
+        if options['users']:
+            call_command('generate_users', users=options['users'], stdout=self.stdout)
+
+        user = User.objects.filter(
+            Exists(UserSkill.objects.filter(user=OuterRef('pk'))),
+            Exists(UserInterest.objects.filter(user=OuterRef('pk'))),
+            Exists(WorkExperience.objects.filter(user=OuterRef('pk'))),
+        ).first()
+        if user is None:
+            raise CommandError('No user with skills, interests and work experiences; seed with --users.')
+
+        table_rows = self.table_rows()
+        if max(table_rows.values(), default=0) < options['min_rows']:
+            self.stdout.write(self.style.WARNING(
+                f'No table has {options["min_rows"]} rows, so the plans are not representative; seed with --users.'
+            ))
+
+        failures, preferred = [], []
+        for name, (url, query) in self.endpoints(user).items():
+            for alias, sql, params in self.run_request(user, url, query, name):
+                plan = self.plan(alias, sql, params)
+                nodes = scans(plan['Plan'])
+                large = {relation for node_type, relation, _, _ in nodes
+                         if node_type == 'Seq Scan' and table_rows.get(relation, 0) >= options['min_rows']}
+                # Plan again with sequential scans disabled: a table still read without an index condition
+                # (sequentially or as a full index scan) has no index for the query.
+                unindexed = large - {relation for _, relation, _, searched
+                                     in scans(self.plan(alias, sql, params, False)['Plan']) if searched} if large else set()
+                summary = ', '.join(f'{node_type} on {relation}' + (f' using {index}' if index else '')
+                                    for node_type, relation, index, _ in nodes) or 'no table'
+                line = f'  {plan["Execution Time"]:.2f}ms: {summary}'
+                self.stdout.write(self.style.ERROR(line) if unindexed else self.style.WARNING(line) if large else line)
+                if options['verbosity'] >= 2:
+                    self.stdout.write(f'    [{alias}] {sql} {params!r}')
+                for relation in sorted(large):
+                    message = f'{name}: sequential scan of {relation} (~{table_rows[relation]} rows)'
+                    if relation in unindexed:
+                        failures.append(f'{message}, no usable index')
+                    else:
+                        preferred.append(f'{message}, preferred by the planner over an index')
+
+        for message in preferred:
+            self.stdout.write(self.style.WARNING(message))
+        if options['strict']:
+            failures.extend(preferred)
+        if failures:
+            raise CommandError('Queries use sequential scans:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('No sequential scans of large tables without a usable index.'))
+
+    @staticmethod
+    def table_rows():
+        """Estimated rows per table, as maintained by ``ANALYZE``/autovacuum."""
+        with connections['default'].cursor() as cursor:
+            cursor.execute(
+                "SELECT relname, reltuples::bigint FROM pg_class "
+                "WHERE relkind IN ('r', 'p') AND relnamespace = 'public'::regnamespace"
+            )
+            return dict(cursor.fetchall())
+
+    @staticmethod
+    def endpoints(user):
+        """
+        The explained requests by name. Search filters use the rarest skill and job type, the
+        selective case indexes are for; a filter most users match is read best sequentially.
+        """
+        skill_counts = list(
+            Skill.objects.annotate(users=Count('userskill')).filter(users__gt=0).order_by('users', 'name')
+            .values_list('name', flat=True)
+        )
+        rare, common = skill_counts[0], skill_counts[-1]
+        job_type = (WorkExperience.objects.values_list('job_type', flat=True).annotate(count=Count('id'))
+                    .order_by('count').first())
+        experience = WorkExperience.objects.filter(user=user).values_list('id', flat=True).first()
+        return {
+            'profile': (reverse('user_profile'), {}),
+            'skills': (reverse('skill-list'), {}),
+            'interests': (reverse('predefined-interests'), {}),
+            'user-skills': (reverse('user-skill-list'), {}),
+            'user-interests': (reverse('user-interests'), {}),
+            'work-experiences': (reverse('work-experience-list'), {}),
+            'work-experience': (reverse('work-experience-detail', args=[experience]), {}),
+            'search-skills': (reverse('user-search'), {'skills': rare}),
+            'search-job-type': (reverse('user-search'), {'job_type': job_type}),
+            'search-boolean': (reverse('user-search'), {'q': f'{rare} AND NOT {common}'}),
+            'facets': (reverse('user-search-facets'), {'skills': rare}),
+        }
+
+    def run_request(self, user, url, query, name):
+        """Request ``url`` as ``user`` and return the ``(alias, sql, params)`` of every SELECT it sent."""
+        queries = []
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        # An empty private cache, so cached pages and facets do not hide their queries.
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                                   'LOCATION': 'explain-queries'}}), ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(partial(record_select, queries, alias)))
+            response = client.get(url, query)
+        self.stdout.write(f'{name}: GET {url} {query or ""} -> {response.status_code}, {len(queries)} SELECTs')
+        return queries
+
+    @staticmethod
+    def plan(alias, sql, params, seqscan=True):
+        """The JSON plan of a statement: executed (EXPLAIN ANALYZE), or only planned with sequential scans disabled."""
+        explain = 'EXPLAIN (ANALYZE, FORMAT JSON)' if seqscan else 'EXPLAIN (FORMAT JSON)'
+        # EXPLAIN ANALYZE runs the statement; roll back whatever it might have locked.
+        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+            if not seqscan:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'{explain} {sql}', params)
+            plan = cursor.fetchone()[0]
+            transaction.set_rollback(True, using=alias)
+        return (json.loads(plan) if isinstance(plan, str) else plan)[0]
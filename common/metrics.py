@@ -0,0 +1,229 @@
+"""
+Request metrics aggregated across worker processes.
+
+Every process counts into an in-memory registry and writes a snapshot of it to its own
+file in ``METRICS_DIR`` at most every ``METRICS_FLUSH_INTERVAL`` seconds (atomically, via
+rename). A scrape adds up the files of all workers, with the scraping process's own live
+numbers in place of its file, so no locking between processes is needed. Files of exited
+workers are kept, so counters do not go backwards; clear the directory on deploys.
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# name: (type, help); histograms also have the ``_bucket``, ``_sum`` and ``_count`` series.
+METRICS = {
+    'http_requests_total': ('counter', 'Requests served, by URL name, method and status code.'),
+    'http_request_duration_seconds': ('histogram', 'Request latency in seconds, by URL name and method.'),
+    'http_request_db_queries': ('histogram', 'SQL queries per request, by URL name and method.'),
+}
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_queries = ContextVar('request_queries', default=None)
+
+
+def query_counter(execute, sql, params, many, context):
+    """Database execute wrapper counting the queries of the current request, see ``MetricsMiddleware``."""
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """``connection_created`` receiver: count the queries of every connection."""
+    if query_counter not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_counter)
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms keyed by metric name and label values. Histograms keep one
+    count per bucket (not cumulative) followed by the sum and the count of the observations.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.pid = os.getpid()
+            self.file_name = f'{self.pid}-{uuid.uuid4().hex[:8]}.json'
+            self.counters = {}
+            self.histograms = {}
+            self.flushed_at = 0.0
+
+    def _check_fork(self):
+        # A forked worker starts from zero in a file of its own; the parent's counts are in the parent's file.
+        if os.getpid() != self.pid:
+            self.reset()
+
+    def inc(self, name, labels, value=1):
+        self._check_fork()
+        key = (name, tuple(labels.items()))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        self._check_fork()
+        key = (name, tuple(labels.items()), tuple(buckets))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                # One count per bucket plus ``+Inf``, then the sum and the count.
+                histogram = self.histograms[key] = [0] * (len(buckets) + 3)
+            histogram[bisect.bisect_left(buckets, value)] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), list(buckets), list(histogram)]
+                               for (name, labels, buckets), histogram in self.histograms.items()],
+            }
+
+    def path(self):
+        return os.path.join(settings.METRICS_DIR, self.file_name) if settings.METRICS_DIR else None
+
+    def flush(self, force=False):
+        """Write this process's snapshot, at most every ``METRICS_FLUSH_INTERVAL`` seconds unless forced."""
+        path = self.path()
+        now = time.monotonic()
+        if path is None or (not force and now - self.flushed_at < settings.METRICS_FLUSH_INTERVAL):
+            return
+        self.flushed_at = now
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temporary, path)
+
+    def collect(self):
+        """The snapshots of every worker, this process's being live."""
+        self._check_fork()
+        snapshots = [self.snapshot()]
+        directory = settings.METRICS_DIR
+        if directory and os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if not name.endswith('.json') or name == self.file_name:
+                    continue
+                try:
+                    with open(os.path.join(directory, name)) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    # Removed or being replaced meanwhile.
+                    continue
+        return merge(snapshots)
+
+
+def merge(snapshots):
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, buckets, values in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)), tuple(buckets))
+            merged = histograms.setdefault(key, [0] * len(values))
+            if len(merged) == len(values):
+                for index, value in enumerate(values):
+                    merged[index] += value
+    return counters, histograms
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(counters, histograms):
+    """Render merged metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_labels(labels)} {_number(value)}')
+            continue
+        for (metric, labels, buckets), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip([*buckets, '+Inf'], values):
+                cumulative += count
+                le = bound if bound == '+Inf' else _number(float(bound))
+                lines.append(f'{name}_bucket{_labels(labels, le=le)} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(float(values[-2]))}')
+            lines.append(f'{name}_count{_labels(labels)} {values[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+metrics_registry = MetricsRegistry()
+atexit.register(lambda: metrics_registry.flush(force=True))
+
+
+def record_request(request, response, seconds, queries):
+    match = getattr(request, 'resolver_match', None)
+    view = match.url_name if match is not None and match.url_name else 'unmatched'
+    labels = {'view': view, 'method': request.method}
+    metrics_registry.inc('http_requests_total', {**labels, 'status': str(response.status_code)})
+    metrics_registry.observe('http_request_duration_seconds', labels, seconds, settings.METRICS_LATENCY_BUCKETS)
+    metrics_registry.observe('http_request_db_queries', labels, queries, settings.METRICS_QUERY_BUCKETS)
+    metrics_registry.flush()
+
+
+class MetricsMiddleware:
+    """
+    Records the latency, status code and SQL query count of every request, labeled by URL
+    name, in ``metrics_registry``; served by ``MetricsView``. The body of streaming responses
+    is produced afterwards, so only the time until the first byte is covered.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started, token = time.perf_counter(), _queries.set([0])
+        try:
+            response = self.get_response(request)
+            record_request(request, response, time.perf_counter() - started, _queries.get()[0])
+            return response
+        finally:
+            _queries.reset(token)
+
+    async def __acall__(self, request):
+        started, token = time.perf_counter(), _queries.set([0])
+        try:
+            response = await self.get_response(request)
+            record_request(request, response, time.perf_counter() - started, _queries.get()[0])
+            return response
+        finally:
+            _queries.reset(token)
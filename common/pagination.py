@@ -0,0 +1,156 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a stable ordering key.
+
+    The cursor is an opaque encoding of the ordering values of the last row on the page.
+    The next page is fetched with a range condition on those values instead of an
+    ``OFFSET``, so deep pages cost the same as the first one. The ordering must end with
+    a unique field (usually the UUID ``id``) to be stable.
+
+    The ordering is taken from the queryset when it is explicitly ordered, otherwise from
+    the view's ``pagination_ordering`` attribute, and defaults to ``('id',)``.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+    default_ordering = ('id',)
+
+    def __init__(self):
+        self.page_size = api_settings.PAGE_SIZE
+        self.max_page_size = settings.MAX_PAGE_SIZE
+        self.next_url = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, page_size, ordering = self.page_queryset(queryset, request, view)
+        return self.get_page(list(queryset), page_size, ordering)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset, page_size, ordering = self.page_queryset(queryset, request, view)
+        return self.get_page([row async for row in queryset], page_size, ordering)
+
+    def page_queryset(self, queryset, request, view):
+        """Return the query of the requested page plus one row, which tells whether there is a next page."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        ordering = self.get_ordering(queryset, view)
+
+        position = self.decode_cursor(request, ordering, queryset)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(ordering, position))
+        return queryset.order_by(*ordering)[:page_size + 1], page_size, ordering
+
+    def get_page(self, rows, page_size, ordering):
+        page = rows[:page_size]
+        if len(rows) > page_size:
+            self.next_url = self.encode_cursor(ordering, page[-1])
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.next_url, 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Number of results to return per page (at most {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, queryset, view):
+        if queryset.query.order_by:
+            return tuple(queryset.query.order_by)
+        return tuple(getattr(view, 'pagination_ordering', self.default_ordering))
+
+    @staticmethod
+    def keyset_filter(ordering, position):
+        """
+        Build the row-value comparison ``(a, b, c) > (x, y, z)`` for a mixed-direction
+        ordering as ``a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)``.
+        """
+        query = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            query |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return query
+
+    @staticmethod
+    def ordering_field(queryset, name):
+        """The model field (or annotation output field) an ordering term refers to."""
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        model = queryset.model
+        *relations, name = name.split('__')
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(name)
+
+    def decode_cursor(self, request, ordering, queryset):
+        """
+        The ordering values of the cursor in ``request``, converted with the fields of ``queryset``
+        they order by, so a tampered cursor is a 404 and never reaches the query.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (UnicodeEncodeError, binascii.Error, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [self.ordering_field(queryset, field.lstrip('-')).to_python(value)
+                    if value is not None else None for field, value in zip(ordering, position)]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, ordering, instance):
+        position = [getattr(instance, field.lstrip('-')) for field in ordering]
+        encoded = base64.urlsafe_b64encode(json.dumps(position, cls=DjangoJSONEncoder).encode('utf-8'))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded.decode('ascii'))
@@ -0,0 +1,149 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.permissions import SAFE_METHODS
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_reads_enabled():
+    """Whether reads in the current request (or task) may go to a replica."""
+    return _replica_reads.get()
+
+
+@contextmanager
+def read_from_replicas():
+    token = _replica_reads.set(bool(settings.DATABASE_REPLICAS))
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+# A user who wrote recently is pinned twice: by a signed cookie carrying their id, which travels with
+# browsers, and by an entry in the shared cache, for clients that send a bearer token but no cookies.
+PIN_COOKIE = 'primary_pin'
+_PIN_SALT = 'common.routing.pin'
+
+
+def pin_cache_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def _set_pin_cookie(request, response):
+    response.set_signed_cookie(PIN_COOKIE, str(request.user.pk), salt=_PIN_SALT,
+                               max_age=settings.DB_REPLICA_PIN_SECONDS, secure=request.is_secure(),
+                               httponly=True, samesite='Lax')
+
+
+def _has_pin_cookie(request):
+    # The signature's timestamp bounds the pin even if a client keeps the cookie longer.
+    user_id = request.get_signed_cookie(PIN_COOKIE, default=None, salt=_PIN_SALT,
+                                        max_age=settings.DB_REPLICA_PIN_SECONDS)
+    return user_id is not None and user_id == str(request.user.pk)
+
+
+def pin_to_primary(request, response):
+    """Serve the user of ``request`` from the primary for ``DB_REPLICA_PIN_SECONDS``, so they see their writes."""
+    _set_pin_cookie(request, response)
+    cache.set(pin_cache_key(request.user.pk), True, settings.DB_REPLICA_PIN_SECONDS)
+
+
+async def apin_to_primary(request, response):
+    _set_pin_cookie(request, response)
+    await cache.aset(pin_cache_key(request.user.pk), True, settings.DB_REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(request):
+    return _has_pin_cookie(request) or cache.get(pin_cache_key(request.user.pk), False)
+
+
+async def ais_pinned_to_primary(request):
+    return _has_pin_cookie(request) or await cache.aget(pin_cache_key(request.user.pk), False)
+
+
+class ReplicaRouter:
+    """
+    Sends reads to a random replica (``DATABASE_REPLICAS``) while ``read_from_replicas`` is
+    active, everything else to the primary. Reads inside an atomic block on the primary stay
+    on the primary, so a transaction sees its own writes; writes always go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """
+    For read-only API views: safe requests run their queries on a replica, unless the user
+    wrote something in the last ``DB_REPLICA_PIN_SECONDS`` (read-your-writes). Authentication
+    and permission checks still read from the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        user = request.user
+        if request.method in SAFE_METHODS and settings.DATABASE_REPLICAS \
+                and not (user.is_authenticated and is_pinned_to_primary(request)):
+            self._replica_reads_token = _replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_reads_token', None)
+        if token is not None:
+            self._replica_reads_token = None
+            if response.streaming:
+                # A streamed body is read from the database while it is sent, after the view returned.
+                response._resource_closers.append(lambda: _reset_replica_reads(token))
+            else:
+                _replica_reads.reset(token)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+def _reset_replica_reads(token):
+    try:
+        _replica_reads.reset(token)
+    except ValueError:
+        # Closed in a copy of the request's context (ASGI closes on a thread), which ends with the request anyway.
+        pass
+
+
+def _wrote(request, response):
+    user = getattr(request, 'user', None)
+    return (settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS and response.status_code < 400
+            and user is not None and user.is_authenticated)
+
+
+@sync_and_async_middleware
+def replica_pin_middleware(get_response):
+    """Pin users to the primary after a successful write request, see ``ReplicaReadMixin``."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            response = await get_response(request)
+            if _wrote(request, response):
+                await apin_to_primary(request, response)
+            return response
+    else:
+        def middleware(request):
+            response = get_response(request)
+            if _wrote(request, response):
+                pin_to_primary(request, response)
+            return response
+    return middleware
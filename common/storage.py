@@ -0,0 +1,76 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+# ``ab/cd/<sha256><ext>``, the names ``LocalMediaStorage`` gives its files.
+CONTENT_NAME = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/(?P<digest>\1\2[0-9a-f]{60})(\.[a-z0-9]{1,10})?$')
+
+
+class LocalMediaStorage(FileSystemStorage):
+    """
+    Local disk storage with a content-addressed layout, a drop-in for the Cloudinary storage.
+
+    A file is stored as ``ab/cd/<sha256><ext>`` whatever name it was saved under, so identical
+    content is stored once and the content behind a name never changes. That is what lets
+    ``common.views.serve_media`` answer with a strong ETag (the digest) and cache headers
+    that never expire. Use it with ``MEDIA_STORAGE=common.storage.LocalMediaStorage``.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in ``_save``; an existing file with it has the same content.
+        return name
+
+    def _save(self, name, content):
+        os.makedirs(self.location, exist_ok=True)
+        digest = hashlib.sha256()
+        # Hash while streaming to a temporary file next to the target, so the content is read once.
+        fd, temporary = tempfile.mkstemp(dir=self.location, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    f.write(chunk)
+            name = content_name(digest.hexdigest(), name)
+            path = self.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.chmod(temporary, self.file_permissions_mode if self.file_permissions_mode is not None else 0o644)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        return name
+
+    def digest(self, name):
+        """The SHA-256 of the content stored under ``name``, or ``None`` if it is not a content address."""
+        match = CONTENT_NAME.match(name)
+        return match.group('digest') if match else None
+
+
+class UploadStagingStorage(FileSystemStorage):
+    """
+    Local disk under ``UPLOAD_STAGING_ROOT`` for uploads waiting for background processing, so
+    the raw upload never goes to the media storage: only what the worker produces does. The
+    directory is read from the setting on every access, so tests can override it.
+    """
+
+    @property
+    def base_location(self):
+        return settings.UPLOAD_STAGING_ROOT
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+
+def content_name(digest, original_name):
+    extension = os.path.splitext(original_name)[1].lower()
+    if not re.fullmatch(r'\.[a-z0-9]{1,10}', extension):
+        extension = ''
+    return f'{digest[:2]}/{digest[2:4]}/{digest}{extension}'
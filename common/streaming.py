@@ -0,0 +1,77 @@
+import itertools
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.fields import BooleanField
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renders newline delimited JSON.
+
+    Lists become one line per item; anything else (e.g. error payloads) a single line.
+    Large results are not rendered through here but streamed with ``stream_ndjson``.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return ''.join(ndjson_lines(items)).encode(self.charset)
+
+
+def stream_requested(request):
+    """Whether the ``stream`` query parameter is a true value (``1``, ``true``, ``yes``, ...), not merely present."""
+    return request.query_params.get('stream') in BooleanField.TRUE_VALUES
+
+
+def ndjson_lines(items):
+    for item in items:
+        yield json.dumps(item, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+def stream_ndjson(objects, serializer_class, chunk_size=None):
+    """
+    Serialize ``objects`` ``chunk_size`` rows at a time into a streaming NDJSON response.
+
+    ``objects`` should be lazy (e.g. ``QuerySet.iterator()``) so that neither the rows
+    nor the serialized output are ever held in memory all at once.
+    """
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    objects = iter(objects)
+
+    def content():
+        while True:
+            chunk = list(itertools.islice(objects, chunk_size))
+            if not chunk:
+                return
+            yield _render_chunk(chunk, serializer_class)
+
+    return StreamingHttpResponse(content(), content_type=f'{NDJSONRenderer.media_type}; charset=utf-8')
+
+
+def astream_ndjson(objects, serializer_class, chunk_size=None):
+    """``stream_ndjson`` for an async iterable (e.g. ``QuerySet.aiterator()``), served by ASGI without a thread."""
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+
+    async def content():
+        chunk = []
+        async for obj in objects:
+            chunk.append(obj)
+            if len(chunk) == chunk_size:
+                yield _render_chunk(chunk, serializer_class)
+                chunk = []
+        if chunk:
+            yield _render_chunk(chunk, serializer_class)
+
+    return StreamingHttpResponse(content(), content_type=f'{NDJSONRenderer.media_type}; charset=utf-8')
+
+
+def _render_chunk(chunk, serializer_class):
+    return ''.join(ndjson_lines(serializer_class(chunk, many=True).data)).encode('utf-8')
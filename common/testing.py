@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs the tests with a cache, media and upload staging directories of their own, so they never share entries
+    with a running server or upload to Cloudinary, and without ``METRICS_DIR`` (tests that need
+    it set their own). The cache is file based, so it is shared like in production and passes
+    ``common.checks``.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix='gdsc-test-cache-')
+        self.media_dir = tempfile.mkdtemp(prefix='gdsc-test-media-')
+        self.staging_dir = tempfile.mkdtemp(prefix='gdsc-test-uploads-')
+        self.test_settings = override_settings(
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self.cache_dir,
+            }},
+            MEDIA_ROOT=self.media_dir,
+            METRICS_DIR='',
+            STORAGES={**settings.STORAGES, 'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'}},
+            UPLOAD_STAGING_ROOT=self.staging_dir,
+        )
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        shutil.rmtree(self.media_dir, ignore_errors=True)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
+
+
+class QueryBudgetMixin:
+    """
+    Test case mixin that fails when a block runs more than an allowed number of queries.
+
+    Unlike ``assertNumQueries`` the budget is an upper bound, so it guards against N+1
+    regressions without breaking when a query is optimised away.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, limit, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > limit:
+            queries = '\n'.join(
+                f'{number}. {query["sql"]}' for number, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f'{executed} queries executed, {limit} allowed:\n{queries}')
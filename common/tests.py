@@ -1,3 +1,329 @@
-from django.test import TestCase
+import hashlib
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from common.checks import check_shared_cache
+from common.conditional import instance_validators
+from common.metrics import MetricsRegistry, metrics_registry, render_prometheus
+from common.routing import PIN_COOKIE, ReplicaRouter, pin_cache_key, read_from_replicas, replica_reads_enabled
+from common.storage import LocalMediaStorage
+from common.timing import current_timings, timed
+from common.views import parse_range
+from skills.serializers import UserSearchSerializer
+
+
+class LocalMediaStorageTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = self.settings(
+            MEDIA_ROOT=media_root.name,
+            STORAGES={'default': {'BACKEND': 'common.storage.LocalMediaStorage'},
+                      'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.content = bytes(range(256)) * 40
+        self.digest = hashlib.sha256(self.content).hexdigest()
+        self.name = default_storage.save('profile-pictures/avatar.JPG', ContentFile(self.content))
+        self.url = default_storage.url(self.name)
+
+    def test_files_are_stored_by_content(self):
+        self.assertIsInstance(default_storage, LocalMediaStorage)
+        self.assertEqual(self.name, f'{self.digest[:2]}/{self.digest[2:4]}/{self.digest}.jpg')
+        self.assertEqual(default_storage.save('other/name.jpg', ContentFile(self.content)), self.name)
+        self.assertEqual(os.listdir(os.path.dirname(default_storage.path(self.name))), [f'{self.digest}.jpg'])
+        with default_storage.open(self.name) as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_serve_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{self.digest}"')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"{self.digest}"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_serve_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-5:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_accel_redirect(self):
+        with self.settings(MEDIA_ACCEL_REDIRECT='/protected-media/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_unknown_names_are_not_served(self):
+        for url in ['/media/profile-pictures/avatar.jpg', f'/media/{self.name[:-4]}.png', '/media/../settings.py']:
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-', 10), (0, 9))
+        self.assertEqual(parse_range('bytes=5-100', 10), (5, 9))
+        self.assertEqual(parse_range('bytes=-20', 10), (0, 9))
+        self.assertIsNone(parse_range('bytes=0-1,3-4', 10))
+        self.assertIsNone(parse_range(None, 10))
+        self.assertFalse(parse_range('bytes=5-4', 10))
+
+
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        override = self.settings(DATABASE_REPLICAS=['replica_0', 'replica_1'])
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_reads_go_to_primary_by_default(self):
+        self.assertEqual(self.router.db_for_read(None), 'default')
+
+    def test_reads_go_to_replicas_when_enabled(self):
+        with read_from_replicas():
+            self.assertIn(self.router.db_for_read(None), ['replica_0', 'replica_1'])
+        self.assertEqual(self.router.db_for_read(None), 'default')
+
+    def test_transactions_and_writes_use_primary(self):
+        with read_from_replicas(), patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(None), 'default')
+        with read_from_replicas():
+            self.assertEqual(self.router.db_for_write(None), 'default')
+
+    def test_migrations_run_on_primary_only(self):
+        self.assertTrue(self.router.allow_migrate('default', 'core'))
+        self.assertFalse(self.router.allow_migrate('replica_0', 'core'))
+
+
+class ReplicaReadMixinTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email='testuser@example.com', name='Test User')
+        self.client.force_authenticate(user=self.user)
+        self.profile_url = reverse('user_profile')
+
+    def replica_reads_during_get(self):
+        seen = []
+
+        def validators(*args):
+            seen.append(replica_reads_enabled())
+            return instance_validators(*args)
+
+        with patch('core.views.instance_validators', side_effect=validators):
+            self.assertEqual(self.client.get(self.profile_url).status_code, 200)
+        self.assertFalse(replica_reads_enabled())
+        return seen[0]
+
+    def test_reads_use_replicas_only_when_configured(self):
+        self.assertFalse(self.replica_reads_during_get())
+        with self.settings(DATABASE_REPLICAS=['replica_0']):
+            self.assertTrue(self.replica_reads_during_get())
+
+    def test_user_is_pinned_to_primary_after_write(self):
+        with self.settings(DATABASE_REPLICAS=['replica_0'], DB_REPLICA_PIN_SECONDS=60):
+            response = self.client.put(reverse('user_profile_update'), {'name': 'Renamed'}, format='multipart')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(PIN_COOKIE, response.cookies)
+            self.assertFalse(self.replica_reads_during_get())
+            # Another user's pin does not apply.
+            other = get_user_model().objects.create_user(email='other@example.com', name='Other User')
+            self.client.force_authenticate(user=other)
+            self.assertTrue(self.replica_reads_during_get())
+            self.client.force_authenticate(user=self.user)
+            with patch('django.core.signing.time.time', return_value=time.time() + 61):
+                self.assertTrue(self.replica_reads_during_get())
+
+    def test_bearer_token_client_is_pinned_without_cookies(self):
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        with self.settings(DATABASE_REPLICAS=['replica_0'], DB_REPLICA_PIN_SECONDS=60):
+            response = self.client.put(reverse('user_profile_update'), {'name': 'Renamed'}, format='multipart')
+            self.assertEqual(response.status_code, 200)
+            self.client.cookies.clear()
+            self.assertFalse(self.replica_reads_during_get())
+            cache.delete(pin_cache_key(self.user.pk))
+            self.assertTrue(self.replica_reads_during_get())
+
+    def test_streamed_response_reads_from_replicas(self):
+        seen = []
+        to_representation = UserSearchSerializer.to_representation
+
+        def serialize(serializer, instance):
+            seen.append(replica_reads_enabled())
+            return to_representation(serializer, instance)
+
+        with self.settings(DATABASE_REPLICAS=['replica_0']), \
+                patch('common.routing.random.choice', return_value='default'), \
+                patch.object(UserSearchSerializer, 'to_representation', serialize):
+            response = self.client.get(reverse('user-search'), {'stream': 'true'})
+            self.assertIn(b'Test User', b''.join(response.streaming_content))
+        # The body is serialized while it is sent, and the flag is cleared once it was.
+        self.assertEqual(seen, [True])
+        self.assertFalse(replica_reads_enabled())
+
+    def test_forged_pin_is_ignored(self):
+        self.client.cookies[PIN_COOKIE] = str(self.user.pk)
+        with self.settings(DATABASE_REPLICAS=['replica_0']):
+            self.assertTrue(self.replica_reads_during_get())
+
+
+class ServerTimingTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email='testuser@example.com', name='Test User')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def metrics(self, response):
+        return {entry.split(';')[0]: entry for entry in response['Server-Timing'].split(', ')}
+
+    def test_not_sampled_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('user-skill-list')))
+        with timed('db'):
+            self.assertIsNone(current_timings())
+
+    def test_sampled_request_breakdown(self):
+        with self.settings(SERVER_TIMING_SAMPLE_RATE=1), CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get(reverse('user-skill-list'))
+        metrics = self.metrics(response)
+        self.assertEqual(set(metrics), {'auth', 'db', 'serialize', 'render', 'total'})
+        self.assertIn(f'desc="{len(queries)} SQL queries"', metrics['db'])
+
+    def test_async_views_are_timed(self):
+        with self.settings(SERVER_TIMING_SAMPLE_RATE=1):
+            response = self.client.get(reverse('async-user-skill-list'))
+        self.assertEqual(set(self.metrics(response)), {'auth', 'db', 'serialize', 'render', 'total'})
+
+    def test_log_line(self):
+        with self.settings(SERVER_TIMING_SAMPLE_RATE=1, SERVER_TIMING_LOG=True), \
+                self.assertLogs('server_timing', 'INFO') as logs:
+            response = self.client.get(reverse('user-skill-list'))
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['method'], line['path'], line['status']), ('GET', reverse('user-skill-list'), 200))
+        self.assertEqual(set(line['timings']), set(self.metrics(response)))
+
+
+class MetricsTestCase(APITestCase):
+    def setUp(self):
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        override = self.settings(METRICS_DIR=metrics_dir.name, METRICS_LATENCY_BUCKETS=[0.1, 1.0],
+                                 METRICS_QUERY_BUCKETS=[1, 5])
+        override.enable()
+        self.addCleanup(override.disable)
+        metrics_registry.reset()
+        self.user = get_user_model().objects.create_user(email='testuser@example.com', name='Test User')
+        self.client.force_authenticate(user=self.user)
+
+    def test_requires_staff(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    def test_requests_are_recorded_by_url_name(self):
+        self.client.get(reverse('user-skill-list'))
+        self.client.get(reverse('user-skill-list'))
+        self.client.get('/api/v1/no-such-page/')
+        self.user.is_staff = True
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('http_requests_total{view="user-skill-list",method="GET",status="200"} 2\n', body)
+        self.assertIn('http_requests_total{view="unmatched",method="GET",status="404"} 1\n', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="user-skill-list",method="GET",le="+Inf"} 2\n', body)
+        self.assertIn('http_request_duration_seconds_count{view="user-skill-list",method="GET"} 2\n', body)
+        # Two queries per request: the list's validators and page.
+        self.assertIn('http_request_db_queries_bucket{view="user-skill-list",method="GET",le="1.0"} 0\n', body)
+        self.assertIn('http_request_db_queries_bucket{view="user-skill-list",method="GET",le="5.0"} 2\n', body)
+        self.assertIn('http_request_db_queries_sum{view="user-skill-list",method="GET"} 4.0\n', body)
+
+    def test_workers_are_added_up(self):
+        labels = {'view': 'user-search', 'method': 'GET'}
+        workers = [MetricsRegistry(), MetricsRegistry()]
+        for latency, worker in zip([0.05, 2.0], workers):
+            worker.inc('http_requests_total', {**labels, 'status': '200'})
+            worker.observe('http_request_duration_seconds', labels, latency, [0.1, 1.0])
+            worker.flush(force=True)
+        body = render_prometheus(*MetricsRegistry().collect())
+        self.assertIn('http_requests_total{view="user-search",method="GET",status="200"} 2\n', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="user-search",method="GET",le="0.1"} 1\n', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="user-search",method="GET",le="1.0"} 1\n', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="user-search",method="GET",le="+Inf"} 2\n', body)
+        self.assertIn('http_request_duration_seconds_sum{view="user-search",method="GET"} 2.05\n', body)
+
+
+class BenchmarkCommandTestCase(TransactionTestCase):
+    def test_report(self):
+        out = StringIO()
+        # Without register and login, which spend their time hashing passwords.
+        call_command('benchmark', modes='wsgi,asgi-async', duration=0.5, warmup=0, concurrency=2, users=4, skills=3,
+                     mix='register=0,login=0', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report['modes']), {'wsgi', 'asgi-async'})
+        for mode in report['modes'].values():
+            self.assertGreater(mode['requests'], 0)
+            self.assertEqual(mode['errors'], 0)
+            self.assertEqual(set(mode['latency']), {'iterations', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'})
+            self.assertNotIn('login', mode['operations'])
+            self.assertIsNotNone(mode['queries_per_request'])
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class ExplainQueriesCommandTestCase(TestCase):
+    def setUp(self):
+        call_command('generate_users', users=20, passwords=1, workers=1, seed=1, stdout=StringIO())
+        with connections['default'].cursor() as cursor:
+            cursor.execute('ANALYZE skills_skill')
+
+    def test_small_tables_pass(self):
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        output = out.getvalue()
+        self.assertIn('plans are not representative', output)
+        for name in ('profile', 'work-experiences', 'search-job-type', 'facets'):
+            self.assertRegex(output, rf'{name}: GET \S+ .*-> 200, [1-9]\d* SELECTs')
+        self.assertIn('No sequential scans of large tables without a usable index.', output)
+
+    def test_unindexed_sequential_scan_fails(self):
+        # Listing the whole catalog reads every row, which no index condition can narrow down.
+        with self.assertRaisesMessage(CommandError, 'skills: sequential scan of skills_skill'):
+            call_command('explain_queries', min_rows=0, stdout=StringIO())
+
+
+class SharedCacheCheckTestCase(SimpleTestCase):
+    LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+    def test_process_local_cache_is_an_error_without_debug(self):
+        with override_settings(CACHES=self.LOCMEM, DEBUG=False):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['common.E001'])
+        with override_settings(CACHES=self.LOCMEM, DEBUG=True):
+            self.assertEqual(check_shared_cache(None), [])
+
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,164 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger('server_timing')
+
+_timings = ContextVar('server_timings', default=None)
+
+# Metric names and their ``Server-Timing`` descriptions, in header order.
+METRICS = {
+    'auth': 'Authentication',
+    'db': 'SQL queries',
+    'serialize': 'Serializers',
+    'render': 'Rendering',
+    'google': 'Google API',
+    'storage': 'Media storage',
+}
+
+
+class RequestTimings:
+    """Count and total seconds per metric of one sampled request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.metrics = {}
+
+    def add(self, name, seconds):
+        metric = self.metrics.setdefault(name, [0, 0.0])
+        metric[0] += 1
+        metric[1] += seconds
+
+    def as_dict(self):
+        data = {name: {'count': count, 'ms': round(seconds * 1000, 3)} for name, (count, seconds) in self.metrics.items()}
+        data['total'] = {'count': 1, 'ms': round((time.perf_counter() - self.started) * 1000, 3)}
+        return data
+
+    def header(self):
+        entries = []
+        for name, metric in self.as_dict().items():
+            desc = METRICS.get(name, name.capitalize())
+            if name == 'db':
+                desc = f"{metric['count']} {desc}"
+            entries.append(f'{name};dur={metric["ms"]};desc="{desc}"')
+        return ', '.join(entries)
+
+
+def current_timings():
+    """The timings of the current request, ``None`` when it is not sampled."""
+    return _timings.get()
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to metric ``name`` of the current request, if it is sampled."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def query_timer(execute, sql, params, many, context):
+    """Database execute wrapper timing the queries of sampled requests, see ``install_query_timer``."""
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', time.perf_counter() - started)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver: time the queries of every connection."""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def _timed_property(prop, name):
+    return property(lambda self: _timed_call(name, prop.fget, self))
+
+
+def _timed_call(name, func, *args, **kwargs):
+    with timed(name):
+        return func(*args, **kwargs)
+
+
+def instrument_rest_framework():
+    """
+    Time ``.data`` of serializers and ``JSONRenderer.render`` for sampled requests. Serializer
+    time includes the queries it triggers (e.g. of lazy relations), which also count as ``db``.
+    """
+    serializers.Serializer.data = _timed_property(serializers.Serializer.data, 'serialize')
+    serializers.ListSerializer.data = _timed_property(serializers.ListSerializer.data, 'serialize')
+    render = JSONRenderer.render
+    JSONRenderer.render = lambda self, *args, **kwargs: _timed_call('render', render, self, *args, **kwargs)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a ``Server-Timing`` header with the authentication, SQL, serializer, rendering and
+    external call (Google, media storage) time of a ``SERVER_TIMING_SAMPLE_RATE`` share of the
+    requests, and with ``SERVER_TIMING_LOG`` logs them as a JSON line to the ``server_timing``
+    logger. Unsampled requests only pay for a random number. The body of streaming responses
+    is produced after the header is sent, so only the time until the first byte is covered.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        token = _timings.set(RequestTimings())
+        try:
+            return self.report(request, self.get_response(request))
+        finally:
+            _timings.reset(token)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        token = _timings.set(RequestTimings())
+        try:
+            return self.report(request, await self.get_response(request))
+        finally:
+            _timings.reset(token)
+
+    @staticmethod
+    def sampled():
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    @staticmethod
+    def report(request, response):
+        timings = _timings.get()
+        response['Server-Timing'] = timings.header()
+        if settings.SERVER_TIMING_LOG:
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'timings': timings.as_dict(),
+            }))
+        return response
@@ -0,0 +1,118 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views import static
+from django.views.decorators.http import require_safe
+from .storage import LocalMediaStorage
+
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Content-addressed files never change, so clients and proxies may keep them for good.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class FileRange:
+    """Read at most ``length`` bytes of an open file from its current position."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return the ``(start, end)`` byte positions (inclusive) of a single-range ``Range`` header,
+    ``None`` for a header that asks for the whole file or is not understood (multiple ranges,
+    other units) and ``False`` when the range cannot be satisfied.
+    """
+    match = BYTE_RANGE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last ``last`` bytes.
+        length = int(last)
+        return (max(size - length, 0), size - 1) if length and size else False
+    start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+@require_safe
+def serve_media(request, name):
+    """
+    Serve a file of ``LocalMediaStorage`` with its digest as strong ETag, immutable caching
+    and single byte-range support. Files of a plain ``FileSystemStorage`` are only served
+    with ``DEBUG``, as before.
+
+    The body is a ``FileResponse``, which WSGI servers send with ``sendfile()``. With
+    ``MEDIA_ACCEL_REDIRECT`` set, the file is handed to the front proxy instead (nginx
+    ``X-Accel-Redirect`` to that internal location), which also handles ranges itself.
+    """
+    storage = default_storage
+    if not isinstance(storage, LocalMediaStorage):
+        if settings.DEBUG and isinstance(storage, FileSystemStorage):
+            return static.serve(request, name, document_root=settings.MEDIA_ROOT)
+        raise Http404('No such file.')
+    digest = storage.digest(name)
+    if digest is None:
+        raise Http404('No such file.')
+    try:
+        path = storage.path(name)
+    except SuspiciousFileOperation:
+        raise Http404('No such file.')
+
+    etag = quote_etag(digest)
+    headers = {'ETag': etag, 'Cache-Control': IMMUTABLE_CACHE_CONTROL, 'Accept-Ranges': 'bytes'}
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    if settings.MEDIA_ACCEL_REDIRECT:
+        if not os.path.isfile(path):
+            raise Http404('No such file.')
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT.rstrip('/') + '/' + name
+        return response
+
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        raise Http404('No such file.')
+    size = os.fstat(file.fileno()).st_size
+
+    # A stale ``If-Range`` means the client's partial copy is of other content: send everything.
+    if_range = request.META.get('HTTP_IF_RANGE')
+    byte_range = parse_range(request.META.get('HTTP_RANGE'), size) if if_range in (None, etag) else None
+    if byte_range is False:
+        file.close()
+        return HttpResponse(status=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+    if byte_range is None:
+        return FileResponse(file, content_type=content_type, headers=headers)
+
+    start, end = byte_range
+    file.seek(start)
+    response = FileResponse(FileRange(file, end - start + 1), status=206, content_type=content_type, headers=headers)
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,62 @@
+import hashlib
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from common.timing import timed
+from .models import MediaAsset
+
+
+def file_sha256(upload):
+    """The SHA-256 of an uploaded file, read chunk by chunk; the file position is restored."""
+    position = upload.tell()
+    digest = hashlib.sha256()
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    upload.seek(position)
+    return digest.hexdigest()
+
+
+def variant_names(variants):
+    """The storage names in a ``{size: {format: name}}`` mapping of profile picture variants."""
+    return {name for formats in variants.values() for name in formats.values()}
+
+
+def store_asset(data, name):
+    """
+    Store ``data`` under ``name`` and return the stored name, or return the name of an asset
+    with the same content without writing anything. New assets start without references.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    # Touching ``updated_at`` keeps an unreferenced asset from being purged before it is used.
+    if MediaAsset.objects.filter(sha256=digest).update(updated_at=timezone.now()):
+        return MediaAsset.objects.get(sha256=digest).name
+
+    with timed('storage'):
+        stored = default_storage.save(name, ContentFile(data))
+    try:
+        with transaction.atomic():
+            MediaAsset.objects.create(sha256=digest, name=stored, size=len(data))
+        return stored
+    except IntegrityError:
+        # The same content was stored concurrently; keep that copy.
+        existing = MediaAsset.objects.get(sha256=digest).name
+        if existing != stored:
+            default_storage.delete(stored)
+        return existing
+
+
+def acquire(names):
+    """Add a reference to the assets stored under ``names``; returns how many of them exist."""
+    return MediaAsset.objects.filter(name__in=set(names)).update(
+        references=F('references') + 1, updated_at=timezone.now()
+    )
+
+
+def release(names):
+    """Drop a reference to the assets stored under ``names``; see ``purge_media_assets``."""
+    MediaAsset.objects.filter(name__in=set(names), references__gt=0).update(
+        references=F('references') - 1, updated_at=timezone.now()
+    )
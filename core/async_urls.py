@@ -0,0 +1,8 @@
+from django.urls import path
+from core.async_views import AsyncLoginView, AsyncRegistrationView, AsyncUserProfileView
+
+urlpatterns = [
+    path('auth/register/', AsyncRegistrationView.as_view(), name='async-registration'),
+    path('auth/login/', AsyncLoginView.as_view(), name='async-login'),
+    path('profile/', AsyncUserProfileView.as_view(), name='async-user-profile'),
+]
@@ -0,0 +1,111 @@
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from common.async_views import AsyncAPIView, render
+from common.conditional import instance_validators, not_modified, set_validators
+from .hashing import PoolSaturated, get_hashing_pool, verify_password
+from .models import User
+from .serializers import CredentialsSerializer, RegistrationSerializer, UserProfileSerializer
+
+
+def _json_body(request):
+    try:
+        body = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def _response(data, status_code):
+    return JsonResponse(data, status=status_code, encoder=DjangoJSONEncoder)
+
+
+def _busy():
+    response = _response({'message': 'Server busy, please retry shortly', 'data': None},
+                         status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = '1'
+    return response
+
+
+def _internal_error(e):
+    logging.error(f"Error occurred: {e}")
+    return _response({'message': 'Internal Server Error', 'data': None}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+    """
+    Login that verifies the password in the hashing pool instead of on the serving thread.
+
+    Same request and response as ``LoginView``, plus a 503 when the pool is saturated.
+    """
+
+    async def post(self, request):
+        try:
+            serializer = CredentialsSerializer(data=_json_body(request))
+            if not serializer.is_valid():
+                return _response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+            email, password = serializer.validated_data['email'], serializer.validated_data['password']
+
+            user = await User.objects.filter(email=email).afirst()
+            valid, new_hash = await get_hashing_pool().run(verify_password, password, user.password if user else None)
+            if not valid or not user.is_active:
+                return _response({'non_field_errors': ['Invalid credentials']}, status.HTTP_400_BAD_REQUEST)
+            if new_hash:
+                user.password = new_hash
+                await user.asave(update_fields=['password'])
+
+            refresh = RefreshToken.for_user(user)
+            return _response({'refresh': str(refresh), 'access': str(refresh.access_token)}, status.HTTP_200_OK)
+        except PoolSaturated:
+            return _busy()
+        except Exception as e:
+            return _internal_error(e)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncRegistrationView(View):
+    """Registration that hashes the new password in the hashing pool; see ``AsyncLoginView``."""
+
+    async def post(self, request):
+        try:
+            serializer = RegistrationSerializer(data=_json_body(request))
+            if not serializer.is_valid():
+                return _response({'errors': serializer.errors, 'data': None}, status.HTTP_400_BAD_REQUEST)
+            data = serializer.validated_data
+
+            password_hash = await get_hashing_pool().run(make_password, data['password'])
+            try:
+                user = await sync_to_async(User.objects.create_user)(
+                    email=data['email'], name=data['name'], phone=data['phone'], password_hash=password_hash
+                )
+            except IntegrityError:
+                return _response({'errors': {'email': ['A user with this email already exists.']}, 'data': None},
+                                 status.HTTP_400_BAD_REQUEST)
+            return _response({'id': user.id, 'message': "User registered successfully"}, status.HTTP_201_CREATED)
+        except PoolSaturated:
+            return _busy()
+        except Exception as e:
+            return _internal_error(e)
+
+
+class AsyncUserProfileView(AsyncAPIView):
+    """Async ``UserProfileView``; the user comes from the authentication cache, so a hit needs no query."""
+    serializer_class = UserProfileSerializer
+
+    async def get(self, request):
+        etag, last_modified = instance_validators(request.user)
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = render(self.serializer_class(request.user).data)
+        return set_validators(response, etag, last_modified)
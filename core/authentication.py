@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from common.timing import timed
+from .revocation import ais_token_revoked, is_token_revoked
+
+
+# User fields left out of the authentication cache: the password hash must not be copied into
+# the cache, and neither is used by ``request.user``. They are loaded on access (deferred).
+UNCACHED_USER_FIELDS = {'password', 'last_login'}
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def cached_user_fields(user_model):
+    # In model order, as ``Model.from_db`` expects.
+    return [field for field in user_model._meta.concrete_fields if field.name not in UNCACHED_USER_FIELDS]
+
+
+def cache_user(user, timeout):
+    values = [field.get_prep_value(getattr(user, field.attname)) for field in cached_user_fields(type(user))]
+    cache.set(user_cache_key(user.pk), (user._state.db, values), timeout)
+
+
+def cached_user(user_model, cached):
+    """Rebuild a user from ``cache_user`` data; ``save()`` on it only writes the cached fields."""
+    db, values = cached
+    return user_model.from_db(db, [field.attname for field in cached_user_fields(user_model)], values)
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class VerifiedTokenCache:
+    """
+    A bounded, thread-safe LRU of tokens whose signature has already been verified.
+
+    Entries are keyed by the exact raw token, so a hit can only ever return the claims
+    of a token that passed verification; expiry is still checked on every hit.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self.lock:
+            token = self.tokens.get(raw_token)
+            if token is None:
+                return None
+            if token['exp'] <= time.time():
+                del self.tokens[raw_token]
+                return None
+            self.tokens.move_to_end(raw_token)
+            return token
+
+    def put(self, raw_token, token):
+        with self.lock:
+            self.tokens[raw_token] = token
+            self.tokens.move_to_end(raw_token)
+            while len(self.tokens) > self.size:
+                self.tokens.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+
+
+verified_tokens = VerifiedTokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` without the per-request signature check and user query.
+
+    Verified tokens are kept in a per-process LRU and user rows in the shared cache for
+    ``AUTH_USER_CACHE_TIMEOUT`` seconds. Saving or deleting a user (e.g. a profile update
+    or a deactivation) drops the cached row, see ``core.signals``. Revoked (logged out)
+    tokens are rejected, see ``core.revocation``.
+
+    ``aauthenticate`` does the same with the async ORM and cache, for ``common.async_views``.
+    """
+
+    def authenticate(self, request):
+        with timed('auth'):
+            return super().authenticate(request)
+
+    def get_validated_token(self, raw_token):
+        token = self.verify_token(raw_token)
+        if is_token_revoked(token):
+            raise InvalidToken("Token is blacklisted")
+        return token
+
+    def verify_token(self, raw_token):
+        token = verified_tokens.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            verified_tokens.put(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        cached = cache.get(user_cache_key(user_id))
+        if cached is not None:
+            return cached_user(self.user_model, cached)
+        # Raises for unknown and inactive users, so only active users are ever cached.
+        user = super().get_user(validated_token)
+        cache_user(user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+    async def aauthenticate(self, request):
+        with timed('auth'):
+            return await self._aauthenticate(request)
+
+    async def _aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.verify_token(raw_token)
+        if await ais_token_revoked(validated_token):
+            raise InvalidToken("Token is blacklisted")
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or api_settings.CHECK_REVOKE_TOKEN:
+            return await sync_to_async(super().get_user)(validated_token)
+
+        cached = await cache.aget(user_cache_key(user_id))
+        if cached is not None:
+            return cached_user(self.user_model, cached)
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        await sync_to_async(cache_user)(user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,154 @@
+import json
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import jwt
+import requests
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from social_core.exceptions import AuthAlreadyAssociated
+from social_django.models import UserSocialAuth
+from common.timing import timed
+from .models import User
+
+GOOGLE_ISSUERS = ['accounts.google.com', 'https://accounts.google.com']
+ASSOCIATE_BY_EMAIL = 'social_core.pipeline.social_auth.associate_by_email'
+
+
+class GoogleIdTokenError(Exception):
+    """The ID token is malformed, expired, not signed by Google or not issued for this client."""
+
+
+class JsonWebKeySet:
+    """
+    Signing keys fetched from a JWKS url (``file://`` urls are read from disk), by key id.
+
+    The set is reloaded every ``refresh_interval`` seconds and when a token names a key id
+    that is not in it (at most every ``min_refresh_interval`` seconds, so tokens with bogus
+    key ids cannot hammer the endpoint). Reloads are single-flight: concurrent callers that
+    need the same reload wait for one fetch instead of issuing their own, and callers whose
+    key is already known keep using the current set while a periodic reload runs.
+    """
+
+    def __init__(self, url, refresh_interval, min_refresh_interval, timeout):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.keys = {}
+        self.checked_at = float('-inf')
+
+    def fetch(self):
+        if self.url.startswith('file://'):
+            with open(url2pathname(urlparse(self.url).path), 'rb') as f:
+                data = json.load(f)
+        else:
+            with timed('google'):
+                response = requests.get(self.url, timeout=self.timeout)
+                response.raise_for_status()
+                data = response.json()
+        return {key.key_id: key for key in jwt.PyJWKSet.from_dict(data).keys}
+
+    def reload(self, checked_at):
+        """Reload the set, unless another caller already did since ``checked_at``."""
+        if self.checked_at != checked_at:
+            return
+        try:
+            self.keys = self.fetch()
+        except (OSError, ValueError, jwt.PyJWTError) as e:
+            # Keep serving the previous keys; tokens signed with a new key fail until a reload succeeds.
+            logging.error(f"Error occurred: could not load signing keys from {self.url}: {e}")
+        self.checked_at = time.monotonic()
+
+    def get_signing_key(self, kid):
+        checked_at = self.checked_at
+        age = time.monotonic() - checked_at
+        if kid in self.keys:
+            if age >= self.refresh_interval and self.lock.acquire(blocking=False):
+                try:
+                    self.reload(checked_at)
+                finally:
+                    self.lock.release()
+        elif age >= self.min_refresh_interval:
+            with self.lock:
+                self.reload(checked_at)
+
+        key = self.keys.get(kid)
+        if key is None:
+            raise GoogleIdTokenError('Token is signed with an unknown key.')
+        return key
+
+
+_key_set = None
+_key_set_lock = threading.Lock()
+
+
+def get_google_key_set():
+    global _key_set
+    if _key_set is None or _key_set.url != settings.GOOGLE_JWKS_URL:
+        with _key_set_lock:
+            if _key_set is None or _key_set.url != settings.GOOGLE_JWKS_URL:
+                _key_set = JsonWebKeySet(settings.GOOGLE_JWKS_URL, settings.GOOGLE_JWKS_REFRESH_INTERVAL,
+                                         settings.GOOGLE_JWKS_MIN_REFRESH_INTERVAL, settings.GOOGLE_JWKS_TIMEOUT)
+    return _key_set
+
+
+def verify_id_token(id_token):
+    """Verify a Google ID token locally and return its claims; the email address must be verified."""
+    try:
+        header = jwt.get_unverified_header(id_token)
+    except jwt.PyJWTError as e:
+        raise GoogleIdTokenError(str(e))
+    key = get_google_key_set().get_signing_key(header.get('kid'))
+    try:
+        claims = jwt.decode(
+            id_token, key.key, algorithms=['RS256'], audience=settings.SOCIAL_AUTH_GOOGLE_OAUTH2_KEY,
+            issuer=GOOGLE_ISSUERS, options={'require': ['exp', 'iat', 'iss', 'aud', 'sub']},
+        )
+    except jwt.PyJWTError as e:
+        raise GoogleIdTokenError(str(e))
+    if not claims.get('email') or claims.get('email_verified') is not True:
+        raise GoogleIdTokenError('Email address is not verified.')
+    return claims
+
+
+def get_or_create_social_user(backend, claims):
+    """
+    Return the user linked to the Google account in ``claims``, linking or creating one on first login.
+
+    Returning users are found with a single lookup on the unique ``(provider, uid)`` index. On
+    first login a new user is created. Like the ``access_token`` login (``backend.do_auth``), an
+    existing user with the same email address is only linked if ``SOCIAL_AUTH_PIPELINE``
+    contains ``associate_by_email``; otherwise the login fails with ``AuthAlreadyAssociated``.
+    """
+    details = backend.get_user_details(claims)
+    uid = backend.get_user_id(details, claims)
+    social = UserSocialAuth.objects.select_related('user').filter(provider=backend.name, uid=uid).first()
+    if social:
+        return social.user
+
+    for _ in range(2):
+        try:
+            return link_social_user(backend, details, uid, claims)
+        except IntegrityError:
+            # A concurrent first login linked the account already, or created a user with the same
+            # email address; the second attempt treats that user like any existing one.
+            social = UserSocialAuth.objects.select_related('user').filter(provider=backend.name, uid=uid).first()
+            if social:
+                return social.user
+    raise AuthAlreadyAssociated(backend)
+
+
+def link_social_user(backend, details, uid, claims):
+    with transaction.atomic():
+        user = User.objects.filter(email=details['email']).first()
+        if user is not None and ASSOCIATE_BY_EMAIL not in backend.strategy.get_pipeline(backend):
+            raise AuthAlreadyAssociated(backend)
+        if user is None:
+            user = User.objects.create_user(email=details['email'], name=(details.get('fullname') or '')[:50])
+        UserSocialAuth.objects.create(user=user, provider=backend.name, uid=uid, extra_data={'sub': claims['sub']})
+        return user
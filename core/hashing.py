@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class PoolSaturated(Exception):
+    """The hashing pool already has as many jobs running and queued as it accepts."""
+
+
+class HashingPool:
+    """
+    A size-limited thread pool for password hashing and verification.
+
+    PBKDF2 releases the GIL, so a few threads keep the CPU busy without tying up the
+    threads that serve requests. At most ``workers + queue_depth`` jobs are accepted at
+    once; beyond that ``submit`` raises ``PoolSaturated`` immediately so callers can shed
+    load with a fast 503 instead of letting requests pile up behind the hashing.
+    """
+
+    def __init__(self, workers, queue_depth):
+        self.workers = workers
+        self.capacity = workers + queue_depth
+        self.slots = threading.BoundedSemaphore(self.capacity)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+
+    def submit(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            raise PoolSaturated()
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    async def run(self, func, *args):
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+
+def verify_password(password, encoded):
+    """
+    Check ``password`` against the stored hash ``encoded``.
+
+    Returns ``(valid, new_encoded)``; ``new_encoded`` is set when the stored hash uses
+    outdated parameters and should be replaced, so the rehash also happens in the pool.
+    """
+    if encoded is None:
+        # Unknown user: hash anyway so the response time does not reveal which emails exist.
+        make_password(password)
+        return False, None
+    # ``check_password`` only calls the setter for a valid password whose hash is outdated.
+    upgraded = []
+    valid = check_password(password, encoded, setter=upgraded.append)
+    return valid, make_password(password) if upgraded else None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(settings.PASSWORD_HASHING_WORKERS, settings.PASSWORD_HASHING_QUEUE_DEPTH)
+    return _pool
@@ -0,0 +1,57 @@
+"""
+Image decoding and resizing for the profile picture pipeline.
+
+Runs in worker processes, so it only depends on Pillow; keep Django imports out of here.
+"""
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+JPEG = 'jpeg'
+WEBP = 'webp'
+EXTENSIONS = {JPEG: 'jpg', WEBP: 'webp'}
+
+
+class ImageProcessingError(Exception):
+    """The image cannot be decoded or is too large to process."""
+
+
+def decode(data, max_pixels):
+    try:
+        image = Image.open(BytesIO(data))
+        if image.width * image.height > max_pixels:
+            raise ImageProcessingError(f'Image is larger than {max_pixels} pixels.')
+        image.load()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(f'Cannot decode image: {e}')
+    # Apply the EXIF orientation before the metadata is dropped.
+    image = ImageOps.exif_transpose(image)
+    image.info = {}
+    return image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+
+def encode(image, image_format, quality):
+    if image_format == JPEG and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    buffer = BytesIO()
+    # No ``exif``/``icc_profile`` arguments: the variants carry no metadata.
+    image.save(buffer, format=image_format.upper(), quality=quality, optimize=image_format == JPEG)
+    return buffer.getvalue()
+
+
+def render_variants(data, sizes, formats, quality, max_pixels):
+    """
+    Decode ``data`` and return ``{(size, format): bytes}`` with the image scaled to fit in
+    ``size`` x ``size`` pixels (never upscaled), for every size and format.
+    """
+    image = decode(data, max_pixels)
+    variants = {}
+    for size in sorted(sizes, reverse=True):
+        # Scale down from the previous, larger variant; it is much cheaper than starting from the original.
+        if max(image.size) > size:
+            image = ImageOps.contain(image, (size, size), Image.LANCZOS)
+        for image_format in formats:
+            variants[(size, image_format)] = encode(image, image_format, quality)
+    return variants
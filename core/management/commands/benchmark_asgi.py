@@ -0,0 +1,147 @@
+import http.client
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from common.benchmark import summarize
+from core.models import User
+from work.models import WorkExperience
+
+# The sync and async view of each benchmarked endpoint, by URL name.
+ENDPOINTS = {
+    'profile': ('user_profile', 'async-user-profile'),
+    'work-experiences': ('work-experience-list', 'async-work-experience-list'),
+    'user-skills': ('user-skill-list', 'async-user-skill-list'),
+    'skills': ('skill-list', 'async-skill-list'),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test an endpoint at increasing concurrency: the sync view on the threaded WSGI server '
+        '(runserver), the sync view under uvicorn and the async view under uvicorn'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='work-experiences')
+        parser.add_argument('--concurrency', default='1,8,32,64',
+                            help='Comma separated numbers of clients sending requests back to back')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per concurrency level')
+        parser.add_argument('--rows', type=int, default=20, help='Work experiences of the benchmark user')
+
+    def handle(self, *args, **options):
+        if importlib.util.find_spec('uvicorn') is None:
+            raise CommandError('uvicorn is not installed (pip install uvicorn).')
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        sync_name, async_name = ENDPOINTS[options['endpoint']]
+
+        # The servers run in other processes, so the data has to be committed.
+        user = User.objects.create_user(email=f'bench-{uuid.uuid4().hex}@example.com', name='Bench User')
+        WorkExperience.objects.bulk_create([
+            WorkExperience(user=user, job_title=f'Engineer {i}', company_name='Bench', job_type=WorkExperience.FULL_TIME,
+                           start_date=f'{2000 + i % 25}-01-01')
+            for i in range(options['rows'])
+        ])
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        scenarios = {
+            'wsgi_sync': (['manage.py', 'runserver', '--noreload', '--skip-checks'], reverse(sync_name)),
+            'uvicorn_sync': (['-m', 'uvicorn', 'GDSC_Task.asgi:application', '--log-level', 'warning',
+                              '--no-access-log'], reverse(sync_name)),
+            'uvicorn_async': (['-m', 'uvicorn', 'GDSC_Task.asgi:application', '--log-level', 'warning',
+                               '--no-access-log'], reverse(async_name)),
+        }
+        results = {}
+        try:
+            for scenario, (command, path) in scenarios.items():
+                results[scenario] = self.run_scenario(command, path, headers, levels, options['duration'])
+        finally:
+            user.delete()
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_scenario(self, command, path, headers, levels, duration):
+        port = free_port()
+        if command[0] == 'manage.py':
+            command = [*command, f'127.0.0.1:{port}']
+        else:
+            command = [*command, '--host', '127.0.0.1', '--port', str(port)]
+        server = subprocess.Popen([sys.executable, *command], cwd=settings.BASE_DIR, env=os.environ.copy(),
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            self.wait_until_serving(port, server)
+            self.load(port, path, headers, 4, 1.0)  # Warm up connections and caches.
+            return {str(clients): self.load(port, path, headers, clients, duration) for clients in levels}
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    def wait_until_serving(self, port, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'The server exited with status {server.returncode}.')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise CommandError('The server did not start in time.')
+
+    def load(self, port, path, headers, clients, duration):
+        """``clients`` threads each send requests over one keep-alive connection for ``duration`` seconds."""
+        samples, statuses = [], {}
+        lock = threading.Lock()
+        start = threading.Barrier(clients + 1)
+        deadline = None
+
+        def client():
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            own_samples, own_statuses = [], {}
+            start.wait()
+            while time.monotonic() < deadline:
+                request_started = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    status = 'error'
+                own_samples.append(time.perf_counter() - request_started)
+                own_statuses[status] = own_statuses.get(status, 0) + 1
+            connection.close()
+            with lock:
+                samples.extend(own_samples)
+                for status, count in own_statuses.items():
+                    statuses[status] = statuses.get(status, 0) + count
+
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + duration
+        started = time.perf_counter()
+        start.wait()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return {
+            'throughput_rps': round(len(samples) / elapsed, 1),
+            'latency': summarize(samples),
+            'statuses': {str(status): count for status, count in statuses.items()},
+        }
@@ -0,0 +1,64 @@
+import json
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from common.benchmark import measure
+from common.db import pool_stats
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = 'Compare request latency with a new database connection per request against the connection pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--pool-size', type=int, default=4)
+
+    def use_pool(self, connection, pool_options):
+        """Switch ``connection`` between per-request connections and a pool."""
+        connection.close()
+        connection.close_pool()
+        options = dict(connection.settings_dict.get('OPTIONS', {}))
+        options.pop('pool', None)
+        if pool_options:
+            options['pool'] = pool_options
+        connection.settings_dict['OPTIONS'] = options
+        connection.settings_dict['CONN_MAX_AGE'] = 0
+
+    def handle(self, *args, **options):
+        connection = connections['default']
+        original = {key: connection.settings_dict.get(key) for key in ('OPTIONS', 'CONN_MAX_AGE')}
+        # Requests close their connection when they finish, so the user cannot live in a rolled back transaction.
+        user = User.objects.create_user(email=f'bench-{uuid.uuid4().hex}@example.com', name='Bench User')
+        environ = RequestFactory().get(
+            reverse('work-experience-list'), HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        ).environ
+        # Through the WSGI handler rather than the test client, which keeps the connection open across requests.
+        handler = WSGIHandler()
+
+        def request():
+            # The list is empty, so the view answers 404 after querying; the status does not matter here.
+            handler(dict(environ), lambda status, headers: None).close()
+
+        results = {}
+        try:
+            self.use_pool(connection, None)
+            results['connection_per_request'] = measure(request, options['iterations'])
+
+            size = options['pool_size']
+            self.use_pool(connection, {'min_size': size, 'max_size': size})
+            connection.pool.open(wait=True)
+            results['pooled'] = measure(request, options['iterations'])
+            results['pool_stats'] = pool_stats()['default']
+        finally:
+            self.use_pool(connection, None)
+            connection.settings_dict.update(original)
+            User.objects.filter(pk=user.pk).delete()
+        results['health_checks'] = settings.DATABASES['default'].get('CONN_HEALTH_CHECKS', False)
+        self.stdout.write(json.dumps(results, indent=2))
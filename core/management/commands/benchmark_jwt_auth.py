@@ -0,0 +1,31 @@
+import json
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from common.benchmark import measure
+from core.authentication import CachedJWTAuthentication
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-request cost of JWTAuthentication and CachedJWTAuthentication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = User.objects.create_user(email=f'bench-{uuid.uuid4().hex}@example.com', name='Bench User')
+            token = AccessToken.for_user(user)
+            request = Request(APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+
+            results = {}
+            for name, authentication in [('jwt', JWTAuthentication()), ('cached_jwt', CachedJWTAuthentication())]:
+                results[name] = measure(lambda: authentication.authenticate(request), options['iterations'])
+            self.stdout.write(json.dumps(results, indent=2))
+            transaction.set_rollback(True)
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from common.benchmark import summarize
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the throughput of a cheap endpoint while a burst of logins is running, '
+        'for the synchronous login and for the async login backed by the hashing pool'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200, help='Number of logins in the storm')
+        parser.add_argument('--concurrency', type=int, default=50, help='Logins in flight at once')
+        parser.add_argument('--baseline-probes', type=int, default=200,
+                            help='Requests to the cheap endpoint without a storm')
+
+    def handle(self, *args, **options):
+        password = 'Bench-password-1!'
+        # The requests run on other threads, so the user has to be committed.
+        user = User.objects.create_user(email=f'bench-{uuid.uuid4().hex}@example.com', password=password)
+        try:
+            credentials = {'email': user.email, 'password': password}
+            access = str(RefreshToken.for_user(user).access_token)
+            results = {
+                'baseline': asyncio.run(self.scenario(None, credentials, access, options)),
+                'sync_login': asyncio.run(self.scenario(reverse('login'), credentials, access, options)),
+                'async_login': asyncio.run(self.scenario(reverse('async-login'), credentials, access, options)),
+            }
+        finally:
+            user.delete()
+        self.stdout.write(json.dumps(results, indent=2))
+
+    async def scenario(self, login_url, credentials, access, options):
+        """
+        Serve the storm and the probes from one in-process ASGI client.
+
+        As under an ASGI server, synchronous views all share one thread, so a login that
+        hashes on that thread holds up every other synchronous request behind it.
+        """
+        client = AsyncClient()
+        probe_url = reverse('skill-list')
+        statuses = {}
+
+        async def login(slots):
+            async with slots:
+                response = await client.post(login_url, credentials, content_type='application/json')
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def storm():
+            slots = asyncio.Semaphore(options['concurrency'])
+            await asyncio.gather(*(login(slots) for _ in range(options['logins'])))
+
+        storm_task = asyncio.create_task(storm()) if login_url else None
+        samples = []
+        started = time.perf_counter()
+        while (storm_task and not storm_task.done()) or (not storm_task and len(samples) < options['baseline_probes']):
+            request_started = time.perf_counter()
+            await client.get(probe_url, headers={'Authorization': f'Bearer {access}'})
+            samples.append(time.perf_counter() - request_started)
+        elapsed = time.perf_counter() - started
+        if storm_task:
+            await storm_task
+
+        result = {
+            'probe_throughput_rps': round(len(samples) / elapsed, 1),
+            'probe_latency': summarize(samples),
+            'duration_s': round(elapsed, 2),
+        }
+        if login_url:
+            result['login_statuses'] = statuses
+        return result
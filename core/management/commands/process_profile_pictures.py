@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import ProfilePictureJob
+from core.pictures import process_profile_picture
+
+
+class Command(BaseCommand):
+    help = ('Process profile picture jobs left pending, e.g. because the image processing pool was full '
+            'or the server restarted; run periodically (e.g. from cron)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-minutes', type=int, default=15,
+                            help='Retry jobs that have been processing for longer than this')
+
+    def handle(self, *args, **options):
+        stale = timezone.now() - timedelta(minutes=options['stale_minutes'])
+        ProfilePictureJob.objects.filter(status=ProfilePictureJob.PROCESSING, updated_at__lt=stale).update(
+            status=ProfilePictureJob.PENDING, updated_at=timezone.now()
+        )
+        job_ids = list(ProfilePictureJob.objects.filter(status=ProfilePictureJob.PENDING)
+                       .order_by('created_at').values_list('id', flat=True))
+        for job_id in job_ids:
+            process_profile_picture(job_id)
+        self.stdout.write(f'Processed {len(job_ids)} profile picture jobs.')
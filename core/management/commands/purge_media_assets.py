@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from core.models import MediaAsset
+
+
+class Command(BaseCommand):
+    help = 'Delete media assets no profile picture refers to any more; run periodically (e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-minutes', type=int, default=60,
+                            help='Keep unreferenced assets this long, so uploads in progress can still reuse them')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['grace_minutes'])
+        purged = 0
+        with transaction.atomic():
+            assets = MediaAsset.objects.select_for_update(skip_locked=True).filter(references=0, updated_at__lt=cutoff)
+            for asset in assets:
+                asset.delete()
+                default_storage.delete(asset.name)
+                purged += 1
+        self.stdout.write(f'Purged {purged} unreferenced media assets.')
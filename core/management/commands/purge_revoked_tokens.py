@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from common.cache import bump_cache_version
+from core.models import RevokedToken
+from core.revocation import REVOCATION_NAMESPACE
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked tokens that have expired anyway; run periodically (e.g. from cron)'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+            if deleted:
+                # Let every process rebuild its Bloom filter without the purged ids.
+                transaction.on_commit(lambda: bump_cache_version(REVOCATION_NAMESPACE))
+        self.stdout.write(f'Purged {deleted} expired revoked tokens.')
@@ -0,0 +1,20 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from social_django import middleware
+
+
+class SocialAuthExceptionMiddleware(middleware.SocialAuthExceptionMiddleware):
+    """
+    ``social_django``'s exception middleware, made async-capable.
+
+    The upstream class is synchronous only, which makes Django run the whole middleware
+    chain, and every async view behind it, on the one thread shared by synchronous code.
+    Its ``__call__`` only passes the request on, so in async mode it simply returns the
+    next handler's coroutine.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:09
+
+import common.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_user_is_staff'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profilepicturejob',
+            name='source',
+            field=models.FileField(blank=True, max_length=255, storage=common.storage.UploadStagingStorage(), upload_to='profile-pictures/uploads/'),
+        ),
+    ]
@@ -1,14 +1,19 @@
-import cloudinary.models
-from .validators import validate_image
 from .managers import *
 from common.models import *
+from common.storage import UploadStagingStorage
 
 
 class User(AbstractBaseUser, BaseModel):
     email = models.EmailField(unique=True)
     name = models.CharField(max_length=50)
     phone = models.CharField(max_length=20, blank=True)
-    profile_picture = cloudinary.models.CloudinaryField('image', blank=True, null=True, validators=[validate_image])
+    is_active = models.BooleanField(default=True)
+    # Access to the operational endpoints (e.g. database pool stats).
+    is_staff = models.BooleanField(default=False)
+    # The processed picture (the largest JPEG variant) and all variants as ``{size: {format: storage name}}``,
+    # both written by the profile picture pipeline, see ``core.pictures``.
+    profile_picture = models.ImageField(upload_to='profile-pictures/', max_length=255, blank=True, null=True)
+    profile_picture_variants = models.JSONField(default=dict, blank=True)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
@@ -18,3 +23,54 @@ class User(AbstractBaseUser, BaseModel):
     def __str__(self):
         return self.email
 
+
+class RevokedToken(BaseModel):
+    """A revoked JWT, kept until the token would have expired anyway."""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
+
+
+class ProfilePictureJob(BaseModel):
+    """An uploaded profile picture waiting for, or done with, background processing."""
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='profile_picture_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    # Staged on local disk until processed, see ``common.storage.UploadStagingStorage``.
+    source = models.FileField(upload_to='profile-pictures/uploads/', storage=UploadStagingStorage(), max_length=255,
+                              blank=True)
+    # SHA-256 of the uploaded file, to reuse the variants when the same picture is uploaded again.
+    source_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    variants = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f'{self.user} ({self.status})'
+
+
+class MediaAsset(BaseModel):
+    """
+    A stored media file, indexed by the SHA-256 of its content so identical files are stored once.
+
+    ``references`` counts the users whose profile picture uses the file; unreferenced assets are
+    deleted by the ``purge_media_assets`` command.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, db_index=True)
+    size = models.PositiveIntegerField()
+    references = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.name
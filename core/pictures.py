@@ -0,0 +1,209 @@
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from cloudinary import CloudinaryResource
+from cloudinary.models import CLOUDINARY_FIELD_DB_RE
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from common.timing import timed
+from .assets import acquire, release, store_asset, variant_names
+from .imaging import EXTENSIONS, ImageProcessingError, render_variants
+from .models import MediaAsset, ProfilePictureJob, User
+
+# What the former ``CloudinaryField`` stored: ``<resource type>/<type>/v<version>/<public id>.<format>``.
+LEGACY_CLOUDINARY_NAME = re.compile(CLOUDINARY_FIELD_DB_RE)
+
+
+def picture_url(name):
+    """
+    The URL of a stored profile picture. Pictures uploaded before the pipeline keep the name
+    the former ``CloudinaryField`` stored, which is resolved the way that field did.
+    """
+    match = LEGACY_CLOUDINARY_NAME.fullmatch(name)
+    if match and match.group('resource_type'):
+        return CloudinaryResource(type=match.group('type'), resource_type=match.group('resource_type'),
+                                  version=match.group('version'), public_id=match.group('public_id'),
+                                  format=match.group('format')).url
+    return default_storage.url(name)
+
+
+def variant_urls(variants):
+    return {size: {image_format: default_storage.url(name) for image_format, name in formats.items()}
+            for size, formats in variants.items()}
+
+
+def render(data):
+    """Render the configured profile picture variants of ``data`` in the current process."""
+    return render_variants(data, settings.PROFILE_PICTURE_SIZES, settings.PROFILE_PICTURE_FORMATS,
+                           settings.PROFILE_PICTURE_QUALITY, settings.PROFILE_PICTURE_MAX_PIXELS)
+
+
+def schedule_profile_picture(user, upload, digest=''):
+    """
+    Stage ``upload`` on local disk and create a pending job for it; processing starts once the
+    surrounding transaction commits. The upload is streamed to disk chunk by chunk.
+    """
+    job = ProfilePictureJob(user=user, source_sha256=digest)
+    extension = os.path.splitext(upload.name)[1].lower()
+    with timed('storage'):
+        job.source.save(f'{job.id}{extension}', upload, save=False)
+    job.save()
+    transaction.on_commit(lambda: get_image_processing_pool().submit(job.id))
+    return job
+
+
+def store_variants(job, variants):
+    names = {}
+    for (size, image_format), data in variants.items():
+        name = f'profile-pictures/{job.user_id}/{job.id}/{size}.{EXTENSIONS[image_format]}'
+        names.setdefault(str(size), {})[image_format] = store_asset(data, name)
+    return names
+
+
+def set_profile_picture(user, variants):
+    """Make ``variants`` the profile picture of ``user`` (locked by the caller), moving the asset references."""
+    acquire(variant_names(variants))
+    release(variant_names(user.profile_picture_variants))
+    largest = variants[str(max(int(size) for size in variants))]
+    user.profile_picture = largest.get('jpeg') or next(iter(largest.values()))
+    user.profile_picture_variants = variants
+    user.save(update_fields=['profile_picture', 'profile_picture_variants', 'updated_at'])
+
+
+def reuse_profile_picture(user, digest):
+    """
+    Point ``user`` at the variants of an earlier upload with SHA-256 ``digest``, if one was
+    rendered with the current settings and its assets still exist, and return the (done) job
+    recording it; ``None`` when the upload has to be processed. Must run in a transaction.
+    """
+    earlier = ProfilePictureJob.objects.filter(source_sha256=digest, status=ProfilePictureJob.DONE) \
+        .order_by('-created_at').first()
+    if earlier is None:
+        return None
+    rendered = {(size, image_format) for size, formats in earlier.variants.items() for image_format in formats}
+    wanted = {(str(size), image_format) for size in settings.PROFILE_PICTURE_SIZES
+              for image_format in settings.PROFILE_PICTURE_FORMATS}
+    if rendered != wanted:
+        return None
+
+    User.objects.select_for_update().only('pk').get(pk=user.pk)
+    names = variant_names(earlier.variants)
+    if MediaAsset.objects.select_for_update().filter(name__in=names).count() != len(names):
+        return None
+    set_profile_picture(user, earlier.variants)
+    return ProfilePictureJob.objects.create(
+        user=user, status=ProfilePictureJob.DONE, source_sha256=digest, variants=earlier.variants
+    )
+
+
+def process_profile_picture(job_id, render=render):
+    """
+    Process a pending job: render its variants with ``render``, store them and make them the
+    user's profile picture, unless a newer upload has been processed already. The staged
+    upload is deleted either way.
+    """
+    claimed = ProfilePictureJob.objects.filter(pk=job_id, status=ProfilePictureJob.PENDING).update(
+        status=ProfilePictureJob.PROCESSING, updated_at=timezone.now()
+    )
+    if not claimed:
+        return
+    job = ProfilePictureJob.objects.get(pk=job_id)
+    try:
+        with job.source.open('rb') as source:
+            data = source.read()
+        variants = store_variants(job, render(data))
+    except Exception as e:
+        if not isinstance(e, ImageProcessingError):
+            logging.error(f"Error occurred: {e}")
+        job.source.delete(save=False)
+        job.status, job.error = ProfilePictureJob.FAILED, str(e) if isinstance(e, ImageProcessingError) else 'Processing failed.'
+        job.save(update_fields=['status', 'error', 'source', 'updated_at'])
+        return
+
+    with transaction.atomic():
+        user = User.objects.select_for_update().get(pk=job.user_id)
+        job.source.delete(save=False)
+        job.status, job.variants = ProfilePictureJob.DONE, variants
+        job.save(update_fields=['status', 'variants', 'source', 'updated_at'])
+        superseded = ProfilePictureJob.objects.filter(
+            user_id=job.user_id, status=ProfilePictureJob.DONE, created_at__gt=job.created_at
+        ).exists()
+        if not superseded:
+            set_profile_picture(user, variants)
+
+
+class ImageProcessingPool:
+    """
+    Runs profile picture jobs in the background.
+
+    Decoding and resizing hold the GIL, so they run in a process pool. One coordinating
+    thread per worker loads the upload, waits for its variants and stores them. At most
+    ``workers + queue_depth`` jobs are accepted at once. Jobs that are not accepted stay
+    pending until the ``process_profile_pictures`` command picks them up.
+    """
+
+    def __init__(self, workers, queue_depth):
+        self.capacity = workers + queue_depth
+        self.lock = threading.Lock()
+        self.pending = set()
+        # Spawned, not forked: forking a multi-threaded server process can deadlock the child.
+        self.processes = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self.threads = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-processing')
+
+    def saturated(self):
+        return len(self.pending) >= self.capacity
+
+    def render(self, data):
+        return self.processes.submit(
+            render_variants, data, settings.PROFILE_PICTURE_SIZES, settings.PROFILE_PICTURE_FORMATS,
+            settings.PROFILE_PICTURE_QUALITY, settings.PROFILE_PICTURE_MAX_PIXELS,
+        ).result()
+
+    def run(self, job_id):
+        close_old_connections()
+        try:
+            process_profile_picture(job_id, render=self.render)
+        finally:
+            close_old_connections()
+
+    def submit(self, job_id):
+        """Start processing ``job_id``; returns ``None`` and leaves the job pending if the pool is full."""
+        with self.lock:
+            if self.saturated():
+                logging.warning(f"Image processing pool is full, job {job_id} stays pending")
+                return None
+            future = self.threads.submit(self.run, job_id)
+            self.pending.add(future)
+        future.add_done_callback(self.done)
+        return future
+
+    def done(self, future):
+        with self.lock:
+            self.pending.discard(future)
+        if future.exception():
+            logging.error(f"Error occurred: {future.exception()}")
+
+    def join(self, timeout=None):
+        """Wait for the accepted jobs to finish."""
+        with self.lock:
+            pending = list(self.pending)
+        wait(pending, timeout=timeout)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_image_processing_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ImageProcessingPool(settings.IMAGE_PROCESSING_WORKERS, settings.IMAGE_PROCESSING_QUEUE_DEPTH)
+    return _pool
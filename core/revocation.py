@@ -0,0 +1,127 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone as django_timezone
+from rest_framework_simplejwt.settings import api_settings
+from common.cache import bump_cache_version, get_cache_version
+from .models import RevokedToken
+
+# Bumped whenever the table changes (revocations and purges), see ``RevocationList``.
+REVOCATION_NAMESPACE = 'revoked-tokens'
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over strings: no false negatives, ``error_rate`` false positives."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.bits for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.array[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RevocationList:
+    """
+    Revoked token ids behind an in-memory Bloom filter.
+
+    The filter is built from the ``RevokedToken`` table on first use and rebuilt whenever
+    another process revoked or purged tokens, signalled through a version in the shared cache
+    that is read at most every ``REVOCATION_REFRESH_INTERVAL`` seconds, so checking a token
+    costs no query. Revocations made by this process
+    are added to the filter immediately. A token that is not in the filter is not revoked
+    without asking the database; only filter hits, i.e. revoked tokens and rare false
+    positives, are confirmed with a query.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.version = None
+        self.checked_at = 0.0
+
+    def rebuild(self, version):
+        jtis = list(
+            RevokedToken.objects.filter(expires_at__gt=django_timezone.now()).values_list('jti', flat=True)
+        )
+        bloom = BloomFilter(max(settings.REVOCATION_BLOOM_CAPACITY, 2 * len(jtis)), settings.REVOCATION_BLOOM_ERROR_RATE)
+        for jti in jtis:
+            bloom.add(jti)
+        self.bloom, self.version = bloom, version
+
+    def is_stale(self, now):
+        return self.bloom is None or now - self.checked_at >= settings.REVOCATION_REFRESH_INTERVAL
+
+    def refresh(self):
+        now = time.monotonic()
+        if not self.is_stale(now):
+            return
+        with self.lock:
+            if not self.is_stale(now):
+                return
+            # Read the version before the table, so a revocation committed meanwhile triggers another rebuild.
+            version = get_cache_version(REVOCATION_NAMESPACE)
+            if self.bloom is None or version != self.version:
+                self.rebuild(version)
+            self.checked_at = now
+
+    def is_revoked(self, jti):
+        self.refresh()
+        if jti not in self.bloom:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    async def ais_revoked(self, jti):
+        # Rebuilding is rare (see ``REVOCATION_REFRESH_INTERVAL``) and takes the lock, so it runs on a thread.
+        if self.is_stale(time.monotonic()):
+            await sync_to_async(self.refresh)()
+        if jti not in self.bloom:
+            return False
+        return await RevokedToken.objects.filter(jti=jti).aexists()
+
+    def revoke(self, jti, expires_at):
+        RevokedToken.objects.bulk_create([RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True)
+        self.refresh()
+        with self.lock:
+            self.bloom.add(jti)
+        # After the commit, so a process that rebuilds on the new version reads the new row.
+        transaction.on_commit(lambda: bump_cache_version(REVOCATION_NAMESPACE))
+
+    def reset(self):
+        with self.lock:
+            self.bloom = None
+
+
+revocation_list = RevocationList()
+
+
+def revoke_token(token):
+    """Revoke a validated simplejwt token until its own expiry."""
+    revocation_list.revoke(token[api_settings.JTI_CLAIM], datetime.fromtimestamp(token['exp'], tz=timezone.utc))
+
+
+def is_token_revoked(token):
+    jti = token.get(api_settings.JTI_CLAIM)
+    return jti is not None and revocation_list.is_revoked(jti)
+
+
+async def ais_token_revoked(token):
+    jti = token.get(api_settings.JTI_CLAIM)
+    return jti is not None and await revocation_list.ais_revoked(jti)
@@ -1,5 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.urls import reverse
+from .assets import file_sha256
+from .pictures import picture_url, variant_urls
+from .revocation import is_token_revoked, revoke_token
 from .models import *
 from .validators import *
 
@@ -26,10 +34,12 @@ class RegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class LoginSerializer(serializers.Serializer):
+class CredentialsSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField()
 
+
+class LoginSerializer(CredentialsSerializer):
     def validate(self, data):
         email = data.get('email')
         password = data.get('password')
@@ -43,17 +53,87 @@ class LoginSerializer(serializers.Serializer):
         return data
 
 
+def validate_refresh_token(raw_token):
+    """Parse a refresh token, rejecting invalid, expired and revoked ones."""
+    refresh = RefreshToken(raw_token)
+    if is_token_revoked(refresh):
+        raise TokenError("Token is blacklisted")
+    return refresh
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = validate_refresh_token(attrs['refresh'])
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                revoke_token(refresh)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+    def validate_refresh(self, value):
+        try:
+            refresh = validate_refresh_token(value)
+        except TokenError as e:
+            raise serializers.ValidationError(str(e))
+        if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(self.context['request'].user.id):
+            raise serializers.ValidationError("Token does not belong to the authenticated user.")
+        return refresh
+
+
+class ProfilePictureField(serializers.FileField):
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = picture_url(value.name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+
 class UserProfileSerializer(serializers.ModelSerializer):
-    profile_picture = serializers.ImageField(validators=[validate_image], required=False
-                                             )
+    # Uploads are only checked by their leading bytes here; decoding happens in the profile picture pipeline.
+    profile_picture = ProfilePictureField(validators=[validate_image], required=False)
+    profile_picture_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = User
-        fields = ['email', 'name', 'phone', 'profile_picture']
+        fields = ['email', 'name', 'phone', 'profile_picture', 'profile_picture_variants']
+
+    def get_profile_picture_variants(self, obj):
+        return variant_urls(obj.profile_picture_variants)
+
+    def validate_profile_picture(self, value):
+        # Hashed in the same pass as the validation, to spot pictures that were uploaded before.
+        value.sha256 = file_sha256(value)
+        return value
 
     def update(self, instance, validated_data):
         instance.name = validated_data.get('name', instance.name)
         instance.phone = validated_data.get('phone', instance.phone)
-        if 'profile_picture' in validated_data:
-            instance.profile_picture = validated_data['profile_picture']
-        instance.save()
+        # ``instance`` may be the cached ``request.user``; writing any other field could overwrite a newer value
+        # (e.g. a picture set by the pipeline or a deactivation by another worker).
+        instance.save(update_fields=['name', 'phone', 'updated_at'])
         return instance
+
+
+class ProfilePictureJobSerializer(serializers.ModelSerializer):
+    variants = serializers.SerializerMethodField()
+    status_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProfilePictureJob
+        fields = ['id', 'status', 'error', 'variants', 'status_url', 'created_at', 'updated_at']
+
+    def get_variants(self, obj):
+        return variant_urls(obj.variants)
+
+    def get_status_url(self, obj):
+        return reverse('profile-picture-job', kwargs={'pk': obj.pk})
@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .assets import release, variant_names
+from .authentication import invalidate_cached_user
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_cached_user(instance.id)
+    # Also after commit, so a request that read the old row meanwhile cannot keep it cached.
+    transaction.on_commit(lambda: invalidate_cached_user(instance.id))
+
+
+@receiver(post_delete, sender=User)
+def release_profile_picture(sender, instance, **kwargs):
+    release(variant_names(instance.profile_picture_variants))
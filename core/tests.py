@@ -1,12 +1,40 @@
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+
+
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+from rest_framework.test import APITestCase, APITransactionTestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from social_core.exceptions import AuthException
+from social_core.pipeline import DEFAULT_AUTH_PIPELINE
+import cloudinary
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from social_django.models import UserSocialAuth
+from core.authentication import user_cache_key, verified_tokens
+from core.google import GoogleIdTokenError, JsonWebKeySet
+from core.models import MediaAsset, ProfilePictureJob, RevokedToken
+from core.pictures import get_image_processing_pool, process_profile_picture
+from core.revocation import REVOCATION_NAMESPACE, BloomFilter, revocation_list
+from core.hashing import HashingPool
+from common.cache import bump_cache_version
 
 User = get_user_model()
 
@@ -68,6 +96,27 @@ class UserProfileTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['email'], self.user.email)
 
+    def test_get_user_profile_not_modified(self):
+        response = self.client.get(self.profile_url)
+        self.assertIn('Last-Modified', response)
+        response = self.client.get(self.profile_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        etag = response['ETag']
+        self.user.phone = '0987654321'
+        self.user.save()
+        response = self.client.get(self.profile_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['phone'], '0987654321')
+
+    def test_picture_uploaded_to_former_cloudinary_field(self):
+        self.user.profile_picture = 'image/upload/v1700000000/abc123.jpg'
+        self.user.save()
+        with patch.object(cloudinary.config(), 'cloud_name', 'demo'), patch.object(cloudinary.config(), 'secure', True):
+            response = self.client.get(self.profile_url)
+        self.assertEqual(response.data['profile_picture'],
+                         'https://res.cloudinary.com/demo/image/upload/v1700000000/abc123.jpg')
+
     def test_get_user_profile_unauthorized(self):
         self.client.logout()  # Log the user out
         response = self.client.get(self.profile_url, format='json')
@@ -98,6 +147,134 @@ class UserProfileUpdateTests(APITestCase):
         self.assertTrue('profile_picture' in response.data)
 
 
+def make_image(image_format='PNG', size=(800, 600), exif=None):
+    buffer = BytesIO()
+    image = Image.new('RGB', size, 'red')
+    image.save(buffer, format=image_format, **({'exif': exif} if exif else {}))
+    return buffer.getvalue()
+
+
+class ProfilePicturePipelineTestCase(APITransactionTestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = self.settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user(email='jane.doe@example.com', name='Jane Doe')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('user_profile_update')
+
+    def upload(self, data, name='profile.png'):
+        return self.client.put(self.url, {'profile_picture': SimpleUploadedFile(name, data)}, format='multipart')
+
+    def test_upload_is_processed_in_background(self):
+        exif = Image.Exif()
+        exif[0x010e] = 'private description'
+        response = self.upload(make_image('JPEG', exif=exif.tobytes()), name='profile.jpg')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = response.data['profile_picture_job']
+        self.assertEqual(job['status'], ProfilePictureJob.PENDING)
+
+        get_image_processing_pool().join(timeout=60)
+        response = self.client.get(job['status_url'])
+        self.assertEqual(response.data['status'], ProfilePictureJob.DONE)
+        self.assertEqual(set(response.data['variants']), {'64', '256', '512'})
+        self.assertEqual(set(response.data['variants']['64']), {'webp', 'jpeg'})
+
+        self.user.refresh_from_db()
+        with self.user.profile_picture.open('rb') as f:
+            picture = Image.open(f)
+            self.assertEqual((picture.format, picture.size), ('JPEG', (512, 384)))
+            self.assertEqual(dict(picture.getexif()), {})
+        self.assertFalse(ProfilePictureJob.objects.get(pk=job['id']).source)
+
+        profile = self.client.get(reverse('user_profile')).data
+        self.assertTrue(profile['profile_picture'].endswith('/512.jpg'))
+        self.assertTrue(profile['profile_picture_variants']['64']['webp'].endswith('/64.webp'))
+
+    def test_upload_is_staged_locally_until_processed(self):
+        with patch.object(get_image_processing_pool(), 'submit'):
+            response = self.upload(make_image())
+        job = ProfilePictureJob.objects.get(pk=response.data['profile_picture_job']['id'])
+        staged = Path(settings.UPLOAD_STAGING_ROOT) / job.source.name
+        self.assertTrue(staged.exists())
+        self.assertFalse(default_storage.exists(job.source.name))
+
+        process_profile_picture(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ProfilePictureJob.DONE)
+        self.assertFalse(job.source)
+        self.assertFalse(staged.exists())
+        self.assertTrue(default_storage.exists(job.variants['64']['webp']))
+
+    def test_file_that_is_not_an_image_is_rejected(self):
+        response = self.upload(b'GIF89a' + b'0' * 100, name='profile.png')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ProfilePictureJob.objects.exists())
+
+    def test_undecodable_image_fails_job(self):
+        job = ProfilePictureJob.objects.create(user=self.user)
+        job.source.save('broken.png', ContentFile(make_image()[:200]))
+        staged = Path(job.source.path)
+        process_profile_picture(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ProfilePictureJob.FAILED)
+        self.assertTrue(job.error)
+        self.assertFalse(staged.exists())
+
+    def test_older_upload_does_not_replace_newer_picture(self):
+        older = ProfilePictureJob.objects.create(user=self.user)
+        older.source.save('older.png', ContentFile(make_image(size=(100, 100))))
+        newer = ProfilePictureJob.objects.create(user=self.user)
+        newer.source.save('newer.png', ContentFile(make_image(size=(300, 300))))
+        process_profile_picture(newer.id)
+        process_profile_picture(older.id)
+        self.user.refresh_from_db()
+        self.assertIn(str(newer.id), self.user.profile_picture.name)
+
+    def test_same_picture_is_stored_and_processed_once(self):
+        data = make_image()
+        self.upload(data)
+        get_image_processing_pool().join(timeout=60)
+        self.assertEqual(MediaAsset.objects.count(), 6)
+
+        other = User.objects.create_user(email='john.doe@example.com', name='John Doe')
+        self.client.force_authenticate(user=other)
+        with patch.object(get_image_processing_pool(), 'submit') as submit:
+            response = self.upload(data)
+        submit.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['profile_picture_job']['status'], ProfilePictureJob.DONE)
+        other.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(other.profile_picture_variants, self.user.profile_picture_variants)
+        self.assertEqual(set(MediaAsset.objects.values_list('references', flat=True)), {2})
+
+        other.delete()
+        self.assertEqual(set(MediaAsset.objects.values_list('references', flat=True)), {1})
+
+    def test_replaced_picture_is_purged(self):
+        for size in [(600, 600), (700, 600)]:
+            job = ProfilePictureJob.objects.create(user=self.user)
+            job.source.save('picture.png', ContentFile(make_image(size=size)))
+            process_profile_picture(job.id)
+        self.assertEqual(MediaAsset.objects.filter(references=0).count(), 6)
+        unreferenced = list(MediaAsset.objects.filter(references=0).values_list('name', flat=True))
+
+        call_command('purge_media_assets', stdout=StringIO())
+        self.assertEqual(MediaAsset.objects.count(), 12)
+        call_command('purge_media_assets', '--grace-minutes=0', stdout=StringIO())
+        self.assertEqual(MediaAsset.objects.count(), 6)
+        self.assertFalse(any(default_storage.exists(name) for name in unreferenced))
+
+    def test_upload_is_refused_when_pool_is_full(self):
+        with patch.object(get_image_processing_pool(), 'saturated', return_value=True):
+            response = self.upload(make_image())
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(ProfilePictureJob.objects.exists())
+
+
 class GoogleOAuth2LoginAPITestCase(APITestCase):
     def setUp(self):
         self.url = reverse('google-auth')  # Update with the correct URL name
@@ -184,4 +361,410 @@ class GoogleOAuth2LoginAPITestCase(APITestCase):
         response = self.client.post(self.url, {'access_token': 'mock_access_token'}, format='json')
 
         # Assert server error response
-        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class GoogleIdTokenLoginTestCase(APITestCase):
+    """Google ID tokens verified against a local key set fixture, without network access."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(cls.private_key.public_key()))
+        cls.key_dir = tempfile.TemporaryDirectory()
+        cls.jwks_path = Path(cls.key_dir.name) / 'certs.json'
+        cls.jwks_path.write_text(json.dumps({'keys': [{**jwk, 'kid': 'key-1', 'alg': 'RS256', 'use': 'sig'}]}))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.key_dir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.url = reverse('google-auth')
+        override = self.settings(GOOGLE_JWKS_URL=self.jwks_path.as_uri(), SOCIAL_AUTH_GOOGLE_OAUTH2_KEY='client-id')
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def id_token(self, kid='key-1', **claims):
+        now = int(time.time())
+        payload = {'iss': 'https://accounts.google.com', 'aud': 'client-id', 'sub': '1234567890',
+                   'email': 'googler@example.com', 'email_verified': True, 'name': 'Google User',
+                   'iat': now, 'exp': now + 300, **claims}
+        return jwt.encode(payload, self.private_key, algorithm='RS256', headers={'kid': kid})
+
+    def test_login_creates_and_reuses_social_user(self):
+        response = self.client.post(self.url, {'id_token': self.id_token()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user = User.objects.get(email='googler@example.com')
+        self.assertEqual(user.name, 'Google User')
+        self.assertEqual(AccessToken(response.data['access'])['user_id'], str(user.id))
+
+        response = self.client.post(self.url, {'id_token': self.id_token()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(UserSocialAuth.objects.get().user, user)
+
+    def test_login_does_not_link_existing_user_by_email(self):
+        User.objects.create_user(email='googler@example.com', name="Existing", password='secret')
+        response = self.client.post(self.url, {'id_token': self.id_token()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserSocialAuth.objects.exists())
+
+    def test_login_links_existing_user_by_email_if_the_pipeline_does(self):
+        user = User.objects.create_user(email='googler@example.com', name="Existing", password='secret')
+        pipeline = [*DEFAULT_AUTH_PIPELINE]
+        pipeline.insert(pipeline.index('social_core.pipeline.user.get_username'),
+                        'social_core.pipeline.social_auth.associate_by_email')
+        with self.settings(SOCIAL_AUTH_PIPELINE=pipeline):
+            response = self.client.post(self.url, {'id_token': self.id_token()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(UserSocialAuth.objects.get().user, user)
+
+    def test_login_racing_a_registration_with_the_same_email(self):
+        user = User.objects.create_user(email='googler@example.com', name="Existing", password='secret')
+        filter_users = User.objects.filter
+        lookups = []
+
+        def registered_meanwhile(*args, **kwargs):
+            # The first email lookup runs before the other registration commits.
+            lookups.append(kwargs)
+            return User.objects.none() if len(lookups) == 1 else filter_users(*args, **kwargs)
+
+        with patch.object(User.objects, 'filter', side_effect=registered_meanwhile):
+            response = self.client.post(self.url, {'id_token': self.id_token()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserSocialAuth.objects.exists())
+
+        lookups.clear()
+        pipeline = [*DEFAULT_AUTH_PIPELINE]
+        pipeline.insert(pipeline.index('social_core.pipeline.user.get_username'),
+                        'social_core.pipeline.social_auth.associate_by_email')
+        with self.settings(SOCIAL_AUTH_PIPELINE=pipeline), \
+                patch.object(User.objects, 'filter', side_effect=registered_meanwhile):
+            response = self.client.post(self.url, {'id_token': self.id_token()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(UserSocialAuth.objects.get().user, user)
+
+    def test_invalid_tokens_are_rejected(self):
+        other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        forged = jwt.encode({'sub': '1'}, other_key, algorithm='RS256', headers={'kid': 'key-1'})
+        for token in [self.id_token(aud='other-client'), self.id_token(exp=int(time.time()) - 60),
+                      self.id_token(iss='https://evil.example.com'), self.id_token(email_verified=False),
+                      self.id_token(kid='unknown'), forged, 'not-a-token']:
+            response = self.client.post(self.url, {'id_token': token}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, token)
+        self.assertFalse(User.objects.exists())
+
+    def test_concurrent_key_set_loads_are_single_flight(self):
+        key_set = JsonWebKeySet(self.jwks_path.as_uri(), refresh_interval=3600, min_refresh_interval=60, timeout=1)
+        fetch = key_set.fetch
+
+        def slow_fetch():
+            time.sleep(0.2)
+            return fetch()
+
+        keys = []
+        with patch.object(key_set, 'fetch', side_effect=slow_fetch) as mock_fetch:
+            threads = [threading.Thread(target=lambda: keys.append(key_set.get_signing_key('key-1')))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertEqual(len(keys), 8)
+
+    def test_unknown_key_id_reload_is_rate_limited(self):
+        key_set = JsonWebKeySet(self.jwks_path.as_uri(), refresh_interval=3600, min_refresh_interval=60, timeout=1)
+        key_set.get_signing_key('key-1')
+        with patch.object(key_set, 'fetch') as mock_fetch:
+            for _ in range(3):
+                self.assertRaises(GoogleIdTokenError, key_set.get_signing_key, 'unknown')
+        mock_fetch.assert_not_called()
+
+
+class AsyncAuthTestCase(APITestCase):
+    def setUp(self):
+        self.login_url = reverse('async-login')
+        self.registration_url = reverse('async-registration')
+        self.credentials = {"email": "testuser@example.com", "password": "testpass123!"}
+
+    def register(self):
+        data = {**self.credentials, "name": "Test User", "phone": "+1234567890"}
+        return self.client.post(self.registration_url, data, format='json')
+
+    def test_register_and_login(self):
+        response = self.register()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = User.objects.get(email=self.credentials['email'])
+        self.assertTrue(user.check_password(self.credentials['password']))
+
+        response = self.client.post(self.login_url, self.credentials, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.json())
+        self.assertIn('refresh', response.json())
+
+    def test_register_duplicate_email(self):
+        self.register()
+        response = self.register()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', response.json()['errors'])
+
+    def test_login_invalid_credentials(self):
+        self.register()
+        for credentials in [{**self.credentials, "password": "wrong"}, {**self.credentials, "email": "no@example.com"}]:
+            response = self.client.post(self.login_url, credentials, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.json(), {'non_field_errors': ['Invalid credentials']})
+
+    def test_login_upgrades_outdated_hash(self):
+        with self.settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+            user = User.objects.create_user(email=self.credentials['email'], password=self.credentials['password'])
+        self.assertTrue(user.password.startswith('md5$'))
+        with self.settings(PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.PBKDF2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher'
+        ]):
+            response = self.client.post(self.login_url, self.credentials, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertFalse(user.password.startswith('md5$'))
+        self.assertTrue(user.check_password(self.credentials['password']))
+
+    def test_saturated_pool_returns_503(self):
+        pool = HashingPool(workers=1, queue_depth=0)
+        release = threading.Event()
+        pool.submit(release.wait)
+        try:
+            with patch('core.async_views.get_hashing_pool', return_value=pool):
+                response = self.client.post(self.login_url, self.credentials, format='json')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response['Retry-After'], '1')
+        finally:
+            release.set()
+            pool.executor.shutdown()
+
+
+class AsyncUserProfileTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        verified_tokens.clear()
+        revocation_list.reset()
+        self.url = reverse('async-user-profile')
+        self.user = User.objects.create_user(email='testuser@example.com', name="Test User")
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def test_profile_matches_sync_view(self):
+        expected = self.client.get(reverse('user_profile'))
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response['ETag'], expected['ETag'])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_user_is_loaded_with_async_orm(self):
+        # The user row and the revocation list's initial load, as for the sync views.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()['name'], 'Test User')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoked_token_is_rejected(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse('logout'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class CachedJWTAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        verified_tokens.clear()
+        revocation_list.reset()
+        self.profile_url = reverse('user_profile')
+        self.user = User.objects.create_user(email='testuser@example.com', name="Test User")
+
+    def authenticate(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_user_is_cached(self):
+        self.authenticate(AccessToken.for_user(self.user))
+        # The user row and the revocation list's initial load.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.profile_url)
+        self.assertEqual(response.data['name'], 'Test User')
+
+    def test_profile_update_invalidates_cached_user(self):
+        self.authenticate(AccessToken.for_user(self.user))
+        self.client.get(self.profile_url)
+        response = self.client.put(reverse('user_profile_update'), {'name': 'Renamed'}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.profile_url).data['name'], 'Renamed')
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate(AccessToken.for_user(self.user))
+        self.client.get(self.profile_url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_token_still_expires(self):
+        token = AccessToken.for_user(self.user)
+        self.authenticate(token)
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_200_OK)
+
+        # Move the clocks of the verified token cache and of PyJWT past the expiry.
+        class Later(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.fromtimestamp(token['exp'] + 1, tz)
+
+        with patch('core.authentication.time.time', return_value=token['exp'] + 1), \
+                patch('jwt.api_jwt.datetime', Later):
+            self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_user_has_no_password(self):
+        self.user.set_password('secret-password')
+        self.user.save()
+        self.authenticate(AccessToken.for_user(self.user))
+        self.client.get(self.profile_url)
+        cached = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn(self.user.password, cached[1])
+        self.assertEqual(self.client.get(self.profile_url).data['email'], 'testuser@example.com')
+
+    def test_profile_update_writes_only_profile_fields(self):
+        self.authenticate(AccessToken.for_user(self.user))
+        self.client.get(self.profile_url)
+        # Written by another worker while this one serves the cached user.
+        User.objects.filter(pk=self.user.pk).update(profile_picture='profile-pictures/new.jpg', is_staff=True)
+        response = self.client.put(reverse('user_profile_update'), {'name': 'Renamed'}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'Renamed')
+        self.assertEqual(self.user.profile_picture.name, 'profile-pictures/new.jpg')
+        self.assertTrue(self.user.is_staff)
+
+    def test_tampered_token_is_rejected(self):
+        token = str(AccessToken.for_user(self.user))
+        self.authenticate(token)
+        self.client.get(self.profile_url)
+        self.authenticate(token[:-2] + ('AA' if not token.endswith('AA') else 'BB'))
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenRevocationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        verified_tokens.clear()
+        revocation_list.reset()
+        self.refresh_url = reverse('token-refresh')
+        self.logout_url = reverse('logout')
+        self.profile_url = reverse('user_profile')
+        self.user = User.objects.create_user(email='testuser@example.com', name="Test User")
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+
+    def logout(self, refresh=None):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        return self.client.post(self.logout_url, {'refresh': str(refresh or self.refresh)}, format='json')
+
+    def test_refresh(self):
+        response = self.client.post(self.refresh_url, {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['user_id'], str(self.user.id))
+
+    def test_logout_revokes_refresh_and_access_tokens(self):
+        self.assertEqual(self.client.get(self.profile_url, HTTP_AUTHORIZATION=f'Bearer {self.access}').status_code,
+                         status.HTTP_200_OK)
+        response = self.logout()
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(RevokedToken.objects.count(), 2)
+
+        response = self.client.post(self.refresh_url, {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_rejects_another_users_refresh_token(self):
+        other = User.objects.create_user(email='other@example.com', name="Other User")
+        response = self.logout(RefreshToken.for_user(other))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_rotation_revokes_old_refresh_token(self):
+        with patch.multiple('core.serializers.api_settings', ROTATE_REFRESH_TOKENS=True,
+                            BLACKLIST_AFTER_ROTATION=True):
+            response = self.client.post(self.refresh_url, {'refresh': str(self.refresh)}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response.data['refresh'], str(self.refresh))
+            response = self.client.post(self.refresh_url, {'refresh': str(self.refresh)}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unrevoked_token_check_does_not_query(self):
+        revocation_list.is_revoked('warm-up')
+        with self.assertNumQueries(0):
+            self.assertFalse(revocation_list.is_revoked(self.refresh['jti']))
+
+    def test_revocation_by_another_process_is_picked_up(self):
+        revocation_list.is_revoked('warm-up')
+        RevokedToken.objects.create(jti=self.refresh['jti'], expires_at=timezone.now() + timedelta(days=1))
+        bump_cache_version(REVOCATION_NAMESPACE)
+        with self.settings(REVOCATION_REFRESH_INTERVAL=0):
+            self.assertTrue(revocation_list.is_revoked(self.refresh['jti']))
+
+    def test_refresh_does_not_query_until_the_version_changes(self):
+        revocation_list.is_revoked('warm-up')
+        with self.settings(REVOCATION_REFRESH_INTERVAL=0), self.assertNumQueries(0):
+            self.assertFalse(revocation_list.is_revoked(self.refresh['jti']))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.logout()
+        with self.settings(REVOCATION_REFRESH_INTERVAL=0), self.assertNumQueries(1):
+            revocation_list.refresh()
+
+    def test_purge_deletes_expired_entries(self):
+        RevokedToken.objects.create(jti='expired', expires_at=timezone.now() - timedelta(minutes=1))
+        RevokedToken.objects.create(jti='current', expires_at=timezone.now() + timedelta(minutes=1))
+        call_command('purge_revoked_tokens', stdout=StringIO())
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['current'])
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        values = [f'jti-{i}' for i in range(1000)]
+        for value in values:
+            bloom.add(value)
+        self.assertTrue(all(value in bloom for value in values))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class DatabasePoolStatsTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('db-pool-stats')
+        self.user = User.objects.create_user(email='testuser@example.com', name="Test User")
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_stats(self):
+        self.user.is_staff = True
+        self.client.force_authenticate(user=self.user)
+        stats = {'default': {'in_use': 1, 'idle': 3, 'waiting': 0}}
+        with patch('core.views.pool_stats', return_value=stats):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['pools'], stats)
+
+    def test_superuser_is_admin(self):
+        superuser = User.objects.create_superuser(email='admin@example.com', password='password', name="Admin")
+        self.client.force_authenticate(user=superuser)
+        with patch('core.views.pool_stats', return_value={}):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
@@ -4,7 +4,12 @@ from core.views import *
 urlpatterns = [
     path('auth/register/', Registration.as_view(), name='registration'),
     path('auth/login/', LoginView.as_view(), name='login'),
+    path('auth/token/refresh/', RefreshTokenView.as_view(), name='token-refresh'),
+    path('auth/logout/', LogoutView.as_view(), name='logout'),
     path('profile/', UserProfileView.as_view(), name='user_profile'),
     path('profile/update/', UserProfileUpdateView.as_view(), name='user_profile_update'),
+    path('profile/picture/jobs/<uuid:pk>/', ProfilePictureJobView.as_view(), name='profile-picture-job'),
     path('auth/google/', GoogleOAuth2Login.as_view(), name='google-auth'),
+    path('ops/db-pool/', DatabasePoolStatsView.as_view(), name='db-pool-stats'),
+    path('ops/metrics/', MetricsView.as_view(), name='metrics'),
 ]
@@ -1,5 +1,3 @@
-import os
-
 from django.core.exceptions import ValidationError
 
 import re
@@ -23,18 +21,35 @@ def validate_phone(phone):
     return phone
 
 
+# Leading bytes of the accepted image formats; checked instead of trusting the file name or content type.
+IMAGE_SIGNATURES = {
+    b'\xff\xd8\xff': 'jpeg',
+    b'\x89PNG\r\n\x1a\n': 'png',
+}
+IMAGE_SNIFF_BYTES = 16
+
+
+def sniff_image_type(image):
+    """Return the image type from the first bytes of ``image``, or ``None``; the file position is restored."""
+    position = image.tell()
+    image.seek(0)
+    head = image.read(IMAGE_SNIFF_BYTES)
+    image.seek(position)
+    return next((kind for signature, kind in IMAGE_SIGNATURES.items() if head.startswith(signature)), None)
+
+
 def validate_image(image):
     file_size = image.size
     limit_kb = 500
     if file_size > limit_kb * 1024:
         raise ValidationError("Image size exceeds the limit of 500KB.")
 
-    valid_extensions = ['.jpg', '.jpeg', '.png']
-    file_extension = os.path.splitext(image.name)[1].lower()
-    if file_extension not in valid_extensions:
-        raise ValidationError("Invalid file type. Only '.jpg', '.jpeg', and '.png' are allowed.")
+    if sniff_image_type(image) is None:
+        raise ValidationError("Invalid file type. Only JPEG and PNG images are allowed.")
 
     return image
+
+
 def validate_password_complexity(password):
     """Ensure password meets complexity requirements."""
     if not re.search(r'\d', password):
@@ -4,18 +4,29 @@ from venv import logger
 
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
-from rest_framework_simplejwt.views import TokenObtainPairView
-from .serializers import RegistrationSerializer, LoginSerializer, UserProfileSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .models import ProfilePictureJob
+from .pictures import get_image_processing_pool, reuse_profile_picture, schedule_profile_picture
+from .google import GoogleIdTokenError, get_or_create_social_user, verify_id_token
+from .revocation import revoke_token
+from .serializers import (RegistrationSerializer, LoginSerializer, UserProfileSerializer, LogoutSerializer,
+                          RevocableTokenRefreshSerializer, ProfilePictureJobSerializer)
 from rest_framework.response import Response
 from django.db import transaction
 from rest_framework_simplejwt.tokens import RefreshToken
+from common.conditional import instance_validators, not_modified, set_validators
 from common.docs import *
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from common.db import pool_stats
+from common.metrics import PROMETHEUS_CONTENT_TYPE, metrics_registry, render_prometheus
+from common.routing import ReplicaReadMixin
+from common.timing import timed
 from social_django.utils import load_strategy, load_backend
 from social_core.backends.google import GoogleOAuth2
 from social_core.exceptions import AuthException
 from django.conf import settings
 from django.contrib.auth import login
+from django.http import HttpResponse
 
 
 class Registration(APIView):
@@ -66,7 +77,36 @@ class LoginView(TokenObtainPairView):
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class UserProfileView(APIView):
+class RefreshTokenView(TokenRefreshView):
+    serializer_class = RevocableTokenRefreshSerializer
+
+    @token_refresh_docs()
+    @transaction.atomic()
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+
+class LogoutView(APIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = LogoutSerializer
+
+    @logout_docs()
+    @transaction.atomic()
+    def post(self, request):
+        try:
+            serializer = self.serializer_class(data=request.data, context={'request': request})
+            if serializer.is_valid():
+                revoke_token(serializer.validated_data['refresh'])
+                revoke_token(request.auth)
+                return Response(status=status.HTTP_204_NO_CONTENT)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logging.error(f"Error occurred: {e}")
+            return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class UserProfileView(ReplicaReadMixin, APIView):
     serializer_class = UserProfileSerializer
 
     @user_profile_docs()
@@ -76,8 +116,12 @@ class UserProfileView(APIView):
             if not user or not user.is_authenticated:
                 return Response({'message': 'User not authenticated', 'data': None},
                                 status=status.HTTP_401_UNAUTHORIZED)
-            serializer = self.serializer_class(user)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            etag, last_modified = instance_validators(user)
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                serializer = self.serializer_class(user)
+                response = Response(serializer.data, status=status.HTTP_200_OK)
+            return set_validators(response, etag, last_modified)
         except Exception as e:
             logging.error(f"Error occurred: {e}")
             return Response(status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -88,15 +132,32 @@ class UserProfileUpdateView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
-    @user_profile_docs()
+    @user_profile_update_docs()
     def put(self, request):
         try:
             user = request.user
             # Partial update allows updating only a subset of fields
-            serializer = self.serializer_class(user, data=request.data, partial=True)
+            serializer = self.serializer_class(user, data=request.data, partial=True, context={'request': request})
             if serializer.is_valid():
-                serializer.save()
-                return Response(serializer.data, status=status.HTTP_200_OK)
+                picture = serializer.validated_data.pop('profile_picture', None)
+                if picture is not None and get_image_processing_pool().saturated():
+                    response = Response({'message': 'Server busy, please retry shortly', 'data': None},
+                                        status=status.HTTP_503_SERVICE_UNAVAILABLE)
+                    response['Retry-After'] = '5'
+                    return response
+
+                with transaction.atomic():
+                    serializer.save()
+                    if picture is None:
+                        return Response(serializer.data, status=status.HTTP_200_OK)
+                    # A picture uploaded before is not stored or processed again.
+                    job = reuse_profile_picture(user, picture.sha256)
+                    if job is None:
+                        # The picture is processed in the background; the job reports its progress.
+                        job = schedule_profile_picture(user, picture, picture.sha256)
+                return Response({**serializer.data, 'profile_picture_job': ProfilePictureJobSerializer(job).data},
+                                status=status.HTTP_200_OK if job.status == ProfilePictureJob.DONE
+                                else status.HTTP_202_ACCEPTED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logging.error(f"Error occurred during profile update: {e}")
@@ -104,6 +165,23 @@ class UserProfileUpdateView(APIView):
             return Response({'message': 'An unexpected error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class ProfilePictureJobView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @profile_picture_job_docs()
+    def get(self, request, pk):
+        try:
+            job = ProfilePictureJob.objects.filter(pk=pk, user=request.user).first()
+            if job is None:
+                return Response({'message': 'Profile picture job not found', 'data': None},
+                                status=status.HTTP_404_NOT_FOUND)
+            return Response(ProfilePictureJobSerializer(job).data, status=status.HTTP_200_OK)
+        except Exception as e:
+            logging.error(f"Error occurred: {e}")
+            return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class GoogleOAuth2Login(APIView):
     permission_classes = [AllowAny]
 
@@ -113,15 +191,21 @@ class GoogleOAuth2Login(APIView):
             strategy = load_strategy(request)
             backend = load_backend(strategy, 'google-oauth2', None)
 
+            id_token = request.data.get('id_token')
             try:
-                # Get the access token from the request data
-                user = backend.do_auth(request.data.get('access_token'))
-            except AuthException as e:
+                if id_token:
+                    # Verified locally against Google's cached signing keys, no call to Google.
+                    user = get_or_create_social_user(backend, verify_id_token(id_token))
+                else:
+                    # Get the access token from the request data
+                    with timed('google'):
+                        user = backend.do_auth(request.data.get('access_token'))
+            except (AuthException, GoogleIdTokenError) as e:
                 return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
             if user and user.is_active:
                 # Login the user and create a JWT token
-                login(request, user)
+                login(request, user, backend='social_core.backends.google.GoogleOAuth2')
                 refresh = RefreshToken.for_user(user)
 
                 return Response({
@@ -133,3 +217,29 @@ class GoogleOAuth2Login(APIView):
         except Exception as e:
             logging.error(f"Error occurred: {e}")
             return Response(status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class DatabasePoolStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @database_pool_stats_docs()
+    def get(self, request):
+        try:
+            return Response({'pooling': settings.DB_POOL, 'pools': pool_stats()}, status=status.HTTP_200_OK)
+        except Exception as e:
+            logging.error(f"Error occurred: {e}")
+            return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @metrics_docs()
+    def get(self, request):
+        try:
+            return HttpResponse(render_prometheus(*metrics_registry.collect()), content_type=PROMETHEUS_CONTENT_TYPE)
+        except Exception as e:
+            logging.error(f"Error occurred: {e}")
+            return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,10 @@
+from django.urls import path
+from .async_views import *
+
+urlpatterns = [
+    path('skills/', AsyncSkillListView.as_view(), name='async-skill-list'),
+    path('user-skills/', AsyncUserSkillListView.as_view(), name='async-user-skill-list'),
+    path('users/search/', AsyncUserSearchView.as_view(), name='async-user-search'),
+    path('user-interests/', AsyncUserInterestsView.as_view(), name='async-user-interests'),
+    path('interests/', AsyncInterestListView.as_view(), name='async-predefined-interests'),
+]
@@ -0,0 +1,123 @@
+from django.conf import settings
+from rest_framework import status
+from .catalog import INTEREST_CATALOG, SKILL_CATALOG, acatalog_response
+from .models import Interest, Skill, UserInterest, UserSkill
+from .search import QuerySyntaxError, asearch_users, boolean_search_users, parse_boolean_query
+from .serializers import InterestSerializer, SkillSerializer, UserInterestSerializer, UserSearchSerializer, \
+    UserSkillSerializer
+from common.async_views import AsyncAPIView, render
+from common.cache import aget_cache_version
+from common.conditional import aqueryset_validators, not_modified, set_validators
+from common.pagination import KeysetPagination
+from common.streaming import NDJSONRenderer, astream_ndjson, stream_requested
+from core.models import User
+
+
+class AsyncSkillListView(AsyncAPIView):
+    """Async ``SkillListView``."""
+    serializer_class = SkillSerializer
+    pagination_class = KeysetPagination
+    pagination_ordering = ('name',)
+
+    async def get(self, request):
+        return await acatalog_response(request, self, Skill.objects.only('id', 'name'), SKILL_CATALOG)
+
+
+class AsyncInterestListView(AsyncSkillListView):
+    """Async ``InterestListView``."""
+    serializer_class = InterestSerializer
+
+    async def get(self, request):
+        return await acatalog_response(request, self, Interest.objects.only('id', 'name'), INTEREST_CATALOG)
+
+
+class AsyncUserSkillListView(AsyncAPIView):
+    """Async ``UserSkillListView``."""
+    serializer_class = UserSkillSerializer
+    pagination_class = KeysetPagination
+    model = UserSkill
+    catalog = SKILL_CATALOG
+
+    async def get(self, request):
+        rows = self.model.objects.filter(user=request.user)
+        # The catalog version covers renamed skills/interests, which are part of the response.
+        etag, last_modified = await aqueryset_validators(rows, await aget_cache_version(self.catalog))
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            paginator = self.pagination_class()
+            page = await paginator.apaginate_queryset(self.serializer_class.setup_eager_loading(rows), request, view=self)
+            serializer = self.serializer_class(page, many=True)
+            response = render(paginator.get_paginated_response(serializer.data).data)
+        return set_validators(response, etag, last_modified)
+
+
+class AsyncUserInterestsView(AsyncUserSkillListView):
+    """Async ``UserInterestsView``."""
+    serializer_class = UserInterestSerializer
+    model = UserInterest
+    catalog = INTEREST_CATALOG
+
+
+class AsyncUserSearchView(AsyncAPIView):
+    """
+    Async ``UserSearchView``. NDJSON results (``Accept: application/x-ndjson`` or ``stream``)
+    are streamed from an async iterator.
+    """
+    serializer_class = UserSearchSerializer
+    pagination_class = KeysetPagination
+
+    async def get(self, request):
+        skills_query = request.query_params.get('skills')
+        job_type_query = request.query_params.get('job_type')
+        boolean_query = request.query_params.get('q')
+        try:
+            if self.wants_ndjson(request):
+                return await self.stream(boolean_query, skills_query, job_type_query)
+
+            paginator = self.pagination_class()
+            if boolean_query:
+                position = paginator.decode_cursor(request, ('id',), User.objects.all())
+                users = boolean_search_users(
+                    boolean_query, job_type_query,
+                    after=position[0] if position else None,
+                    limit=paginator.get_page_size(request) + 1,
+                )
+            else:
+                users = await asearch_users(skills_query, job_type_query)
+
+            users = self.serializer_class.setup_eager_loading(users)
+            page = await paginator.apaginate_queryset(users, request, view=self)
+        except QuerySyntaxError as e:
+            return render({'q': [str(e)]}, status.HTTP_400_BAD_REQUEST)
+        if not page:
+            return render({"detail": "No users found matching the criteria."}, status.HTTP_404_NOT_FOUND)
+        serializer = self.serializer_class(page, many=True)
+        return render(paginator.get_paginated_response(serializer.data).data)
+
+    @staticmethod
+    def wants_ndjson(request):
+        return (NDJSONRenderer.media_type in request.headers.get('Accept', '')
+                or request.query_params.get('format') == NDJSONRenderer.format or stream_requested(request))
+
+    async def stream(self, boolean_query, skills_query, job_type_query):
+        chunk_size = settings.STREAM_CHUNK_SIZE
+        if not boolean_query:
+            users = self.serializer_class.setup_eager_loading(await asearch_users(skills_query, job_type_query))
+            return astream_ndjson(users.aiterator(chunk_size=chunk_size), self.serializer_class, chunk_size)
+
+        parse_boolean_query(boolean_query)
+
+        async def users():
+            after = None
+            while True:
+                chunk = boolean_search_users(boolean_query, job_type_query, after=after, limit=chunk_size)
+                if after is not None:
+                    chunk = chunk.filter(id__gt=after)
+                chunk = [user async for user in self.serializer_class.setup_eager_loading(chunk)[:chunk_size]]
+                for user in chunk:
+                    yield user
+                if len(chunk) < chunk_size:
+                    return
+                after = chunk[-1].id
+
+        return astream_ndjson(users(), self.serializer_class, chunk_size)
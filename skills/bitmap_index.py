@@ -0,0 +1,410 @@
+"""
+Memory-mapped bitmap index over users for boolean skill / job type queries.
+
+Every user gets a dense ordinal (its position in the index, which is sorted by id) and
+every skill and job type gets one bitset over those ordinals. The index is written to a
+single file by the ``build_search_index`` management command; every worker maps it
+read-only so the page cache holds one shared copy.
+
+Writes after the build are appended to a delta log next to the index (one JSON line with
+the full skill / job type set of a changed user). Each worker replays new lines into a
+small private overlay before answering a query, so all workers converge on the same
+state without rebuilding the file. Every build starts a new delta log, named in the
+header, holding only the changes the new file does not contain; the old log is deleted.
+
+Skills are keyed by id, so renaming a skill needs no change to the index.
+
+File layout (little endian)::
+
+    magic (8 bytes) | header length (8 bytes) | JSON header | padding
+    user ids: ``users`` x 16 byte UUIDs, sorted
+    bitsets:  ``len(keys)`` x ``words`` x uint64
+"""
+import json
+import logging
+import mmap
+import fcntl
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+
+MAGIC = b'GDSCBMP1'
+ALIGNMENT = 8
+
+
+def skill_key(skill_id):
+    return f'skill:{skill_id}'
+
+
+def job_type_key(job_type):
+    return f'job_type:{job_type}'
+
+
+def delta_log_path(path, generation):
+    return f'{path}.delta.{generation}'
+
+
+@contextmanager
+def delta_log_lock(path, operation):
+    """
+    Hold a lock on the delta logs of ``path``: shared for appending to the current log,
+    exclusive for switching the index to a new log.
+    """
+    fd = os.open(f'{path}.lock', os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, operation)
+        yield
+    finally:
+        os.close(fd)
+
+
+def read_header(path):
+    with open(path, 'rb') as handle:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a bitmap index file.')
+        header_length = int.from_bytes(handle.read(8), 'little')
+        return json.loads(handle.read(header_length))
+
+
+def delta_log_size(path):
+    """The current size of the delta log of the index at ``path`` (0 without an index)."""
+    try:
+        return os.path.getsize(delta_log_path(path, read_header(path)['delta_log']))
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _words_for(users):
+    return max(1, (users + 63) // 64)
+
+
+def _set_bits(bitset, ordinals):
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    np.bitwise_or.at(bitset, ordinals >> 6, np.left_shift(np.uint64(1), (ordinals & 63).astype(np.uint64)))
+
+
+def write_index(path, user_ids, memberships, delta_offset=0):
+    """
+    Write an index file atomically.
+
+    ``user_ids`` is an iterable of UUIDs and ``memberships`` an iterable of
+    ``(key, user_ids)`` pairs, so callers can stream one key at a time.
+    ``delta_offset`` is the size of the current delta log when the data was read: the
+    records after it are carried over into the new index's delta log.
+    """
+    users = np.array(sorted(user_id.bytes for user_id in user_ids), dtype='S16')
+    words = _words_for(len(users))
+    rows = {}
+    for key, members in memberships:
+        bitset = rows.setdefault(key, np.zeros(words, dtype=np.uint64))
+        members = np.array([user_id.bytes for user_id in members], dtype='S16')
+        if len(members) and len(users):
+            positions = np.minimum(np.searchsorted(users, members), len(users) - 1)
+            # Users created while the index was being built are picked up from the delta log.
+            _set_bits(bitset, positions[users[positions] == members])
+    keys = sorted(rows)
+    bitsets = np.array([rows.pop(key) for key in keys], dtype=np.uint64).reshape(len(keys), words)
+
+    generation = uuid.uuid4().hex
+    header = json.dumps({
+        'users': len(users),
+        'words': words,
+        'keys': keys,
+        'delta_log': generation,
+    }).encode('utf-8')
+    users_offset = _align(len(MAGIC) + 8 + len(header))
+    bitsets_offset = _align(users_offset + users.nbytes)
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as handle:
+        handle.write(MAGIC)
+        handle.write(len(header).to_bytes(8, 'little'))
+        handle.write(header)
+        handle.write(b'\0' * (users_offset - handle.tell()))
+        handle.write(users.tobytes())
+        handle.write(b'\0' * (bitsets_offset - handle.tell()))
+        handle.write(bitsets.tobytes())
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    # No append can happen between copying the records the new file lacks and switching to it.
+    with delta_log_lock(path, fcntl.LOCK_EX):
+        try:
+            old_log = delta_log_path(path, read_header(path)['delta_log'])
+        except (FileNotFoundError, ValueError):
+            old_log = None
+        with open(delta_log_path(path, generation), 'wb') as new_log:
+            if old_log is not None and os.path.exists(old_log):
+                with open(old_log, 'rb') as handle:
+                    handle.seek(delta_offset)
+                    new_log.write(handle.read())
+        os.replace(tmp_path, path)
+        if old_log is not None and os.path.exists(old_log):
+            # Workers still mapping the old file reload it on their next query.
+            os.remove(old_log)
+
+
+def append_delta(path, user_id, keys):
+    """
+    Append the current key set of one user to the delta log.
+
+    ``keys=None`` records that the user was deleted. Each record is written with a
+    single ``write`` on an ``O_APPEND`` descriptor so concurrent writers never interleave.
+    """
+    if not os.path.exists(path):
+        return
+    record = json.dumps({'u': str(user_id), 'k': None if keys is None else sorted(keys)}) + '\n'
+    with delta_log_lock(path, fcntl.LOCK_SH):
+        fd = os.open(delta_log_path(path, read_header(path)['delta_log']), os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                     0o644)
+        try:
+            os.write(fd, record.encode('utf-8'))
+        finally:
+            os.close(fd)
+
+
+class BitmapIndex:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        with open(path, 'rb') as handle:
+            stat = os.fstat(handle.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns)
+            self.buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a bitmap index file.')
+        header_length = int.from_bytes(self.buffer[len(MAGIC):len(MAGIC) + 8], 'little')
+        header_start = len(MAGIC) + 8
+        header = json.loads(self.buffer[header_start:header_start + header_length])
+
+        self.base_users = header['users']
+        self.base_words = header['words']
+        self.key_rows = {key: row for row, key in enumerate(header['keys'])}
+        users_offset = _align(header_start + header_length)
+        bitsets_offset = _align(users_offset + self.base_users * 16)
+        self.users = np.frombuffer(self.buffer, dtype='S16', count=self.base_users, offset=users_offset)
+        self.bitsets = np.frombuffer(
+            self.buffer, dtype=np.uint64, count=len(self.key_rows) * self.base_words, offset=bitsets_offset
+        ).reshape(len(self.key_rows), self.base_words)
+
+        # Private overlay built from the delta log.
+        self.delta_log = delta_log_path(path, header['delta_log'])
+        self.delta_offset = 0
+        self.extra_users = []
+        self.extra_ordinals = {}
+        self.removed = np.zeros(self.base_words, dtype=np.uint64)
+        self.overlay = {}
+
+    @property
+    def user_count(self):
+        return self.base_users + len(self.extra_users)
+
+    @property
+    def words(self):
+        return _words_for(self.user_count)
+
+    def is_current(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns) == self.identity
+
+    # Delta log replay
+
+    def refresh(self):
+        """Apply the delta log records written since the last refresh."""
+        try:
+            size = os.path.getsize(self.delta_log)
+        except FileNotFoundError:
+            # Deleted by a rebuild; the new file is mapped on the next ``get_bitmap_index``.
+            return
+        if size <= self.delta_offset:
+            return
+        with open(self.delta_log, 'rb') as handle:
+            handle.seek(self.delta_offset)
+            data = handle.read(size - self.delta_offset)
+        # Only consume complete lines; a partially written record is picked up next time.
+        complete = data.rfind(b'\n') + 1
+        for line in data[:complete].splitlines():
+            if line:
+                record = json.loads(line)
+                self.apply(uuid.UUID(record['u']), record['k'])
+        self.delta_offset += complete
+
+    def ordinal(self, user_id, create=False):
+        raw = user_id.bytes
+        position = int(np.searchsorted(self.users, raw))
+        # ``S16`` elements drop trailing NUL bytes when read back, so compare raw bytes.
+        if position < self.base_users and self.users[position:position + 1].tobytes() == raw:
+            return position
+        if user_id in self.extra_ordinals:
+            return self.extra_ordinals[user_id]
+        if not create:
+            return None
+        ordinal = self.user_count
+        self.extra_users.append(user_id)
+        self.extra_ordinals[user_id] = ordinal
+        return ordinal
+
+    def writable(self, key):
+        """Return the overlay copy of ``key``'s bitset, creating it on first write."""
+        bitset = self.overlay.get(key)
+        if bitset is None:
+            bitset = np.zeros(self.words, dtype=np.uint64)
+            row = self.key_rows.get(key)
+            if row is not None:
+                bitset[:self.base_words] = self.bitsets[row]
+            self.overlay[key] = bitset
+        elif len(bitset) < self.words:
+            bitset = self.overlay[key] = np.concatenate(
+                [bitset, np.zeros(self.words - len(bitset), dtype=np.uint64)]
+            )
+        return bitset
+
+    def apply(self, user_id, keys):
+        ordinal = self.ordinal(user_id, create=keys is not None)
+        if ordinal is None:
+            return
+        word, bit = ordinal >> 6, np.uint64(1) << np.uint64(ordinal & 63)
+
+        if len(self.removed) < self.words:
+            self.removed = np.concatenate([self.removed, np.zeros(self.words - len(self.removed), dtype=np.uint64)])
+        if keys is None:
+            self.removed[word] |= bit
+            keys = ()
+        else:
+            self.removed[word] &= ~bit
+
+        wanted = set(keys)
+        for key in set(self.key_rows) | set(self.overlay) | wanted:
+            current = self.bitset(key)
+            has_bit = word < len(current) and bool(current[word] & bit)
+            if has_bit != (key in wanted):
+                bitset = self.writable(key)
+                if key in wanted:
+                    bitset[word] |= bit
+                else:
+                    bitset[word] &= ~bit
+
+    # Query evaluation
+
+    def bitset(self, key):
+        bitset = self.overlay.get(key)
+        if bitset is not None:
+            return bitset
+        row = self.key_rows.get(key)
+        if row is None:
+            return np.zeros(self.base_words, dtype=np.uint64)
+        return self.bitsets[row]
+
+    def padded(self, bitset):
+        if len(bitset) == self.words:
+            return bitset
+        return np.concatenate([bitset, np.zeros(self.words - len(bitset), dtype=np.uint64)])
+
+    def universe(self):
+        """Bitset of every live user."""
+        universe = np.full(self.words, np.iinfo(np.uint64).max, dtype=np.uint64)
+        tail = self.user_count & 63
+        if tail:
+            universe[-1] = (1 << tail) - 1
+        elif not self.user_count:
+            universe[:] = 0
+        return universe & ~self.padded(self.removed)
+
+    def evaluate(self, node):
+        kind = node[0]
+        if kind == 'skill':
+            # Resolved to the ids of the skills with that name, see ``skills.search.resolve_skill_names``.
+            result = np.zeros(self.words, dtype=np.uint64)
+            for skill_id in node[1]:
+                result |= self.padded(self.bitset(skill_key(skill_id)))
+            return result
+        if kind == 'not':
+            return ~self.evaluate(node[1]) & self.universe()
+        if kind == 'and':
+            return self.evaluate(node[1]) & self.evaluate(node[2])
+        return self.evaluate(node[1]) | self.evaluate(node[2])
+
+    def matching(self, node, job_type=None):
+        """Bitset of the live users matching ``node`` and ``job_type``."""
+        with self.lock:
+            self.refresh()
+            result = self.evaluate(node)
+            if job_type:
+                result = result & self.padded(self.bitset(job_type_key(job_type)))
+            return result & self.universe()
+
+    def facet_counts(self, node, job_type=None):
+        """Return ``{key: number of matching users}`` for every key with a non-zero count."""
+        counts = {}
+        with self.lock:
+            result = self.matching(node, job_type)
+            for key in set(self.key_rows) | set(self.overlay):
+                count = int(np.bitwise_count(self.padded(self.bitset(key)) & result).sum())
+                if count:
+                    counts[key] = count
+        return counts
+
+    def search(self, node, job_type=None, after=None, limit=None):
+        """
+        Return the ids of the users matching ``node``, sorted, optionally only those
+        greater than ``after`` and at most ``limit`` of them.
+        """
+        result = self.matching(node, job_type)
+        ordinals = np.flatnonzero(np.unpackbits(result.view(np.uint8), bitorder='little'))
+        base = ordinals[ordinals < self.base_users]
+        if after is not None:
+            after = uuid.UUID(str(after))
+            base = base[base >= np.searchsorted(self.users, after.bytes, side='right')]
+        if limit is not None:
+            base = base[:limit]
+        raw = self.users[base].tobytes()
+        ids = [uuid.UUID(bytes=raw[start:start + 16]) for start in range(0, len(raw), 16)]
+
+        # Users created after the build live outside the sorted id range.
+        extra = [self.extra_users[ordinal - self.base_users] for ordinal in ordinals[ordinals >= self.base_users]]
+        if extra:
+            ids = sorted(ids + [user_id for user_id in extra if after is None or user_id > after])
+            if limit is not None:
+                ids = ids[:limit]
+        return ids
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_bitmap_index():
+    """
+    Return this process's view of the index, remapping it when the file was rebuilt.
+
+    Returns ``None`` when no index has been built.
+    """
+    global _index
+    path = settings.SEARCH_INDEX_PATH
+    index = _index
+    if index is not None and index.path == path and index.is_current():
+        return index
+    with _index_lock:
+        if _index is not None and _index.path == path and _index.is_current():
+            return _index
+        if not os.path.exists(path):
+            _index = None
+            return None
+        try:
+            _index = BitmapIndex(path)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error occurred while loading the search index: {e}")
+            _index = None
+        return _index
@@ -0,0 +1,75 @@
+from .models import Interest, Skill, UserInterest, UserSkill
+from .signals import user_search_data_changed
+
+ADDED = 'added'
+EXISTS = 'exists'
+REMOVED = 'removed'
+NOT_PRESENT = 'not_present'
+NOT_FOUND = 'not_found'
+
+
+class BulkLinks:
+    """
+    Adds and removes the catalog entries (skills or interests) linked to a user in bulk.
+
+    Every operation costs a fixed number of statements however many names are given:
+    one to resolve the names, one to read the user's current links and one or two to write.
+    """
+
+    def __init__(self, link_model, catalog_model, field):
+        self.link_model = link_model
+        self.catalog_model = catalog_model
+        self.field = field
+
+    def resolve(self, names):
+        return dict(self.catalog_model.objects.filter(name__in=set(names)).values_list('name', 'id'))
+
+    def linked(self, user, catalog_ids):
+        return set(
+            self.link_model.objects.filter(user=user, **{f'{self.field}_id__in': catalog_ids})
+            .values_list(f'{self.field}_id', flat=True)
+        )
+
+    def changed(self, user):
+        """Hook for bulk inserts, which do not send model signals."""
+
+    def add(self, user, names):
+        ids = self.resolve(names)
+        existing = self.linked(user, ids.values())
+        new_ids = set(ids.values()) - existing
+        # The unique (user, <field>) constraint makes concurrent adds of the same name harmless.
+        self.link_model.objects.bulk_create(
+            [self.link_model(user=user, **{f'{self.field}_id': catalog_id}) for catalog_id in new_ids],
+            ignore_conflicts=True,
+        )
+        if new_ids:
+            self.changed(user)
+        return self.results(names, ids, lambda catalog_id: EXISTS if catalog_id in existing else ADDED)
+
+    def remove(self, user, names):
+        ids = self.resolve(names)
+        existing = self.linked(user, ids.values())
+        if existing:
+            # Nothing cascades from link rows, so this is a single DELETE, preceded by a SELECT
+            # of the rows when the link model has delete signals (which then fire per row).
+            self.link_model.objects.filter(user=user, **{f'{self.field}_id__in': existing}).delete()
+        return self.results(names, ids, lambda catalog_id: REMOVED if catalog_id in existing else NOT_PRESENT)
+
+    @staticmethod
+    def results(names, ids, status_of):
+        return [
+            {'name': name, 'status': status_of(ids[name]) if name in ids else NOT_FOUND}
+            for name in names
+        ]
+
+
+class BulkUserSkills(BulkLinks):
+    def __init__(self):
+        super().__init__(UserSkill, Skill, 'skill')
+
+    def changed(self, user):
+        user_search_data_changed(user.id)
+
+
+bulk_user_skills = BulkUserSkills()
+bulk_user_interests = BulkLinks(UserInterest, Interest, 'interest')
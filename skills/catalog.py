@@ -0,0 +1,124 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+from common.cache import aget_cache_version, get_cache_version, make_cache_key
+
+SKILL_CATALOG = 'catalog:skills'
+INTEREST_CATALOG = 'catalog:interests'
+
+# Rendered pages kept in this process, so a hit costs no shared cache round trip either.
+# Entries expire after ``CATALOG_LOCAL_CACHE_TIMEOUT`` seconds as a backstop to the version in their key.
+LOCAL_CACHE_SIZE = 256
+_local_pages = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _get_local(key):
+    with _local_lock:
+        entry = _local_pages.get(key)
+        if entry is None:
+            return None
+        expires, body = entry
+        if expires <= time.monotonic():
+            del _local_pages[key]
+            return None
+        _local_pages.move_to_end(key)
+        return body
+
+
+def _set_local(key, body):
+    with _local_lock:
+        _local_pages[key] = (time.monotonic() + settings.CATALOG_LOCAL_CACHE_TIMEOUT, body)
+        _local_pages.move_to_end(key)
+        while len(_local_pages) > LOCAL_CACHE_SIZE:
+            _local_pages.popitem(last=False)
+
+
+def _page_key(request, view, namespace, version):
+    paginator = view.pagination_class
+    payload = {
+        'url': request.build_absolute_uri(request.path),
+        'cursor': request.query_params.get(paginator.cursor_query_param),
+        'page_size': request.query_params.get(paginator.page_size_query_param),
+    }
+    return make_cache_key(namespace, version, payload)
+
+
+def _page_etag(key):
+    return f'"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def _etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return etags == ['*'] or etag in etags
+
+
+def _render_page(request, view, queryset):
+    paginator = view.pagination_class()
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    serializer = view.serializer_class(page, many=True)
+    return JSONRenderer().render(paginator.get_paginated_response(serializer.data).data)
+
+
+async def _arender_page(request, view, queryset):
+    paginator = view.pagination_class()
+    page = await paginator.apaginate_queryset(queryset, request, view=view)
+    serializer = view.serializer_class(page, many=True)
+    return JSONRenderer().render(paginator.get_paginated_response(serializer.data).data)
+
+
+def _page_response(etag, body):
+    response = HttpResponseNotModified() if body is None else HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def catalog_response(request, view, queryset, namespace):
+    """
+    Serve a page of a catalog (skills or interests) from its pre-rendered JSON.
+
+    Pages are cached in-process (briefly) and in the shared cache under the catalog's
+    version, which lives in the shared cache and is bumped whenever a catalog row is saved
+    or deleted, so every worker switches to the new version together. The version also makes
+    the strong ETag, so ``If-None-Match`` revalidations are answered with a 304 without
+    rendering anything or touching the database.
+    """
+    key = _page_key(request, view, namespace, get_cache_version(namespace))
+    etag = _page_etag(key)
+    if _etag_matches(request, etag):
+        return _page_response(etag, None)
+    body = _get_local(key)
+    if body is None:
+        body = cache.get(key)
+        if body is None:
+            body = _render_page(request, view, queryset)
+            cache.set(key, body, settings.CATALOG_CACHE_TIMEOUT)
+        _set_local(key, body)
+    return _page_response(etag, body)
+
+
+async def acatalog_response(request, view, queryset, namespace):
+    """``catalog_response`` with the async cache and ORM, for ``AsyncAPIView`` views."""
+    key = _page_key(request, view, namespace, await aget_cache_version(namespace))
+    etag = _page_etag(key)
+    if _etag_matches(request, etag):
+        return _page_response(etag, None)
+    body = _get_local(key)
+    if body is None:
+        body = await cache.aget(key)
+        if body is None:
+            body = await _arender_page(request, view, queryset)
+            await cache.aset(key, body, settings.CATALOG_CACHE_TIMEOUT)
+        _set_local(key, body)
+    return _page_response(etag, body)
@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, F, OuterRef, Q, Value
+from common.cache import get_cache_version, make_cache_key
+from core.models import User
+from work.models import WorkExperience
+from .bitmap_index import get_bitmap_index
+from .models import Skill, UserSkill
+from .search import boolean_query_filter, parse_boolean_query, parse_skill_terms, resolve_skill_names
+
+SEARCH_CACHE_NAMESPACE = 'user-search'
+SKILL_PREFIX = 'skill:'
+JOB_TYPE_PREFIX = 'job_type:'
+
+
+def normalize_node(node):
+    """Case-fold the skill names of a parsed boolean query so equivalent queries share a key."""
+    if node[0] == 'skill':
+        return ['skill', node[1].lower()]
+    return [node[0], *(normalize_node(child) for child in node[1:])]
+
+
+def normalize_filter(skills_query=None, boolean_query=None, job_type=None):
+    if boolean_query:
+        return {'q': normalize_node(parse_boolean_query(boolean_query)), 'job_type': job_type or None}
+    return {
+        'skills': sorted({term.lower() for term in parse_skill_terms(skills_query)}),
+        'job_type': job_type or None,
+    }
+
+
+def matching_users(skills_query=None, boolean_query=None, job_type=None):
+    """Return the users matching the search filter, unranked and without joins, for use as a subquery."""
+    if boolean_query:
+        users = User.objects.filter(boolean_query_filter(parse_boolean_query(boolean_query)))
+    else:
+        users = User.objects.all()
+        terms = parse_skill_terms(skills_query)
+        if terms:
+            query = Q()
+            for term in terms:
+                query |= Q(name__icontains=term)
+            users = users.filter(
+                Exists(UserSkill.objects.filter(user=OuterRef('pk'), skill__in=Skill.objects.filter(query)))
+            )
+    if job_type:
+        users = users.filter(Exists(WorkExperience.objects.filter(user=OuterRef('pk'), job_type=job_type)))
+    return users
+
+
+def facet_rows(users):
+    """
+    Count the matching users per skill and per job type.
+
+    Both grouped aggregates are sent as one ``UNION ALL`` statement, so the whole facet
+    set costs a single round trip.
+    """
+    user_ids = users.values('id')
+    skill_counts = (
+        UserSkill.objects.filter(user_id__in=user_ids)
+        .annotate(facet=Value('skills'), name=F('skill__name'))
+        .values('facet', 'name')
+        .annotate(count=Count('user_id', distinct=True))
+    )
+    job_type_counts = (
+        WorkExperience.objects.filter(user_id__in=user_ids)
+        .annotate(facet=Value('job_types'), name=F('job_type'))
+        .values('facet', 'name')
+        .annotate(count=Count('user_id', distinct=True))
+    )
+    return skill_counts.union(job_type_counts, all=True)
+
+
+def index_facet_rows(index, boolean_query, job_type):
+    """Facet counts straight from the bitmap index: one popcount per skill and job type."""
+    counts = index.facet_counts(resolve_skill_names(parse_boolean_query(boolean_query)), job_type)
+    names = {str(skill_id): name for skill_id, name in Skill.objects.values_list('id', 'name')}
+    rows = []
+    for key, count in counts.items():
+        if key.startswith(SKILL_PREFIX):
+            # Skills deleted since the build have no name and are left out.
+            if key[len(SKILL_PREFIX):] in names:
+                rows.append({'facet': 'skills', 'name': names[key[len(SKILL_PREFIX):]], 'count': count})
+        elif key.startswith(JOB_TYPE_PREFIX):
+            rows.append({'facet': 'job_types', 'name': key[len(JOB_TYPE_PREFIX):], 'count': count})
+    return rows
+
+
+def compute_facets(skills_query=None, boolean_query=None, job_type=None):
+    index = get_bitmap_index() if boolean_query else None
+    if index is not None:
+        rows = index_facet_rows(index, boolean_query, job_type)
+    else:
+        rows = facet_rows(matching_users(skills_query, boolean_query, job_type))
+
+    facets = {'skills': [], 'job_types': []}
+    for row in rows:
+        facets[row['facet']].append({'name': row['name'], 'count': row['count']})
+    for values in facets.values():
+        values.sort(key=lambda value: (-value['count'], value['name']))
+    return facets
+
+
+def get_facets(skills_query=None, boolean_query=None, job_type=None):
+    """
+    Return the facet counts for a search filter, cached under the normalized filter.
+
+    The cache key embeds the search namespace version, which is bumped whenever a
+    ``UserSkill`` or ``WorkExperience`` row changes.
+    """
+    filters = normalize_filter(skills_query, boolean_query, job_type)
+    key = make_cache_key('facets', get_cache_version(SEARCH_CACHE_NAMESPACE), filters)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(skills_query, boolean_query, job_type)
+        cache.set(key, facets, settings.FACETS_CACHE_TIMEOUT)
+    return facets
@@ -0,0 +1,47 @@
+import json
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+from common.benchmark import measure
+from core.models import User
+from skills.bulk import bulk_user_skills
+from skills.models import Skill, UserSkill
+from skills.serializers import AddUserSkillSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare adding and removing a batch of user skills one at a time against the bulk endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skills', type=int, default=15, help='Number of skills added per onboarding')
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            names = [f'Bench Skill {i} {uuid.uuid4().hex[:8]}' for i in range(options['skills'])]
+            Skill.objects.bulk_create([Skill(name=name) for name in names])
+            user = User.objects.create_user(email=f'bench-{uuid.uuid4().hex}@example.com', name='Bench User')
+            request = APIRequestFactory().post('/')
+            request.user = user
+
+            def one_at_a_time():
+                # What ``AddUserSkillView`` does once per name, followed by per-row deletes.
+                for name in names:
+                    serializer = AddUserSkillSerializer(data={'skill': name}, context={'request': request})
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save(user=user)
+                for user_skill in UserSkill.objects.filter(user=user):
+                    user_skill.delete()
+
+            def bulk():
+                bulk_user_skills.add(user, names)
+                bulk_user_skills.remove(user, names)
+
+            results = {
+                'one_at_a_time': measure(one_at_a_time, options['iterations']),
+                'bulk': measure(bulk, options['iterations']),
+            }
+            self.stdout.write(json.dumps(results, indent=2))
+            transaction.set_rollback(True)
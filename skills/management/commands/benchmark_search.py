@@ -0,0 +1,87 @@
+import json
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from common.benchmark import measure
+from core.models import User
+from skills.models import Skill, UserSkill
+from skills.search import search_users
+from work.models import WorkExperience
+
+
+class Command(BaseCommand):
+    help = 'Seed a large dataset and compare user search latency against the legacy icontains query'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000, help='Number of users to seed')
+        parser.add_argument('--catalog', type=int, default=500, help='Number of skills in the catalog')
+        parser.add_argument('--skills-per-user', type=int, default=4)
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--query', default='py', help='Value of the skills query parameter')
+        parser.add_argument('--job-type', default=None)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            query, job_type = options['query'], options['job_type']
+            results = {
+                'legacy': measure(lambda: list(self.legacy_search(query, job_type)), options['iterations']),
+                'indexed': measure(lambda: list(search_users(query, job_type)), options['iterations']),
+            }
+            self.stdout.write(json.dumps(results, indent=2))
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    @staticmethod
+    def legacy_search(skills_query, job_type_query):
+        """The query ``UserSearchView`` ran before the indexed search backend."""
+        users = User.objects.all()
+        if skills_query:
+            users = users.filter(skills__skill__name__icontains=skills_query)
+        if job_type_query:
+            users = users.filter(work_experiences__job_type=job_type_query)
+        return users.distinct()
+
+    def seed(self, options):
+        rng = random.Random(42)
+        batch_size = options['batch_size']
+
+        skills = [Skill(name=f'Skill {i:05d} {uuid.uuid4().hex[:8]}') for i in range(options['catalog'])]
+        skills += [Skill(name=f'Python {i}') for i in range(5)]
+        Skill.objects.bulk_create(skills, batch_size=batch_size)
+
+        password = make_password(None)
+        job_types = [choice for choice, _ in WorkExperience.JOB_TYPES]
+        for start in range(0, options['users'], batch_size):
+            size = min(batch_size, options['users'] - start)
+            users = [
+                User(email=f'bench-{uuid.uuid4().hex}@example.com', name=f'Bench User {start + i}', password=password)
+                for i in range(size)
+            ]
+            User.objects.bulk_create(users, batch_size=batch_size)
+            UserSkill.objects.bulk_create(
+                [
+                    UserSkill(user=user, skill=skill)
+                    for user in users
+                    for skill in rng.sample(skills, options['skills_per_user'])
+                ],
+                batch_size=batch_size,
+            )
+            WorkExperience.objects.bulk_create(
+                [
+                    WorkExperience(user=user, job_title='Engineer', company_name='Bench Corp', location='Remote',
+                                   job_type=rng.choice(job_types), start_date='2020-01-01')
+                    for user in users
+                ],
+                batch_size=batch_size,
+            )
+            self.stdout.write(f'Seeded {start + size} users')
@@ -0,0 +1,48 @@
+import itertools
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.models import User
+from skills.bitmap_index import delta_log_size, job_type_key, skill_key, write_index
+from skills.models import UserSkill
+from work.models import WorkExperience
+
+
+class Command(BaseCommand):
+    help = 'Build the memory-mapped bitmap index used for boolean user search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=None, help='Output file (defaults to SEARCH_INDEX_PATH)')
+        parser.add_argument('--chunk-size', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.SEARCH_INDEX_PATH
+        chunk_size = options['chunk_size']
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # Changes committed from here on are replayed from the delta log by the workers,
+        # so rows that are written while the build is running are never lost.
+        delta_offset = delta_log_size(path)
+
+        def memberships():
+            user_skills = (
+                UserSkill.objects.order_by('skill_id')
+                .values_list('skill_id', 'user_id')
+                .iterator(chunk_size=chunk_size)
+            )
+            for skill_id, rows in itertools.groupby(user_skills, key=lambda row: row[0]):
+                yield skill_key(skill_id), (user_id for _, user_id in rows)
+
+            job_types = (
+                WorkExperience.objects.order_by('job_type', 'user_id')
+                .values_list('job_type', 'user_id')
+                .distinct()
+                .iterator(chunk_size=chunk_size)
+            )
+            for job_type, rows in itertools.groupby(job_types, key=lambda row: row[0]):
+                yield job_type_key(job_type), (user_id for _, user_id in rows)
+
+        user_ids = User.objects.values_list('id', flat=True).iterator(chunk_size=chunk_size)
+        write_index(path, user_ids, memberships(), delta_offset=delta_offset)
+        self.stdout.write(self.style.SUCCESS(f'Search index written to {path}'))
@@ -0,0 +1,66 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from common.cache import bump_cache_version
+from core.models import User
+from skills.facets import SEARCH_CACHE_NAMESPACE
+from skills.models import Interest, Skill, UserInterest, UserSkill
+from skills.seeding import SyntheticUsers, hash_passwords, load_synthetic_users, sync_predefined_catalogs
+from work.models import WorkExperience
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate synthetic users with skills, interests and work experiences, written with COPY '
+        'in batches. User number i gets the password "<password>-<i % passwords>"'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=10000, help='Users per transaction')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for reproducible attribute values')
+        parser.add_argument('--password', default='password')
+        parser.add_argument('--passwords', type=int, default=8, help='Distinct passwords (each is hashed once)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes hashing the passwords')
+        parser.add_argument('--email-domain', default='example.com')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('generate_users writes with COPY and needs PostgreSQL.')
+        if options['users'] < 1 or options['batch_size'] < 1 or options['passwords'] < 1:
+            raise CommandError('--users, --batch-size and --passwords must be positive.')
+        started = time.perf_counter()
+
+        sync_predefined_catalogs()
+        password_hashes = hash_passwords(
+            [f'{options["password"]}-{i}' for i in range(options['passwords'])], options['workers'])
+        generator = SyntheticUsers(
+            Skill.objects.values_list('id', flat=True), Interest.objects.values_list('id', flat=True),
+            password_hashes, seed=options['seed'], email_domain=options['email_domain'],
+        )
+
+        def progress(done, totals):
+            rate = done / (time.perf_counter() - started)
+            self.stdout.write(f'{done}/{options["users"]} users ({rate:.0f} users/s)')
+
+        totals = load_synthetic_users(generator, options['users'], options['batch_size'], progress=progress)
+
+        # Fresh statistics, so the planner does not keep planning for the small tables.
+        with connection.cursor() as cursor:
+            for model in (User, UserSkill, UserInterest, WorkExperience):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        bump_cache_version(SEARCH_CACHE_NAMESPACE)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {totals["users"]} users, {totals["user_skills"]} user skills, '
+            f'{totals["user_interests"]} user interests and {totals["work_experiences"]} work experiences '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
+        if os.path.exists(settings.SEARCH_INDEX_PATH):
+            self.stdout.write(self.style.WARNING(
+                'The search index does not include the new users; run build_search_index to rebuild it.'
+            ))
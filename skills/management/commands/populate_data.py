@@ -1,32 +1,22 @@
 from django.core.management.base import BaseCommand
-from skills.models import Skill, Interest
+from skills.seeding import PREDEFINED_INTERESTS, PREDEFINED_SKILLS, sync_predefined_catalogs
 
 
 class Command(BaseCommand):
     help = 'Populate database with predefined skills and interests'
 
     def handle(self, *args, **options):
-        predefined_skills = [
-            'Python', 'JavaScript', 'Django', 'React', 'Data Science',
-            'Java', 'C++', 'Ruby', 'PHP', 'Swift', 'Kotlin', 'Golang', 'Rust'
-        ]
-        predefined_interests = [
-            'Music', 'Art', 'Technology', 'Sports', 'Travel',
-            'Cooking', 'Reading', 'Photography', 'Fitness', 'Gaming', 'Writing', 'DIY'
-        ]
+        # One upsert per catalog instead of a get_or_create per row.
+        created_skills, created_interests = sync_predefined_catalogs()
 
-        # Populate Skills
-        for skill_name in predefined_skills:
-            skill, created = Skill.objects.get_or_create(name=skill_name)
-            if created:
+        for skill_name in PREDEFINED_SKILLS:
+            if skill_name in created_skills:
                 self.stdout.write(self.style.SUCCESS(f'Successfully created skill: {skill_name}'))
             else:
                 self.stdout.write(self.style.WARNING(f'Skill already exists: {skill_name}'))
 
-        # Populate Interests
-        for interest_name in predefined_interests:
-            interest, created = Interest.objects.get_or_create(name=interest_name)
-            if created:
+        for interest_name in PREDEFINED_INTERESTS:
+            if interest_name in created_interests:
                 self.stdout.write(self.style.SUCCESS(f'Successfully created interest: {interest_name}'))
             else:
                 self.stdout.write(self.style.WARNING(f'Interest already exists: {interest_name}'))
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Keep the oldest row of each duplicate pair; duplicates were possible before the constraints existed.
+DEDUPE_SQL = """
+DELETE FROM {table} AS duplicate USING {table} AS original
+WHERE duplicate.user_id = original.user_id
+  AND duplicate.{column} = original.{column}
+  AND (duplicate.created_at, duplicate.id) > (original.created_at, original.id)
+"""
+
+
+def add_unique_constraint(model_name, table, column, name):
+    """
+    Add a ``(user, column)`` unique constraint without blocking writes while it is built: the
+    unique index is created concurrently, then attached as the constraint (a brief lock only).
+    """
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[
+            migrations.RunSQL(
+                [
+                    # Left behind as INVALID if an earlier attempt failed, e.g. on a duplicate written meanwhile.
+                    f'DROP INDEX CONCURRENTLY IF EXISTS {name}',
+                    f'CREATE UNIQUE INDEX CONCURRENTLY {name} ON {table} (user_id, {column})',
+                ],
+                f'DROP INDEX CONCURRENTLY IF EXISTS {name}',
+            ),
+            migrations.RunSQL(
+                f'ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}',
+                f'ALTER TABLE {table} DROP CONSTRAINT {name}',
+            ),
+        ],
+        state_operations=[
+            migrations.AddConstraint(
+                model_name=model_name,
+                constraint=models.UniqueConstraint(fields=('user', column.removesuffix('_id')), name=name),
+            ),
+        ],
+    )
+
+
+class Migration(migrations.Migration):
+    # ``CREATE INDEX CONCURRENTLY`` does not block writes but cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('skills', '0004_change_tracking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            DEDUPE_SQL.format(table='skills_userinterest', column='interest_id'), migrations.RunSQL.noop
+        ),
+        migrations.RunSQL(DEDUPE_SQL.format(table='skills_userskill', column='skill_id'), migrations.RunSQL.noop),
+        add_unique_constraint('userinterest', 'skills_userinterest', 'interest_id', 'userinterest_user_interest_uniq'),
+        add_unique_constraint('userskill', 'skills_userskill', 'skill_id', 'userskill_user_skill_uniq'),
+    ]
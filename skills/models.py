@@ -1,12 +1,20 @@
 # Models
 from common.models import BaseModel
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from core.models import User
 
 
 class Skill(BaseModel):
     name = models.CharField(max_length=50, unique=True)
 
+    class Meta:
+        indexes = [
+            # Serves the case-insensitive ``name__icontains`` lookups used by user search.
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='skill_name_trgm_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -22,6 +30,14 @@ class UserSkill(BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='skills')
     skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['skill', 'user'], name='userskill_skill_user_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'skill'], name='userskill_user_skill_uniq'),
+        ]
+
     def __str__(self):
         return f'{self.user.name} - {self.skill.name}'
 
@@ -30,5 +46,10 @@ class UserInterest(BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interests')
     interest = models.ForeignKey(Interest, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'interest'], name='userinterest_user_interest_uniq'),
+        ]
+
     def __str__(self):
         return f'{self.user.name} - {self.interest.name}'
@@ -0,0 +1,204 @@
+import re
+
+from django.db.models import Count, Exists, OuterRef, Q
+from core.models import User
+from work.models import WorkExperience
+from .bitmap_index import get_bitmap_index
+from .models import Skill, UserSkill
+
+QUERY_TOKEN_RE = re.compile(r'\(|\)|[^\s()]+')
+QUERY_KEYWORDS = {'AND', 'OR', 'NOT'}
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def parse_skill_terms(skills_query):
+    """Split a comma separated ``skills`` query into distinct, non-empty terms."""
+    terms = []
+    seen = set()
+    for term in (skills_query or '').split(','):
+        term = term.strip()
+        if term and term.lower() not in seen:
+            seen.add(term.lower())
+            terms.append(term)
+    return terms
+
+
+def resolve_skill_ids(terms):
+    """
+    Resolve search terms to the ids of every skill whose name contains one of them.
+
+    ``Skill.name`` carries a trigram GIN index on ``UPPER(name)``, so the ``icontains``
+    lookups are answered from the index instead of scanning the catalog.
+    """
+    return list(_skill_ids(terms))
+
+
+async def aresolve_skill_ids(terms):
+    return [skill_id async for skill_id in _skill_ids(terms)]
+
+
+def _skill_ids(terms):
+    query = Q()
+    for term in terms:
+        query |= Q(name__icontains=term)
+    return Skill.objects.filter(query).values_list('id', flat=True)
+
+
+def search_users(skills_query=None, job_type=None):
+    """
+    Return the users matching the search filters.
+
+    When skills are requested the users are found through the ``UserSkill(skill, user)``
+    index and ranked by how many of the matching skills they have (``matched``), so no
+    ``DISTINCT`` over the whole join is needed.
+    """
+    terms = parse_skill_terms(skills_query)
+    return _filter_users(resolve_skill_ids(terms) if terms else None, job_type)
+
+
+async def asearch_users(skills_query=None, job_type=None):
+    terms = parse_skill_terms(skills_query)
+    return _filter_users(await aresolve_skill_ids(terms) if terms else None, job_type)
+
+
+def _filter_users(skill_ids, job_type):
+    users = User.objects.order_by('id')
+
+    if skill_ids is not None:
+        if not skill_ids:
+            return users.none()
+        users = (
+            users.filter(skills__skill_id__in=skill_ids)
+            .annotate(matched=Count('skills__skill_id', distinct=True))
+            .order_by('-matched', 'id')
+        )
+
+    if job_type:
+        users = users.filter(
+            Exists(WorkExperience.objects.filter(user=OuterRef('pk'), job_type=job_type))
+        )
+
+    return users
+
+
+def parse_boolean_query(query):
+    """
+    Parse a boolean skill expression such as ``Python AND Django AND NOT PHP``.
+
+    ``AND``, ``OR`` and ``NOT`` are upper case keywords, parentheses group terms and
+    every other run of words is a skill name (e.g. ``Data Science``). The result is a
+    tree of tuples: ``('skill', name)``, ``('not', node)``, ``('and', left, right)``
+    and ``('or', left, right)``.
+    """
+    tokens = QUERY_TOKEN_RE.findall(query or '')
+    if not tokens:
+        raise QuerySyntaxError('The query is empty.')
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def advance():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == 'OR':
+            advance()
+            node = ('or', node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() == 'AND':
+            advance()
+            node = ('and', node, parse_not())
+        return node
+
+    def parse_not():
+        if peek() == 'NOT':
+            advance()
+            return ('not', parse_not())
+        if peek() == '(':
+            advance()
+            node = parse_or()
+            if peek() != ')':
+                raise QuerySyntaxError('Missing closing parenthesis.')
+            advance()
+            return node
+        words = []
+        while peek() is not None and peek() not in QUERY_KEYWORDS and peek() not in '()':
+            words.append(advance())
+        if not words:
+            raise QuerySyntaxError(f'Expected a skill name at position {position + 1}.')
+        return ('skill', ' '.join(words))
+
+    node = parse_or()
+    if peek() is not None:
+        raise QuerySyntaxError(f'Unexpected token "{peek()}".')
+    return node
+
+
+def boolean_query_filter(node):
+    """Translate a parsed boolean query into a ``Q`` over ``User`` using ``EXISTS`` subqueries."""
+    kind = node[0]
+    if kind == 'skill':
+        return Q(Exists(UserSkill.objects.filter(user=OuterRef('pk'), skill__name__iexact=node[1])))
+    if kind == 'not':
+        return ~boolean_query_filter(node[1])
+    if kind == 'and':
+        return boolean_query_filter(node[1]) & boolean_query_filter(node[2])
+    return boolean_query_filter(node[1]) | boolean_query_filter(node[2])
+
+
+def skill_names(node):
+    if node[0] == 'skill':
+        return {node[1].lower()}
+    return set().union(*(skill_names(child) for child in node[1:]))
+
+
+def resolve_skill_names(node):
+    """
+    Replace the skill names of a parsed boolean query by the ids of the skills with that
+    name (case-insensitive), as the bitmap index is keyed by skill id.
+    """
+    names = skill_names(node)
+    query = Q()
+    for name in names:
+        query |= Q(name__iexact=name)
+    ids = {name: [] for name in names}
+    for skill_id, name in Skill.objects.filter(query).values_list('id', 'name'):
+        ids[name.lower()].append(skill_id)
+
+    def resolve(node):
+        if node[0] == 'skill':
+            return ('skill', ids[node[1].lower()])
+        return (node[0], *(resolve(child) for child in node[1:]))
+    return resolve(node)
+
+
+def boolean_search_users(query, job_type=None, after=None, limit=None):
+    """
+    Return the users matching a boolean skill expression, ordered by id.
+
+    The shared bitmap index answers the query when it has been built; otherwise the
+    expression is evaluated by the database. ``after`` and ``limit`` restrict the
+    result to one keyset page so the index only resolves the ids that are returned.
+    """
+    node = parse_boolean_query(query)
+    index = get_bitmap_index()
+    if index is not None:
+        ids = index.search(resolve_skill_names(node), job_type=job_type, after=after, limit=limit)
+        return User.objects.filter(id__in=ids).order_by('id')
+
+    users = User.objects.filter(boolean_query_filter(node)).order_by('id')
+    if job_type:
+        users = users.filter(
+            Exists(WorkExperience.objects.filter(user=OuterRef('pk'), job_type=job_type))
+        )
+    return users
@@ -0,0 +1,214 @@
+"""
+Seeding of the skill and interest catalogs and of large numbers of synthetic users.
+
+Synthetic users are written with PostgreSQL ``COPY``, one transaction per batch, which is
+what makes loading a million users (and their skills, interests and work experiences) a
+matter of minutes. Rows written this way send no model signals: the search facets cache is
+invalidated by the caller and the bitmap search index has to be rebuilt.
+"""
+import bisect
+import itertools
+import multiprocessing
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from functools import partial
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from common.cache import bump_cache_version
+from core.models import User
+from work.models import WorkExperience
+from .catalog import INTEREST_CATALOG, SKILL_CATALOG
+from .models import Interest, Skill, UserInterest, UserSkill
+
+PREDEFINED_SKILLS = [
+    'Python', 'JavaScript', 'Django', 'React', 'Data Science',
+    'Java', 'C++', 'Ruby', 'PHP', 'Swift', 'Kotlin', 'Golang', 'Rust'
+]
+PREDEFINED_INTERESTS = [
+    'Music', 'Art', 'Technology', 'Sports', 'Travel',
+    'Cooking', 'Reading', 'Photography', 'Fitness', 'Gaming', 'Writing', 'DIY'
+]
+
+FIRST_NAMES = [
+    'Ada', 'Alan', 'Amina', 'Ana', 'Chen', 'David', 'Elena', 'Fatima', 'Grace', 'Hiro', 'Ines', 'James',
+    'Kofi', 'Lena', 'Luis', 'Maria', 'Mohamed', 'Nadia', 'Olga', 'Omar', 'Priya', 'Ravi', 'Sara', 'Tom',
+]
+LAST_NAMES = [
+    'Ahmed', 'Brown', 'Costa', 'Dubois', 'Garcia', 'Hassan', 'Ivanova', 'Kim', 'Kowalski', 'Lee', 'Mensah',
+    'Moreau', 'Nakamura', 'Nguyen', 'Okafor', 'Patel', 'Rossi', 'Schmidt', 'Silva', 'Smith', 'Wang', 'Yilmaz',
+]
+JOB_TITLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Data Scientist', 'Data Engineer',
+    'Mobile Developer', 'DevOps Engineer', 'QA Engineer', 'Product Manager', 'UX Designer', 'Intern',
+]
+COMPANIES = [
+    'Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises', 'Soylent',
+    'Cyberdyne', 'Tyrell', 'Wonka', 'Vandelay Industries',
+]
+LOCATIONS = ['Cairo', 'Lagos', 'Nairobi', 'Berlin', 'London', 'Remote', 'New York', 'Bangalore', 'Tokyo', 'Sao Paulo']
+
+# Probability of each number of skills, interests and work experiences per user (the index is the number).
+SKILL_COUNTS = [0.10, 0.15, 0.20, 0.20, 0.15, 0.10, 0.05, 0.03, 0.02]
+INTEREST_COUNTS = [0.15, 0.25, 0.25, 0.20, 0.10, 0.05]
+WORK_EXPERIENCE_COUNTS = [0.10, 0.25, 0.30, 0.20, 0.10, 0.05]
+JOB_TYPE_WEIGHTS = {WorkExperience.FULL_TIME: 0.75, WorkExperience.PART_TIME: 0.15, WorkExperience.CONTRACT: 0.10}
+# Share of users whose latest job has no end date.
+CURRENT_JOB_SHARE = 0.7
+# Users sign up evenly over this many days before now.
+SIGNUP_DAYS = 3 * 365
+
+USER_COLUMNS = ['id', 'created_at', 'updated_at', 'email', 'name', 'phone', 'password', 'is_active', 'is_staff',
+                'profile_picture', 'profile_picture_variants']
+LINK_COLUMNS = ['id', 'created_at', 'updated_at', 'user_id']
+WORK_EXPERIENCE_COLUMNS = ['id', 'created_at', 'updated_at', 'user_id', 'job_title', 'company_name', 'location',
+                           'job_type', 'start_date', 'end_date', 'description']
+
+
+def sync_catalog(model, names, namespace):
+    """
+    Insert the ``names`` missing from the catalog ``model`` in one ``INSERT ... ON CONFLICT DO
+    NOTHING`` and invalidate its cached pages on commit. Returns the names that were added.
+    """
+    existing = set(model.objects.filter(name__in=names).values_list('name', flat=True))
+    created = [name for name in dict.fromkeys(names) if name not in existing]
+    model.objects.bulk_create([model(name=name) for name in names], ignore_conflicts=True)
+    if created:
+        # ``bulk_create`` sends no ``post_save``, see ``skills.signals``.
+        transaction.on_commit(partial(bump_cache_version, namespace))
+    return created
+
+
+def sync_predefined_catalogs():
+    """Add the predefined skills and interests; returns the added skill and interest names."""
+    return (sync_catalog(Skill, PREDEFINED_SKILLS, SKILL_CATALOG),
+            sync_catalog(Interest, PREDEFINED_INTERESTS, INTEREST_CATALOG))
+
+
+def hash_passwords(passwords, workers):
+    """Hash ``passwords`` in ``workers`` processes; PBKDF2 is CPU bound and one hash takes a large fraction of a second."""
+    if workers <= 1 or len(passwords) <= 1:
+        return [make_password(password) for password in passwords]
+    # Spawned, not forked, like the image processing pool: the parent holds a database connection.
+    with ProcessPoolExecutor(max_workers=min(workers, len(passwords)),
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(make_password, passwords))
+
+
+def _cumulative(weights):
+    return list(itertools.accumulate(weights))
+
+
+def _zipf_weights(count, exponent=1.1):
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+class SyntheticUsers:
+    """
+    Generates the rows of synthetic users with realistic distributions: a few skills per user
+    drawn from a Zipf-like popularity (a handful of skills are very common, most are rare),
+    a few interests, and a chronological career of up to five jobs ending today.
+
+    Attribute values are reproducible for a given ``seed``; ids and the ``tag`` in the emails
+    are not, so generating twice never collides.
+    """
+
+    def __init__(self, skill_ids, interest_ids, password_hashes, seed=None, email_domain='example.com'):
+        self.rng = random.Random(seed)
+        self.skill_ids = list(skill_ids)
+        self.rng.shuffle(self.skill_ids)
+        self.interest_ids = list(interest_ids)
+        self.rng.shuffle(self.interest_ids)
+        self.skill_weights = _cumulative(_zipf_weights(len(self.skill_ids)))
+        self.interest_weights = _cumulative(_zipf_weights(len(self.interest_ids), exponent=0.5))
+        self.skill_counts = _cumulative(SKILL_COUNTS)
+        self.interest_counts = _cumulative(INTEREST_COUNTS)
+        self.work_experience_counts = _cumulative(WORK_EXPERIENCE_COUNTS)
+        self.job_types = list(JOB_TYPE_WEIGHTS)
+        self.job_type_weights = _cumulative(JOB_TYPE_WEIGHTS.values())
+        self.password_hashes = password_hashes
+        self.tag = uuid.uuid4().hex[:8]
+        self.email_domain = email_domain
+        self.now = timezone.now()
+        self.today = self.now.date()
+
+    def _count(self, cumulative):
+        return bisect.bisect(cumulative, self.rng.random() * cumulative[-1])
+
+    def _pick(self, ids, cumulative, count):
+        if not ids or not count:
+            return []
+        return list(dict.fromkeys(self.rng.choices(ids, cum_weights=cumulative, k=count)))
+
+    def batch(self, start, size):
+        """The user, user skill, user interest and work experience rows of users ``start`` to ``start + size``."""
+        users, user_skills, user_interests, work_experiences = [], [], [], []
+        rng = self.rng
+        for number in range(start, start + size):
+            user_id = uuid.uuid4()
+            created_at = self.now - timedelta(seconds=rng.randrange(SIGNUP_DAYS * 86400))
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            users.append((
+                user_id, created_at, created_at,
+                f'{first_name.lower()}.{last_name.lower()}.{self.tag}.{number}@{self.email_domain}',
+                f'{first_name} {last_name}', '', self.password_hashes[number % len(self.password_hashes)],
+                True, False, '', '{}',
+            ))
+            for skill_id in self._pick(self.skill_ids, self.skill_weights, self._count(self.skill_counts)):
+                user_skills.append((uuid.uuid4(), created_at, created_at, user_id, skill_id))
+            for interest_id in self._pick(self.interest_ids, self.interest_weights,
+                                          self._count(self.interest_counts)):
+                user_interests.append((uuid.uuid4(), created_at, created_at, user_id, interest_id))
+            work_experiences.extend(self._career(user_id, created_at))
+        return users, user_skills, user_interests, work_experiences
+
+    def _career(self, user_id, created_at):
+        rng = self.rng
+        rows = []
+        end = None if rng.random() < CURRENT_JOB_SHARE else self.today - timedelta(days=rng.randrange(30, 365))
+        for _ in range(self._count(self.work_experience_counts)):
+            start = (end or self.today) - timedelta(days=rng.randrange(90, 5 * 365))
+            if start < date(1980, 1, 1):
+                break
+            job_type = self.job_types[bisect.bisect(self.job_type_weights, rng.random() * self.job_type_weights[-1])]
+            rows.append((
+                uuid.uuid4(), created_at, created_at, user_id, rng.choice(JOB_TITLES), rng.choice(COMPANIES),
+                rng.choice(LOCATIONS), job_type, start, end, '',
+            ))
+            # The previous job ended up to half a year before this one started.
+            end = start - timedelta(days=rng.randrange(0, 180))
+        return rows
+
+
+def copy_rows(cursor, model, columns, rows):
+    """Write ``rows`` (tuples in the order of ``columns``) to the table of ``model`` with ``COPY``."""
+    quote = connection.ops.quote_name
+    statement = f'COPY {quote(model._meta.db_table)} ({", ".join(map(quote, columns))}) FROM STDIN'
+    with cursor.copy(statement) as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def load_synthetic_users(generator, users, batch_size, progress=None):
+    """
+    Write ``users`` users of ``generator``, one transaction and one ``COPY`` per table and
+    batch. Returns the number of rows written per table.
+    """
+    totals = {'users': 0, 'user_skills': 0, 'user_interests': 0, 'work_experiences': 0}
+    for start in range(0, users, batch_size):
+        batch = generator.batch(start, min(batch_size, users - start))
+        with transaction.atomic(), connection.cursor() as cursor:
+            for (name, model, columns), rows in zip([
+                ('users', User, USER_COLUMNS),
+                ('user_skills', UserSkill, [*LINK_COLUMNS, 'skill_id']),
+                ('user_interests', UserInterest, [*LINK_COLUMNS, 'interest_id']),
+                ('work_experiences', WorkExperience, WORK_EXPERIENCE_COLUMNS),
+            ], batch):
+                copy_rows(cursor, model, columns, rows)
+                totals[name] += len(rows)
+        if progress is not None:
+            progress(start + len(batch[0]), totals)
+    return totals
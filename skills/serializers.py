@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Skill, UserSkill, Interest, UserInterest
 from core.models import User
@@ -17,6 +19,11 @@ class UserSkillSerializer(serializers.ModelSerializer):
         model = UserSkill
         fields = ['id', 'skill']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load the skill names in the same query and only select the serialized columns."""
+        return queryset.select_related('skill').only('id', 'user_id', 'skill__name')
+
 
 class AddUserSkillSerializer(serializers.ModelSerializer):
     skill = serializers.CharField()  # Accept skill name as a string
@@ -36,7 +43,7 @@ class AddUserSkillSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context['request'].user
         skill = validated_data['skill']
-        return UserSkill.objects.create(user=user, skill=skill)
+        return UserSkill.objects.get_or_create(user=user, skill=skill)[0]
 
 
 class UserSearchSerializer(serializers.ModelSerializer):
@@ -46,6 +53,12 @@ class UserSearchSerializer(serializers.ModelSerializer):
         model = User
         fields = ['name', 'skills']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Fetch the skills of every user on the page with one extra query."""
+        user_skills = UserSkillSerializer.setup_eager_loading(UserSkill.objects.all())
+        return queryset.only('id', 'name').prefetch_related(Prefetch('skills', queryset=user_skills))
+
 
 # Interest Serializers
 class InterestSerializer(serializers.ModelSerializer):
@@ -61,6 +74,11 @@ class UserInterestSerializer(serializers.ModelSerializer):
         model = UserInterest
         fields = ['id', 'interest']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load the interest names in the same query and only select the serialized columns."""
+        return queryset.select_related('interest').only('id', 'user_id', 'interest__name')
+
 
 class AddUserInterestSerializer(serializers.ModelSerializer):
     interest = serializers.CharField()
@@ -79,4 +97,13 @@ class AddUserInterestSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context['request'].user
         interest = validated_data['interest']
-        return UserInterest.objects.create(user=user, interest=interest)
+        return UserInterest.objects.get_or_create(user=user, interest=interest)[0]
+
+
+class BulkNamesSerializer(serializers.Serializer):
+    names = serializers.ListField(child=serializers.CharField(max_length=50), allow_empty=False)
+
+    def validate_names(self, value):
+        if len(value) > settings.BULK_MAX_ITEMS:
+            raise serializers.ValidationError(f"At most {settings.BULK_MAX_ITEMS} names are allowed per request.")
+        return value
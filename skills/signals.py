@@ -0,0 +1,65 @@
+import os
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from common.cache import bump_cache_version
+from core.models import User
+from work.models import WorkExperience
+from .bitmap_index import append_delta, job_type_key, skill_key
+from .catalog import INTEREST_CATALOG, SKILL_CATALOG
+from .facets import SEARCH_CACHE_NAMESPACE
+from .models import Interest, Skill, UserSkill
+
+
+def sync_search_index(user_id):
+    """Record the current skills and job types of a user in the search index delta log."""
+    if not os.path.exists(settings.SEARCH_INDEX_PATH):
+        return
+    skills = UserSkill.objects.filter(user_id=user_id).values_list('skill_id', flat=True)
+    job_types = WorkExperience.objects.filter(user_id=user_id).values_list('job_type', flat=True).distinct()
+    keys = {skill_key(skill_id) for skill_id in skills} | {job_type_key(job_type) for job_type in job_types}
+    if not keys and not User.objects.filter(id=user_id).exists():
+        keys = None
+    append_delta(settings.SEARCH_INDEX_PATH, user_id, keys)
+
+
+def user_search_data_changed(user_id):
+    """
+    Schedule the search index update for ``user_id`` and invalidate the cached search
+    facets once the current transaction commits.
+
+    Bulk writes (``bulk_create``/``QuerySet.delete``) do not send model signals, so code
+    paths that use them call this directly.
+    """
+    transaction.on_commit(partial(sync_search_index, user_id))
+    transaction.on_commit(partial(bump_cache_version, SEARCH_CACHE_NAMESPACE))
+
+
+@receiver(post_save, sender=UserSkill)
+@receiver(post_delete, sender=UserSkill)
+@receiver(post_save, sender=WorkExperience)
+@receiver(post_delete, sender=WorkExperience)
+def search_data_changed(sender, instance, **kwargs):
+    user_search_data_changed(instance.user_id)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    user_search_data_changed(instance.id)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def skill_catalog_changed(sender, **kwargs):
+    transaction.on_commit(partial(bump_cache_version, SKILL_CATALOG))
+    # Cached facets show skill names.
+    transaction.on_commit(partial(bump_cache_version, SEARCH_CACHE_NAMESPACE))
+
+
+@receiver(post_save, sender=Interest)
+@receiver(post_delete, sender=Interest)
+def interest_catalog_changed(sender, **kwargs):
+    transaction.on_commit(partial(bump_cache_version, INTEREST_CATALOG))
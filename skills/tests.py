@@ -1,3 +1,579 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import tempfile
+import time
+import uuid
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken
+from common.cache import bump_cache_version, get_cache_version
+from common.testing import QueryBudgetMixin
+from skills import catalog
+from skills.bitmap_index import delta_log_path, delta_log_size, read_header
+from skills.catalog import SKILL_CATALOG
+from skills.models import Interest, Skill, UserInterest, UserSkill
+from skills.seeding import PREDEFINED_INTERESTS, PREDEFINED_SKILLS
+from work.models import WorkExperience
+
+User = get_user_model()
+
+
+class UserSearchTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('user-search')
+        self.python = Skill.objects.create(name='Python')
+        self.django = Skill.objects.create(name='Django')
+        self.php = Skill.objects.create(name='PHP')
+
+        self.alice = User.objects.create_user(email='alice@example.com', password='testpass123', name='Alice')
+        self.bob = User.objects.create_user(email='bob@example.com', password='testpass123', name='Bob')
+        UserSkill.objects.create(user=self.alice, skill=self.python)
+        UserSkill.objects.create(user=self.alice, skill=self.django)
+        UserSkill.objects.create(user=self.bob, skill=self.django)
+        UserSkill.objects.create(user=self.bob, skill=self.php)
+        WorkExperience.objects.create(
+            user=self.bob, job_title='Developer', company_name='Web Co', location='Remote',
+            job_type=WorkExperience.CONTRACT, start_date='2022-01-01'
+        )
+        self.client.force_authenticate(user=self.alice)
+
+    def test_search_by_partial_skill_name(self):
+        response = self.client.get(self.url, {'skills': 'pyth'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['name'] for user in response.data['results']], ['Alice'])
+
+    def test_search_ranks_by_matched_skills(self):
+        response = self.client.get(self.url, {'skills': 'django, python'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['name'] for user in response.data['results']], ['Alice', 'Bob'])
+
+    def test_search_by_job_type(self):
+        response = self.client.get(self.url, {'skills': 'django', 'job_type': WorkExperience.CONTRACT})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['name'] for user in response.data['results']], ['Bob'])
+
+    def test_search_no_match(self):
+        response = self.client.get(self.url, {'skills': 'cobol'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_pagination(self):
+        carol = User.objects.create_user(email='carol@example.com', password='testpass123', name='Carol')
+        UserSkill.objects.create(user=carol, skill=self.django)
+
+        names = []
+        response = self.client.get(self.url, {'skills': 'django,python', 'page_size': 1})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), 1)
+            names.extend(user['name'] for user in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(names[0], 'Alice')
+        self.assertEqual(sorted(names[1:]), ['Bob', 'Carol'])
+
+    def test_search_stream(self):
+        response = self.client.get(self.url, {'skills': 'django, python', 'stream': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Alice', 'Bob'])
+
+    @override_settings(STREAM_CHUNK_SIZE=1)
+    def test_search_stream_false(self):
+        response = self.client.get(self.url, {'skills': 'django', 'stream': 'false'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.streaming)
+        self.assertIn('results', response.data)
+
+    def test_search_stream_accept_header(self):
+        response = self.client.get(self.url, {'q': 'Django'}, HTTP_ACCEPT='application/x-ndjson')
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(sorted(row['name'] for row in rows), ['Alice', 'Bob'])
+
+    def test_search_invalid_cursor(self):
+        response = self.client.get(self.url, {'skills': 'django', 'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_cursor_with_invalid_values(self):
+        for position in [['x', 'not-a-uuid'], [{'a': 1}, str(uuid.uuid4())]]:
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+            response = self.client.get(self.url, {'skills': 'django', 'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, position)
+        cursor = base64.urlsafe_b64encode(json.dumps(['not-a-uuid']).encode('utf-8')).decode('ascii')
+        response = self.client.get(self.url, {'q': 'Django', 'cursor': cursor})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BooleanUserSearchTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('user-search')
+        python = Skill.objects.create(name='Python')
+        django = Skill.objects.create(name='Django')
+        php = Skill.objects.create(name='PHP')
+        self.data_science = Skill.objects.create(name='Data Science')
+
+        self.alice = User.objects.create_user(email='alice@example.com', password='testpass123', name='Alice')
+        self.bob = User.objects.create_user(email='bob@example.com', password='testpass123', name='Bob')
+        self.carol = User.objects.create_user(email='carol@example.com', password='testpass123', name='Carol')
+        for user, skills in [(self.alice, [python, django]), (self.bob, [python, django, php]), (self.carol, [php])]:
+            for skill in skills:
+                UserSkill.objects.create(user=user, skill=skill)
+        WorkExperience.objects.create(
+            user=self.alice, job_title='Developer', company_name='Web Co', location='Remote',
+            job_type=WorkExperience.FULL_TIME, start_date='2022-01-01'
+        )
+        self.client.force_authenticate(user=self.alice)
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.index_path = os.path.join(self.tmpdir.name, 'search.idx')
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        if response.status_code != status.HTTP_200_OK:
+            return response.status_code
+        return sorted(user['name'] for user in response.data['results'])
+
+    def check_queries(self):
+        self.assertEqual(self.search(q='Python AND Django AND NOT PHP'), ['Alice'])
+        self.assertEqual(self.search(q='PHP OR (python AND django)'), ['Alice', 'Bob', 'Carol'])
+        self.assertEqual(self.search(q='NOT Python'), ['Carol'])
+        self.assertEqual(self.search(q='Python', job_type=WorkExperience.FULL_TIME), ['Alice'])
+        self.assertEqual(self.search(q='Rust'), status.HTTP_404_NOT_FOUND)
+
+    def test_boolean_search_without_index(self):
+        with override_settings(SEARCH_INDEX_PATH=self.index_path):
+            self.check_queries()
+
+    def test_boolean_search_with_index(self):
+        with override_settings(SEARCH_INDEX_PATH=self.index_path):
+            call_command('build_search_index', stdout=open(os.devnull, 'w'))
+            self.check_queries()
+
+    def test_index_applies_deltas(self):
+        with override_settings(SEARCH_INDEX_PATH=self.index_path):
+            call_command('build_search_index', stdout=open(os.devnull, 'w'))
+            with self.captureOnCommitCallbacks(execute=True):
+                dave = User.objects.create_user(email='dave@example.com', password='testpass123', name='Dave')
+                UserSkill.objects.create(user=dave, skill=self.data_science)
+            self.assertEqual(self.search(q='Data Science'), ['Dave'])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                for user_skill in UserSkill.objects.filter(user=self.bob, skill__name='PHP'):
+                    user_skill.delete()
+            self.assertEqual(self.search(q='Python AND Django AND NOT PHP'), ['Alice', 'Bob'])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.alice.delete()
+            self.assertEqual(self.search(q='Python'), ['Bob'])
+
+    def test_index_follows_skill_renames(self):
+        with override_settings(SEARCH_INDEX_PATH=self.index_path):
+            call_command('build_search_index', stdout=open(os.devnull, 'w'))
+            with self.captureOnCommitCallbacks(execute=True):
+                Skill.objects.filter(name='PHP').update(name='Hack')
+            self.assertEqual(self.search(q='Hack'), ['Bob', 'Carol'])
+            self.assertEqual(self.search(q='PHP'), status.HTTP_404_NOT_FOUND)
+
+    def test_rebuild_starts_a_new_delta_log(self):
+        with override_settings(SEARCH_INDEX_PATH=self.index_path):
+            call_command('build_search_index', stdout=open(os.devnull, 'w'))
+            with self.captureOnCommitCallbacks(execute=True):
+                UserSkill.objects.create(user=self.carol, skill=self.data_science)
+            old_log = delta_log_path(self.index_path, read_header(self.index_path)['delta_log'])
+            self.assertGreater(os.path.getsize(old_log), 0)
+
+            # A change made while the index is being built is carried over into the new log.
+            offset = delta_log_size(self.index_path)
+            with self.captureOnCommitCallbacks(execute=True):
+                UserSkill.objects.create(user=self.alice, skill=self.data_science)
+            with patch('skills.management.commands.build_search_index.delta_log_size', return_value=offset):
+                call_command('build_search_index', stdout=open(os.devnull, 'w'))
+            self.assertFalse(os.path.exists(old_log))
+            new_log = delta_log_path(self.index_path, read_header(self.index_path)['delta_log'])
+            with open(new_log) as handle:
+                self.assertEqual([json.loads(line)['u'] for line in handle], [str(self.alice.id)])
+            self.assertEqual(self.search(q='Data Science'), ['Alice', 'Carol'])
+
+    def test_boolean_search_syntax_error(self):
+        response = self.client.get(self.url, {'q': 'Python AND (Django'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class UserSearchFacetsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('user-search-facets')
+        self.python = Skill.objects.create(name='Python')
+        self.django = Skill.objects.create(name='Django')
+        php = Skill.objects.create(name='PHP')
+
+        self.alice = User.objects.create_user(email='alice@example.com', name='Alice')
+        self.bob = User.objects.create_user(email='bob@example.com', name='Bob')
+        carol = User.objects.create_user(email='carol@example.com', name='Carol')
+        for user, skills in [(self.alice, [self.python, self.django]), (self.bob, [self.python, php]), (carol, [php])]:
+            for skill in skills:
+                UserSkill.objects.create(user=user, skill=skill)
+        for user, job_type in [(self.alice, WorkExperience.FULL_TIME), (self.bob, WorkExperience.CONTRACT)]:
+            WorkExperience.objects.create(
+                user=user, job_title='Developer', company_name='Web Co', location='Remote',
+                job_type=job_type, start_date='2022-01-01'
+            )
+        self.client.force_authenticate(user=self.alice)
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.index_path = os.path.join(self.tmpdir.name, 'search.idx')
+
+    def facets(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def check_facets(self, **params):
+        self.assertEqual(self.facets(**params), {
+            'skills': [{'name': 'Python', 'count': 2}, {'name': 'Django', 'count': 1}, {'name': 'PHP', 'count': 1}],
+            'job_types': [
+                {'name': WorkExperience.CONTRACT, 'count': 1}, {'name': WorkExperience.FULL_TIME, 'count': 1}
+            ],
+        })
+
+    def test_facets_for_skill_search(self):
+        self.check_facets(skills='pyth')
+
+    def test_facets_are_one_query(self):
+        with self.assertNumQueries(1):
+            self.facets(skills='python', job_type=WorkExperience.CONTRACT)
+
+    def test_facets_for_boolean_search(self):
+        with override_settings(SEARCH_INDEX_PATH=self.index_path):
+            self.check_facets(q='Python AND NOT Rust')
+            cache.clear()
+            call_command('build_search_index', stdout=open(os.devnull, 'w'))
+            self.check_facets(q='Python AND NOT Rust')
+
+    def test_facets_are_cached_until_search_data_changes(self):
+        self.facets(skills='python')
+        with self.assertNumQueries(0):
+            self.check_facets(skills='Python ')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserSkill.objects.create(user=self.bob, skill=self.django)
+        self.assertEqual(self.facets(skills='python')['skills'][0], {'name': 'Django', 'count': 2})
+
+    def test_facets_syntax_error(self):
+        response = self.client.get(self.url, {'q': 'Python AND'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CatalogCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('skill-list')
+        for name in ['Python', 'Django', 'PHP']:
+            Skill.objects.create(name=name)
+        Interest.objects.create(name='Music')
+        user = User.objects.create_user(email='alice@example.com', name='Alice')
+        self.client.force_authenticate(user=user)
+
+    def names(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['name'] for item in json.loads(response.content)['results']]
+
+    def test_catalog_is_served_from_cache(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.names(response), ['Django', 'PHP', 'Python'])
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"stale", {etag}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_catalog_write_invalidates_cache(self):
+        skills_etag = self.client.get(self.url)['ETag']
+        interests_etag = self.client.get(reverse('predefined-interests'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='Rust')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=skills_etag)
+        self.assertEqual(self.names(response), ['Django', 'PHP', 'Python', 'Rust'])
+        self.assertNotEqual(response['ETag'], skills_etag)
+        response = self.client.get(reverse('predefined-interests'), HTTP_IF_NONE_MATCH=interests_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_catalog_pages_are_cached_separately(self):
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(self.names(response), ['Django', 'PHP'])
+        next_url = json.loads(response.content)['next']
+        self.assertEqual(self.names(self.client.get(next_url)), ['Python'])
+        self.assertEqual(self.names(self.client.get(self.url, {'page_size': 2})), ['Django', 'PHP'])
+
+    def test_local_pages_expire(self):
+        catalog._set_local('page', b'body')
+        self.assertEqual(catalog._get_local('page'), b'body')
+        expired = time.monotonic() + settings.CATALOG_LOCAL_CACHE_TIMEOUT + 1
+        with patch('skills.catalog.time.monotonic', return_value=expired):
+            self.assertIsNone(catalog._get_local('page'))
+        self.assertNotIn('page', catalog._local_pages)
+
+    def test_version_bumped_by_another_worker(self):
+        etag = self.client.get(self.url)['ETag']
+        # Another worker's write only reaches this one through the shared cache.
+        Skill.objects.bulk_create([Skill(name='Rust')])
+        bump_cache_version(SKILL_CATALOG)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.names(response), ['Django', 'PHP', 'Python', 'Rust'])
+
+
+class UserSkillListConditionalTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('user-skill-list')
+        self.user = User.objects.create_user(email='alice@example.com', name='Alice')
+        for name in ['Python', 'Django']:
+            UserSkill.objects.create(user=self.user, skill=Skill.objects.create(name=name))
+        self.client.force_authenticate(user=self.user)
+
+    def test_not_modified_is_one_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_no_last_modified(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        # A deletion leaves the newest ``updated_at`` as it is, so a date cannot validate a collection.
+        UserSkill.objects.filter(user=self.user, skill__name='Django').delete()
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_deletion_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        UserSkill.objects.filter(user=self.user, skill__name='Django').delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
+
+class BulkUserLinksTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.url = reverse('bulk-user-skills')
+        for name in ['Python', 'Django', 'PHP']:
+            Skill.objects.create(name=name)
+        Interest.objects.create(name='Music')
+        self.user = User.objects.create_user(email='alice@example.com', name='Alice')
+        self.client.force_authenticate(user=self.user)
+
+    def statuses(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(item['name'], item['status']) for item in response.data['results']]
+
+    def test_bulk_add(self):
+        UserSkill.objects.create(user=self.user, skill=Skill.objects.get(name='Django'))
+        # Resolve, read existing links and insert, plus the request's savepoint.
+        with self.assertMaxQueries(5):
+            response = self.client.post(self.url, {'names': ['Python', 'Django', 'Cobol']}, format='json')
+        self.assertEqual(self.statuses(response), [('Python', 'added'), ('Django', 'exists'), ('Cobol', 'not_found')])
+        self.assertEqual(
+            sorted(UserSkill.objects.filter(user=self.user).values_list('skill__name', flat=True)), ['Django', 'Python']
+        )
+
+    def test_bulk_add_is_idempotent(self):
+        self.client.post(self.url, {'names': ['Python', 'Python']}, format='json')
+        response = self.client.post(self.url, {'names': ['Python']}, format='json')
+        self.assertEqual(self.statuses(response), [('Python', 'exists')])
+        self.assertEqual(UserSkill.objects.filter(user=self.user).count(), 1)
+
+    def test_bulk_remove(self):
+        self.client.post(self.url, {'names': ['Python', 'PHP']}, format='json')
+        # Savepoint, names, current links, the rows for the delete signals, the delete, release.
+        with self.captureOnCommitCallbacks() as callbacks, self.assertMaxQueries(6):
+            response = self.client.delete(self.url, {'names': ['PHP', 'Django', 'Cobol']}, format='json')
+        # The search index update and the facets invalidation are scheduled by the delete signals.
+        self.assertTrue(callbacks)
+        self.assertEqual(
+            self.statuses(response), [('PHP', 'removed'), ('Django', 'not_present'), ('Cobol', 'not_found')]
+        )
+        self.assertEqual(list(UserSkill.objects.filter(user=self.user).values_list('skill__name', flat=True)), ['Python'])
+
+    def test_bulk_interests(self):
+        url = reverse('bulk-user-interests')
+        response = self.client.post(url, {'names': ['Music', 'Art']}, format='json')
+        self.assertEqual(self.statuses(response), [('Music', 'added'), ('Art', 'not_found')])
+        response = self.client.delete(url, {'names': ['Music']}, format='json')
+        self.assertEqual(self.statuses(response), [('Music', 'removed')])
+        self.assertFalse(UserInterest.objects.filter(user=self.user).exists())
+
+    def test_bulk_writes_update_search(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                override_settings(SEARCH_INDEX_PATH=os.path.join(tmpdir, 'search.idx')):
+            call_command('build_search_index', stdout=open(os.devnull, 'w'))
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(self.url, {'names': ['Python', 'Django']}, format='json')
+            response = self.client.get(reverse('user-search'), {'q': 'Python AND Django'})
+            self.assertEqual([user['name'] for user in response.data['results']], ['Alice'])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.delete(self.url, {'names': ['Django']}, format='json')
+            response = self.client.get(reverse('user-search'), {'q': 'Python AND Django'})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_invalid_payload(self):
+        response = self.client.post(self.url, {'names': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(BULK_MAX_ITEMS=2):
+            response = self.client.post(self.url, {'names': ['a', 'b', 'c']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        skills = [Skill.objects.create(name=f'Skill {i}') for i in range(5)]
+        interests = [Interest.objects.create(name=f'Interest {i}') for i in range(5)]
+        self.users = [
+            User.objects.create_user(email=f'user{i}@example.com', name=f'User {i}')
+            for i in range(20)
+        ]
+        for user in self.users:
+            for skill in skills:
+                UserSkill.objects.create(user=user, skill=skill)
+            for interest in interests:
+                UserInterest.objects.create(user=user, interest=interest)
+        self.client.force_authenticate(user=self.users[0])
+
+    def test_user_search_queries(self):
+        with self.assertMaxQueries(3):
+            response = self.client.get(reverse('user-search'), {'skills': 'skill'})
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_boolean_user_search_queries(self):
+        with self.assertMaxQueries(2):
+            response = self.client.get(reverse('user-search'), {'q': 'Skill 1 AND NOT Skill 9'})
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_user_skill_list_queries(self):
+        with self.assertMaxQueries(2):
+            response = self.client.get(reverse('user-skill-list'))
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_user_interest_list_queries(self):
+        with self.assertMaxQueries(2):
+            response = self.client.get(reverse('user-interests'))
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_catalog_list_queries(self):
+        with self.assertMaxQueries(1):
+            self.client.get(reverse('skill-list'))
+        with self.assertMaxQueries(1):
+            self.client.get(reverse('predefined-interests'))
+
+
+class AsyncReadViewsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        python = Skill.objects.create(name='Python')
+        django = Skill.objects.create(name='Django')
+        self.alice = User.objects.create_user(email='alice@example.com', password='testpass123', name='Alice')
+        self.bob = User.objects.create_user(email='bob@example.com', password='testpass123', name='Bob')
+        UserSkill.objects.create(user=self.alice, skill=python)
+        UserSkill.objects.create(user=self.alice, skill=django)
+        UserSkill.objects.create(user=self.bob, skill=django)
+        UserInterest.objects.create(user=self.alice, interest=Interest.objects.create(name='Music'))
+        self.authorization = f'Bearer {AccessToken.for_user(self.alice)}'
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+
+    def test_responses_match_sync_views(self):
+        for name in ['skill-list', 'user-skill-list', 'user-interests', 'predefined-interests']:
+            expected = self.client.get(reverse(name), {'page_size': 1})
+            response = self.client.get(reverse(f'async-{name}'), {'page_size': 1})
+            self.assertEqual(response.status_code, status.HTTP_200_OK, name)
+            self.assertEqual(response.json()['results'], expected.json()['results'], name)
+
+            response = self.client.get(reverse(f'async-{name}'), {'page_size': 1}, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, name)
+
+    def test_search(self):
+        url = reverse('async-user-search')
+        response = self.client.get(url, {'skills': 'python'})
+        self.assertEqual([user['name'] for user in response.json()['results']], ['Alice'])
+        response = self.client.get(url, {'q': 'Django AND NOT Python'})
+        self.assertEqual([user['name'] for user in response.json()['results']], ['Bob'])
+        self.assertEqual(self.client.get(url, {'skills': 'rust'}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url, {'q': 'Django AND'}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {'skills': 'python', 'stream': '0'})
+        self.assertFalse(response.streaming)
+        self.assertEqual([user['name'] for user in response.json()['results']], ['Alice'])
+
+    async def test_search_stream(self):
+        for params in [{'skills': 'django'}, {'q': 'Django OR Python'}]:
+            response = await self.async_client.get(reverse('async-user-search'), {**params, 'stream': '1'},
+                                                   headers={'Authorization': self.authorization})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            lines = b''.join([chunk async for chunk in response.streaming_content]).decode().splitlines()
+            self.assertEqual(sorted(json.loads(line)['name'] for line in lines), ['Alice', 'Bob'])
+
+    def test_authentication_is_required(self):
+        self.client.credentials()
+        response = self.client.get(reverse('async-skill-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(self.client.get(reverse('async-skill-list')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SeedingTestCase(APITestCase):
+    def test_populate_data_upserts_the_catalogs(self):
+        Skill.objects.create(name='Python')
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('populate_data', stdout=open(os.devnull, 'w'))
+        version = get_cache_version(SKILL_CATALOG)
+        self.assertEqual(Skill.objects.count(), len(PREDEFINED_SKILLS))
+        self.assertEqual(Interest.objects.count(), len(PREDEFINED_INTERESTS))
+
+        with self.assertNumQueries(4), self.captureOnCommitCallbacks(execute=True):
+            call_command('populate_data', stdout=open(os.devnull, 'w'))
+        self.assertEqual(Skill.objects.count(), len(PREDEFINED_SKILLS))
+        # Nothing was added, so the cached catalog pages stay valid.
+        self.assertEqual(get_cache_version(SKILL_CATALOG), version)
+
+    def test_generate_users(self):
+        call_command('generate_users', '--users', '30', '--batch-size', '12', '--passwords', '2', '--workers', '2',
+                     '--seed', '1', stdout=open(os.devnull, 'w'))
+        users = User.objects.filter(email__endswith='@example.com')
+        self.assertEqual(users.count(), 30)
+        self.assertEqual(Skill.objects.count(), len(PREDEFINED_SKILLS))
+        self.assertTrue(UserSkill.objects.exists())
+        self.assertTrue(UserInterest.objects.exists())
+        for experience in WorkExperience.objects.all():
+            self.assertTrue(experience.end_date is None or experience.start_date <= experience.end_date)
+            self.assertIn(experience.job_type, dict(WorkExperience.JOB_TYPES))
+
+        first = users.get(email__endswith='.0@example.com')
+        second = users.get(email__endswith='.1@example.com')
+        self.assertTrue(first.check_password('password-0'))
+        self.assertTrue(second.check_password('password-1'))
+        login = self.client.post(reverse('login'), {'email': first.email, 'password': 'password-0'}, format='json')
+        self.assertEqual(login.status_code, status.HTTP_200_OK)
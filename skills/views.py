@@ -1,5 +1,8 @@
 import logging
 from django.db import transaction
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -7,21 +10,31 @@ from django.shortcuts import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from .models import *
 from .serializers import *
+from .bulk import bulk_user_interests, bulk_user_skills
+from .catalog import INTEREST_CATALOG, SKILL_CATALOG, catalog_response
+from .facets import get_facets
+from .search import QuerySyntaxError, boolean_search_users, parse_boolean_query, search_users
 from django.db.models import Q
-from core.models import User
+from common.cache import get_cache_version
+from common.conditional import not_modified, queryset_validators, set_validators
 from common.docs import *
+from common.pagination import KeysetPagination
+from common.routing import ReplicaReadMixin
+from common.streaming import NDJSONRenderer, stream_ndjson, stream_requested
 
 
-class SkillListView(APIView):
+class SkillListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = SkillSerializer
+    pagination_class = KeysetPagination
+    pagination_ordering = ('name',)
 
     @skill_list_docs()
     def get(self, request):
         try:
-            skills = Skill.objects.all()
-            serializer = self.serializer_class(skills, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return catalog_response(request, self, Skill.objects.only('id', 'name'), SKILL_CATALOG)
+        except NotFound as e:
+            return Response({'detail': e.detail}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logging.error(f"Error occurred: {e}")
             return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
@@ -47,16 +60,54 @@ class AddUserSkillView(APIView):
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class UserSkillBulkView(APIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = BulkNamesSerializer
+    bulk = bulk_user_skills
+
+    @transaction.atomic()
+    @bulk_user_skills_docs()
+    def post(self, request):
+        return self.apply(request, self.bulk.add)
+
+    @transaction.atomic()
+    @bulk_user_skills_docs(remove=True)
+    def delete(self, request):
+        return self.apply(request, self.bulk.remove)
+
+    def apply(self, request, operation):
+        try:
+            serializer = self.serializer_class(data=request.data)
+            if serializer.is_valid():
+                results = operation(request.user, serializer.validated_data['names'])
+                return Response({'results': results}, status=status.HTTP_200_OK)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logging.error(f"Error occurred: {e}")
+            return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class UserSkillListView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserSkillSerializer
+    pagination_class = KeysetPagination
 
     @user_skill_list_docs()
     def get(self, request):
         try:
             user_skills = UserSkill.objects.filter(user=request.user)
-            serializer = self.serializer_class(user_skills, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # The catalog version covers renamed skills/interests, which are part of the response.
+            etag, last_modified = queryset_validators(user_skills, get_cache_version(SKILL_CATALOG))
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                paginator = self.pagination_class()
+                page = paginator.paginate_queryset(self.serializer_class.setup_eager_loading(user_skills), request, view=self)
+                serializer = self.serializer_class(page, many=True)
+                response = paginator.get_paginated_response(serializer.data)
+            return set_validators(response, etag, last_modified)
+        except NotFound as e:
+            return Response({'detail': e.detail}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logging.error(f"Error occurred: {e}")
             return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
@@ -79,29 +130,91 @@ class UserSkillDeleteView(APIView):
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class UserSearchView(APIView):
+class UserSearchView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserSearchSerializer
+    pagination_class = KeysetPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
 
     @user_search_docs()
     def get(self, request):
         try:
             skills_query = request.query_params.get('skills')
             job_type_query = request.query_params.get('job_type')
-            users = User.objects.all()
-
-            if skills_query:
-                users = users.filter(skills__skill__name__icontains=skills_query)
+            boolean_query = request.query_params.get('q')
 
-            if job_type_query:
-                users = users.filter(work_experiences__job_type=job_type_query)
+            if request.accepted_renderer.format == NDJSONRenderer.format or stream_requested(request):
+                return self.stream(boolean_query, skills_query, job_type_query)
 
-            users = users.distinct()
+            paginator = self.pagination_class()
+            if boolean_query:
+                position = paginator.decode_cursor(request, ('id',), User.objects.all())
+                users = boolean_search_users(
+                    boolean_query, job_type_query,
+                    after=position[0] if position else None,
+                    limit=paginator.get_page_size(request) + 1,
+                )
+            else:
+                users = search_users(skills_query, job_type_query)
 
-            if not users.exists():
+            users = self.serializer_class.setup_eager_loading(users)
+            page = paginator.paginate_queryset(users, request, view=self)
+            if not page:
                 return Response({"detail": "No users found matching the criteria."}, status=status.HTTP_404_NOT_FOUND)
-            serializer = self.serializer_class(users, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            serializer = self.serializer_class(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+        except QuerySyntaxError as e:
+            return Response({'q': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+        except NotFound as e:
+            return Response({'detail': e.detail}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logging.error(f"Error occurred: {e}")
+            return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def stream(self, boolean_query, skills_query, job_type_query):
+        """
+        Stream every matching user as NDJSON.
+
+        Skill searches are read through a server-side cursor; boolean searches walk the
+        index (or the database) one id range at a time, so memory stays flat either way.
+        """
+        chunk_size = settings.STREAM_CHUNK_SIZE
+        if not boolean_query:
+            users = self.serializer_class.setup_eager_loading(search_users(skills_query, job_type_query))
+            return stream_ndjson(users.iterator(chunk_size=chunk_size), self.serializer_class, chunk_size)
+
+        parse_boolean_query(boolean_query)
+
+        def users():
+            after = None
+            while True:
+                chunk = boolean_search_users(boolean_query, job_type_query, after=after, limit=chunk_size)
+                if after is not None:
+                    chunk = chunk.filter(id__gt=after)
+                chunk = list(self.serializer_class.setup_eager_loading(chunk)[:chunk_size])
+                yield from chunk
+                if len(chunk) < chunk_size:
+                    return
+                after = chunk[-1].id
+
+        return stream_ndjson(users(), self.serializer_class, chunk_size)
+
+
+class UserSearchFacetsView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    @user_search_facets_docs()
+    def get(self, request):
+        try:
+            facets = get_facets(
+                skills_query=request.query_params.get('skills'),
+                boolean_query=request.query_params.get('q'),
+                job_type=request.query_params.get('job_type'),
+            )
+            return Response(facets, status=status.HTTP_200_OK)
+        except QuerySyntaxError as e:
+            return Response({'q': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logging.error(f"Error occurred: {e}")
             return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
@@ -127,16 +240,40 @@ class AddUserInterestView(APIView):
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class UserInterestBulkView(UserSkillBulkView):
+    bulk = bulk_user_interests
+
+    @transaction.atomic()
+    @bulk_user_interests_docs()
+    def post(self, request):
+        return self.apply(request, self.bulk.add)
+
+    @transaction.atomic()
+    @bulk_user_interests_docs(remove=True)
+    def delete(self, request):
+        return self.apply(request, self.bulk.remove)
+
+
 class UserInterestsView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserInterestSerializer
+    pagination_class = KeysetPagination
 
     @view_user_interests_docs()
     def get(self, request):
         try:
             user_interest = UserInterest.objects.filter(user=request.user)
-            serializer = self.serializer_class(user_interest, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # The catalog version covers renamed skills/interests, which are part of the response.
+            etag, last_modified = queryset_validators(user_interest, get_cache_version(INTEREST_CATALOG))
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                paginator = self.pagination_class()
+                page = paginator.paginate_queryset(self.serializer_class.setup_eager_loading(user_interest), request, view=self)
+                serializer = self.serializer_class(page, many=True)
+                response = paginator.get_paginated_response(serializer.data)
+            return set_validators(response, etag, last_modified)
+        except NotFound as e:
+            return Response({'detail': e.detail}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logging.error(f"Error occurred: {e}")
             return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
@@ -161,16 +298,18 @@ class DeleteUserInterestView(APIView):
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class InterestListView(APIView):
+class InterestListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = InterestSerializer
+    pagination_class = KeysetPagination
+    pagination_ordering = ('name',)
 
     @interests_list_docs()
     def get(self, request):
         try:
-            interests = Interest.objects.all()
-            serializer = self.serializer_class(interests, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return catalog_response(request, self, Interest.objects.only('id', 'name'), INTEREST_CATALOG)
+        except NotFound as e:
+            return Response({'detail': e.detail}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logging.error(f"Error occurred: {e}")
             return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
@@ -0,0 +1,7 @@
+from .async_views import *
+from django.urls import path
+
+urlpatterns = [
+    path('experiences/', AsyncWorkExperienceListView.as_view(), name='async-work-experience-list'),
+    path('experiences/<uuid:pk>/', AsyncWorkExperienceDetailView.as_view(), name='async-work-experience-detail'),
+]
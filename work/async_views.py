@@ -0,0 +1,39 @@
+from django.shortcuts import aget_object_or_404
+from rest_framework import status
+from .models import WorkExperience
+from .serializers import WorkExperienceDetailSerializer, WorkExperienceListSerializer
+from common.async_views import AsyncAPIView, render
+from common.conditional import instance_validators, not_modified, set_validators
+from common.pagination import KeysetPagination
+
+
+class AsyncWorkExperienceListView(AsyncAPIView):
+    """Async ``WorkExperienceListView``."""
+    serializer_class = WorkExperienceListSerializer
+    pagination_class = KeysetPagination
+    pagination_ordering = ('-start_date', 'id')
+
+    async def get(self, request):
+        work_experiences = self.serializer_class.setup_eager_loading(
+            WorkExperience.objects.filter(user=request.user)
+        )
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(work_experiences, request, view=self)
+        if not page:
+            return render({'message': 'No work experiences found for this user.', 'data': None},
+                          status.HTTP_404_NOT_FOUND)
+        serializer = self.serializer_class(page, many=True)
+        return render(paginator.get_paginated_response(serializer.data).data)
+
+
+class AsyncWorkExperienceDetailView(AsyncAPIView):
+    """Async ``WorkExperienceDetailView``."""
+    serializer_class = WorkExperienceDetailSerializer
+
+    async def get(self, request, pk):
+        work_experience = await aget_object_or_404(WorkExperience, pk=pk, user=request.user)
+        etag, last_modified = instance_validators(work_experience)
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = render(self.serializer_class(work_experience).data)
+        return set_validators(response, etag, last_modified)
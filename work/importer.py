@@ -0,0 +1,109 @@
+import codecs
+import csv
+import json
+
+from django.conf import settings
+from django.db import transaction
+from skills.signals import user_search_data_changed
+from .models import WorkExperience
+from .serializers import WorkExperienceSerializer
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+FORMATS = {
+    'text/csv': CSV,
+    'application/x-ndjson': NDJSON,
+    'application/jsonl': NDJSON,
+}
+# Longest accepted line; bounds the memory a single malformed row can take.
+MAX_LINE_BYTES = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    """The input cannot be parsed at all (as opposed to a row failing validation)."""
+
+
+def _lines(stream):
+    """Yield the raw lines of a binary stream without ever reading more than one line ahead."""
+    number = 0
+    while True:
+        line = stream.readline(MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        number += 1
+        if len(line) > MAX_LINE_BYTES:
+            raise ImportFormatError(f'Line {number} is longer than {MAX_LINE_BYTES} bytes.')
+        yield line
+
+
+def csv_rows(stream):
+    """Yield ``(line, row)`` pairs from a CSV stream with a header row."""
+    reader = csv.DictReader(codecs.iterdecode(_lines(stream), 'utf-8-sig'))
+    try:
+        for row in reader:
+            # Empty cells mean "not given", so optional columns such as ``end_date`` may be left blank.
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ('', None)}
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFormatError(f'Line {reader.line_num + 1}: {e}')
+
+
+def ndjson_rows(stream):
+    """Yield ``(line, row)`` pairs from a newline delimited JSON stream; blank lines are skipped."""
+    for number, line in enumerate(_lines(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, e
+
+
+def parse_rows(stream, import_format):
+    if import_format == CSV:
+        return csv_rows(stream)
+    if import_format == NDJSON:
+        return ndjson_rows(stream)
+    raise ImportFormatError(f'Unsupported format: {import_format}')
+
+
+def import_work_experiences(user, rows, batch_size=None, max_errors=None):
+    """
+    Validate ``rows`` one by one and insert the valid ones for ``user`` in batches.
+
+    Only one batch of rows is held in memory at a time. Invalid rows are skipped and
+    reported (at most ``max_errors`` of them). Everything runs in one transaction, so
+    an unparseable input or a database error leaves no partial import behind.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    max_errors = settings.IMPORT_MAX_ERRORS if max_errors is None else max_errors
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+    batch = []
+
+    def flush():
+        WorkExperience.objects.bulk_create(batch)
+        report['imported'] += len(batch)
+        batch.clear()
+
+    with transaction.atomic():
+        for line, row in rows:
+            if isinstance(row, dict):
+                serializer = WorkExperienceSerializer(data=row)
+                errors = None if serializer.is_valid() else serializer.errors
+            else:
+                error = f'Invalid JSON: {row}' if isinstance(row, Exception) else 'Expected a JSON object.'
+                errors = {'non_field_errors': [error]}
+            if errors:
+                report['failed'] += 1
+                if len(report['errors']) < max_errors:
+                    report['errors'].append({'line': line, 'errors': errors})
+                continue
+            batch.append(WorkExperience(user=user, **serializer.validated_data))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        if report['imported']:
+            user_search_data_changed(user.id)
+
+    report['errors_truncated'] = report['failed'] > len(report['errors'])
+    return report
@@ -0,0 +1,39 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from core.models import User
+from work.importer import CSV, NDJSON, ImportFormatError, import_work_experiences, parse_rows
+
+
+class Command(BaseCommand):
+    help = 'Import work experiences for a user from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='Email of the user the work experiences belong to')
+        parser.add_argument('path', help='CSV file with a header row, or NDJSON file with one object per line')
+        parser.add_argument('--format', choices=[CSV, NDJSON], default=None,
+                            help='Input format (defaults to the file extension)')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--max-errors', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['email'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user with email {options["email"]}')
+
+        import_format = options['format']
+        if import_format is None:
+            extension = os.path.splitext(options['path'])[1].lower()
+            import_format = CSV if extension == '.csv' else NDJSON
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                report = import_work_experiences(
+                    user, parse_rows(stream, import_format),
+                    batch_size=options['batch_size'], max_errors=options['max_errors'],
+                )
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:23
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # ``CREATE INDEX CONCURRENTLY`` does not block writes but cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('work', '0002_change_tracking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='workexperience',
+            index=models.Index(fields=['user', '-start_date', 'id'], name='workexp_user_start_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='workexperience',
+            index=models.Index(fields=['job_type', 'user'], name='workexp_job_type_user_idx'),
+        ),
+    ]
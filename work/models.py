@@ -22,6 +22,14 @@ class WorkExperience(BaseModel):
     end_date = models.DateField(null=True, blank=True)
     description = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # Serves the per-user lists, which are ordered by ``-start_date, id`` (keyset pagination).
+            models.Index(fields=['user', '-start_date', 'id'], name='workexp_user_start_idx'),
+            # Serves the ``job_type`` filter of user search and the job type facets.
+            models.Index(fields=['job_type', 'user'], name='workexp_job_type_user_idx'),
+        ]
+
     def __str__(self):
         return f'{self.job_title} at {self.company_name}'
 
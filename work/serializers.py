@@ -23,3 +23,8 @@ class WorkExperienceListSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkExperience
         fields = ['id', 'job_title', 'company_name']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Only select the serialized columns plus ``start_date``, which the list is paginated by."""
+        return queryset.only('id', 'job_title', 'company_name', 'start_date')
@@ -1,12 +1,21 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken
+from common.testing import QueryBudgetMixin
 from work.models import WorkExperience
 
 User = get_user_model()
 
-class WorkExperienceAPITestCase(APITestCase):
+class WorkExperienceAPITestCase(QueryBudgetMixin, APITestCase):
 
     def setUp(self):
         # Create a user with email and password (no username)
@@ -39,7 +48,17 @@ class WorkExperienceAPITestCase(APITestCase):
     def test_list_work_experiences(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_list_work_experiences_queries(self):
+        for year in range(2010, 2020):
+            WorkExperience.objects.create(
+                user=self.user, job_title="Engineer", company_name="Tech Corp", location="Remote",
+                job_type=WorkExperience.CONTRACT, start_date=f"{year}-01-01"
+            )
+        with self.assertMaxQueries(1):
+            response = self.client.get(self.list_url)
+        self.assertEqual(len(response.data['results']), 11)
 
     def test_create_work_experience(self):
         data = {
@@ -60,6 +79,17 @@ class WorkExperienceAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['job_title'], 'Software Engineer')
 
+    def test_get_work_experience_detail_not_modified(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.work_experience.job_title = 'Staff Engineer'
+        self.work_experience.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['job_title'], 'Staff Engineer')
+
     def test_edit_work_experience(self):
         data = {
             "job_title": "Senior Software Engineer",
@@ -75,3 +105,102 @@ class WorkExperienceAPITestCase(APITestCase):
         response = self.client.delete(self.delete_url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(WorkExperience.objects.count(), 0)
+
+
+class WorkExperienceImportTestCase(QueryBudgetMixin, APITestCase):
+    CSV = (
+        'job_title,company_name,location,job_type,start_date,end_date,description\n'
+        'Engineer,Tech Corp,Remote,Full-time,2020-01-01,2021-01-01,"Built APIs,\nand tooling"\n'
+        'Intern,Start Up,Berlin,Part-time,2019-06-01,,\n'
+        'Manager,Tech Corp,Remote,Full-time,2022-01-01,2021-01-01,\n'
+    )
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="testuser@example.com")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('work-experience-import')
+
+    def test_import_csv(self):
+        response = self.client.post(self.url, self.CSV, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(response.data['errors'][0]['line'], 5)
+        self.assertFalse(response.data['errors_truncated'])
+        engineer = WorkExperience.objects.get(user=self.user, job_title='Engineer')
+        self.assertEqual(engineer.description, 'Built APIs,\nand tooling')
+        self.assertIsNone(WorkExperience.objects.get(user=self.user, job_title='Intern').end_date)
+
+    @override_settings(IMPORT_BATCH_SIZE=10, IMPORT_MAX_ERRORS=1)
+    def test_import_ndjson_in_batches(self):
+        rows = [
+            json.dumps({'job_title': f'Job {i}', 'company_name': 'Corp', 'location': 'Remote',
+                        'job_type': 'Contract', 'start_date': f'{2000 + i}-01-01'})
+            for i in range(25)
+        ]
+        body = '\n'.join(rows[:10] + ['{not json', '', '[1, 2]'] + rows[10:])
+        # One INSERT per batch of ten rows, plus the transaction's savepoint.
+        with self.assertMaxQueries(5):
+            response = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.data['imported'], 25)
+        self.assertEqual(response.data['failed'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [11])
+        self.assertTrue(response.data['errors_truncated'])
+        self.assertEqual(WorkExperience.objects.filter(user=self.user).count(), 25)
+
+    def test_import_unsupported_media_type(self):
+        response = self.client.post(self.url, {'job_title': 'Engineer'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_import_unparseable_body_imports_nothing(self):
+        body = self.CSV + 'x' * (70 * 1024) + '\n'
+        response = self.client.post(self.url, body, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(WorkExperience.objects.filter(user=self.user).exists())
+
+    def test_import_command(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'experiences.csv')
+            with open(path, 'w') as f:
+                f.write(self.CSV)
+            out = StringIO()
+            call_command('import_work_experiences', self.user.email, path, stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['imported'], 2)
+        self.assertEqual(WorkExperience.objects.filter(user=self.user).count(), 2)
+
+
+class AsyncWorkExperienceViewsTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="testuser@example.com", password="password123")
+        self.other = User.objects.create_user(email="other@example.com", password="password123")
+        self.experiences = [
+            WorkExperience.objects.create(user=self.user, job_title=f"Engineer {i}", company_name="Acme",
+                                          job_type=WorkExperience.FULL_TIME, start_date=f"202{i}-01-01")
+            for i in range(3)
+        ]
+        self.foreign = WorkExperience.objects.create(user=self.other, job_title="Manager", company_name="Other",
+                                                     job_type=WorkExperience.FULL_TIME, start_date="2020-01-01")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_list_matches_sync_view(self):
+        url, async_url = reverse('work-experience-list'), reverse('async-work-experience-list')
+        response = self.client.get(async_url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'], self.client.get(url, {'page_size': 2}).json()['results'])
+        next_page = self.client.get(response.json()['next'])
+        self.assertEqual([row['job_title'] for row in next_page.json()['results']], ['Engineer 0'])
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.other)}')
+        WorkExperience.objects.filter(user=self.other).delete()
+        self.assertEqual(self.client.get(async_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_detail(self):
+        response = self.client.get(reverse('async-work-experience-detail', args=[self.experiences[0].pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['job_title'], 'Engineer 0')
+        response = self.client.get(reverse('async-work-experience-detail', args=[self.experiences[0].pk]),
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(reverse('async-work-experience-detail', args=[self.foreign.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,29 +1,42 @@
 import logging
 from django.db import transaction
+from rest_framework.exceptions import NotFound
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
+from .importer import FORMATS, ImportFormatError, import_work_experiences, parse_rows
 from .models import WorkExperience
 from .serializers import WorkExperienceListSerializer, WorkExperienceDetailSerializer, WorkExperienceSerializer
+from common.conditional import instance_validators, not_modified, set_validators
 from common.docs import *
+from common.pagination import KeysetPagination
+from common.routing import ReplicaReadMixin
 
 
-class WorkExperienceListView(APIView):
+class WorkExperienceListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = WorkExperienceListSerializer
+    pagination_class = KeysetPagination
+    pagination_ordering = ('-start_date', 'id')
 
     @work_experience_list_docs()
     def get(self, request):
         try:
-            work_experiences = WorkExperience.objects.filter(user=request.user)
-            if not work_experiences.exists():
+            work_experiences = self.serializer_class.setup_eager_loading(
+                WorkExperience.objects.filter(user=request.user)
+            )
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(work_experiences, request, view=self)
+            if not page:
                 return Response(
                     {'message': 'No work experiences found for this user.', 'data': None},
                     status=status.HTTP_404_NOT_FOUND
                 )
-            serializer = self.serializer_class(work_experiences, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            serializer = self.serializer_class(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+        except NotFound as e:
+            return Response({'detail': e.detail}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logging.error(f"Error occurred: {e}")
             return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
@@ -49,7 +62,29 @@ class WorkExperienceCreateView(APIView):
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class WorkExperienceDetailView(APIView):
+class WorkExperienceImportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @work_experience_import_docs()
+    def post(self, request):
+        try:
+            media_type = (request.content_type or '').split(';')[0].strip().lower()
+            if media_type not in FORMATS:
+                return Response({'detail': f'Send the rows as one of: {", ".join(FORMATS)}.'},
+                                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+            # Read the body incrementally instead of through ``request.data``.
+            rows = parse_rows(request.stream, FORMATS[media_type]) if request.stream else []
+            report = import_work_experiences(request.user, rows)
+            return Response(report, status=status.HTTP_200_OK)
+        except ImportFormatError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logging.error(f"Error occurred: {e}")
+            return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class WorkExperienceDetailView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = WorkExperienceDetailSerializer
 
@@ -57,8 +92,12 @@ class WorkExperienceDetailView(APIView):
     def get(self, request, pk):
         try:
             work_experience = get_object_or_404(WorkExperience, pk=pk, user=request.user)
-            serializer = self.serializer_class(work_experience)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            etag, last_modified = instance_validators(work_experience)
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                serializer = self.serializer_class(work_experience)
+                response = Response(serializer.data, status=status.HTTP_200_OK)
+            return set_validators(response, etag, last_modified)
         except Exception as e:
             logging.error(f"Error occurred: {e}")
             return Response({'message': f'Internal Server Error: {str(e)}', 'data': None},